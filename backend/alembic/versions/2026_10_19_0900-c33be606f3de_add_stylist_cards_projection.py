@@ -0,0 +1,174 @@
+"""Add stylist_cards projection table
+
+Revision ID: c33be606f3de
+Revises: 65b4aa51e8f5
+Create Date: 2026-10-19 09:00:00.000000+00:00
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c33be606f3de'
+down_revision = '65b4aa51e8f5'
+branch_labels = None
+depends_on = None
+
+
+# Source tables as of this revision; the backfill must not follow later
+# model changes, so it does not use app.models or app.core.projections
+stylists = sa.table(
+    'stylists',
+    sa.column('id', sa.String), sa.column('user_id', sa.String), sa.column('salon_id', sa.String),
+    sa.column('name', sa.String), sa.column('bio', sa.Text), sa.column('specialties', sa.JSON),
+    sa.column('years_experience', sa.Integer), sa.column('profile_image_url', sa.String),
+    sa.column('portfolio_images', sa.JSON), sa.column('rating', sa.Float),
+    sa.column('review_count', sa.Integer), sa.column('base_price', sa.Float),
+    sa.column('is_active', sa.Boolean), sa.column('is_verified', sa.Boolean),
+    sa.column('created_at', sa.DateTime), sa.column('updated_at', sa.DateTime),
+)
+salons = sa.table(
+    'salons',
+    sa.column('id', sa.String), sa.column('name', sa.String), sa.column('address', sa.String),
+    sa.column('city', sa.String), sa.column('state', sa.String),
+    sa.column('latitude', sa.Float), sa.column('longitude', sa.Float),
+)
+services = sa.table(
+    'services',
+    sa.column('id', sa.String), sa.column('stylist_id', sa.String), sa.column('name', sa.String),
+    sa.column('description', sa.Text), sa.column('category', sa.String),
+    sa.column('duration_minutes', sa.Integer), sa.column('price', sa.Float),
+    sa.column('image_url', sa.String), sa.column('is_active', sa.Boolean),
+    sa.column('created_at', sa.DateTime), sa.column('updated_at', sa.DateTime),
+)
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def _service_json(row) -> dict:
+    return {
+        'id': row.id,
+        'stylist_id': row.stylist_id,
+        'name': row.name,
+        'description': row.description,
+        'category': row.category,
+        'duration_minutes': row.duration_minutes,
+        'price': row.price,
+        'image_url': row.image_url,
+        'is_active': row.is_active,
+        'created_at': row.created_at.isoformat() if row.created_at else None,
+        'updated_at': row.updated_at.isoformat() if row.updated_at else None,
+    }
+
+
+def _backfill(connection, cards) -> None:
+    """Build a card for every existing stylist"""
+    ids = connection.execute(sa.select(stylists.c.id).order_by(stylists.c.id)).scalars().all()
+    now = datetime.utcnow()
+    for start in range(0, len(ids), BACKFILL_BATCH_SIZE):
+        batch = ids[start:start + BACKFILL_BATCH_SIZE]
+        rows = connection.execute(
+            sa.select(
+                stylists,
+                salons.c.name.label('salon_name'),
+                salons.c.address.label('salon_address'),
+                salons.c.city.label('salon_city'),
+                salons.c.state.label('salon_state'),
+                salons.c.latitude,
+                salons.c.longitude,
+            )
+            .select_from(stylists.outerjoin(salons, salons.c.id == stylists.c.salon_id))
+            .where(stylists.c.id.in_(batch))
+        ).all()
+        by_stylist = {}
+        for service in connection.execute(
+            sa.select(services)
+            .where(services.c.stylist_id.in_(batch), services.c.is_active == sa.true())
+            .order_by(services.c.created_at, services.c.id)
+        ):
+            by_stylist.setdefault(service.stylist_id, []).append(service)
+
+        values = []
+        for row in rows:
+            own = by_stylist.get(row.id, [])
+            prices = [s.price for s in own]
+            values.append({
+                'id': row.id,
+                'user_id': row.user_id,
+                'salon_id': row.salon_id,
+                'name': row.name,
+                'bio': row.bio,
+                'specialties': row.specialties,
+                'years_experience': row.years_experience,
+                'profile_image_url': row.profile_image_url,
+                'portfolio_images': row.portfolio_images,
+                'rating': row.rating,
+                'review_count': row.review_count,
+                'base_price': row.base_price,
+                'min_price': min(prices) if prices else None,
+                'max_price': max(prices) if prices else None,
+                'is_active': row.is_active,
+                'is_verified': row.is_verified,
+                'salon_name': row.salon_name,
+                'salon_address': row.salon_address,
+                'salon_city': row.salon_city,
+                'salon_state': row.salon_state,
+                'location': f'{row.salon_city}, {row.salon_state}' if row.salon_name is not None else None,
+                'latitude': row.latitude,
+                'longitude': row.longitude,
+                'service_categories': sorted({s.category for s in own}),
+                'services': [_service_json(s) for s in own],
+                'created_at': row.created_at,
+                'updated_at': row.updated_at,
+                'refreshed_at': now,
+            })
+        if values:
+            connection.execute(sa.insert(cards), values)
+
+
+def upgrade() -> None:
+    cards = op.create_table('stylist_cards',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('salon_id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('bio', sa.Text(), nullable=True),
+    sa.Column('specialties', sa.JSON(), nullable=True),
+    sa.Column('years_experience', sa.Integer(), nullable=True),
+    sa.Column('profile_image_url', sa.String(), nullable=True),
+    sa.Column('portfolio_images', sa.JSON(), nullable=True),
+    sa.Column('rating', sa.Float(), nullable=True),
+    sa.Column('review_count', sa.Integer(), nullable=True),
+    sa.Column('base_price', sa.Float(), nullable=True),
+    sa.Column('min_price', sa.Float(), nullable=True),
+    sa.Column('max_price', sa.Float(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('salon_name', sa.String(), nullable=True),
+    sa.Column('salon_address', sa.String(), nullable=True),
+    sa.Column('salon_city', sa.String(), nullable=True),
+    sa.Column('salon_state', sa.String(), nullable=True),
+    sa.Column('location', sa.String(), nullable=True),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('service_categories', sa.JSON(), nullable=True),
+    sa.Column('services', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stylist_cards_salon_id'), 'stylist_cards', ['salon_id'], unique=False)
+    op.create_index('ix_stylist_cards_active_rating', 'stylist_cards', ['is_active', 'rating'], unique=False)
+
+    # Backfill cards for existing stylists
+    _backfill(op.get_bind(), cards)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stylist_cards_active_rating', table_name='stylist_cards')
+    op.drop_index(op.f('ix_stylist_cards_salon_id'), table_name='stylist_cards')
+    op.drop_table('stylist_cards')
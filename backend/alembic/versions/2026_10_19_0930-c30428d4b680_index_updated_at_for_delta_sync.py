@@ -0,0 +1,28 @@
+"""Index updated_at on catalog tables for delta sync
+
+Revision ID: c30428d4b680
+Revises: c33be606f3de
+Create Date: 2026-10-19 09:30:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c30428d4b680'
+down_revision = 'c33be606f3de'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_salons_updated_at'), 'salons', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_stylists_updated_at'), 'stylists', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_services_updated_at'), 'services', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_services_updated_at'), table_name='services')
+    op.drop_index(op.f('ix_stylists_updated_at'), table_name='stylists')
+    op.drop_index(op.f('ix_salons_updated_at'), table_name='salons')
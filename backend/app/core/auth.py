@@ -1,36 +1,88 @@
 """
 Authentication utilities for Firebase JWT verification
 """
-from fastapi import HTTPException, Security, status
+from collections import OrderedDict
+from fastapi import Depends, HTTPException, Request, Security, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
 from typing import Optional
+import hashlib
 import jwt
+import time
 from datetime import datetime, timedelta
 
 from app.core.config import settings
+from app.core.firebase import verify_id_token
+from app.db import get_db
+from app.models import Stylist, User
+from app.schemas import UserContext
 
 
 security = HTTPBearer()
 
 
+class TokenCache:
+    """
+    Bounded LRU of verified token payloads, keyed by token hash
+    
+    Entries are dropped once the token's `exp` has passed, so a cached
+    token is never accepted for longer than the token itself allows.
+    """
+    
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+    
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+    
+    def get(self, token: str) -> Optional[dict]:
+        key = self.key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        payload, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return dict(payload)
+    
+    def set(self, token: str, payload: dict) -> None:
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            # Tokens without an expiry are verified every time
+            return
+        key = self.key(token)
+        self._entries[key] = (dict(payload), expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_MAX_ENTRIES)
+
+
 async def verify_firebase_token(
     credentials: HTTPAuthorizationCredentials = Security(security)
 ) -> dict:
     """
     Verify Firebase ID token and return decoded payload
     
-    TODO: Integrate with Firebase Admin SDK for production
-    Currently returns mock payload for development
+    Firebase ID tokens (RS256, checked against Google's cached signing keys
+    when FIREBASE_PROJECT_ID is set) and API access tokens (HS256) are
+    accepted. Verified payloads are cached until the token expires.
     """
     token = credentials.credentials
     
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+    
     try:
-        # TODO: Replace with actual Firebase verification
-        # from firebase_admin import auth
-        # decoded_token = auth.verify_id_token(token)
-        
         # Mock verification for development
-        # In production, this should verify against Firebase
         if token == "mock-token":
             return {
                 "uid": "mock-user-id",
@@ -38,13 +90,17 @@ async def verify_firebase_token(
                 "name": "Demo User"
             }
         
-        # Try to decode as JWT (for local testing)
         try:
-            payload = jwt.decode(
-                token, 
-                settings.SECRET_KEY, 
-                algorithms=[settings.ALGORITHM]
-            )
+            if settings.FIREBASE_PROJECT_ID and jwt.get_unverified_header(token).get("alg") == "RS256":
+                payload = await verify_id_token(token, settings.FIREBASE_PROJECT_ID)
+            else:
+                # API access tokens issued by create_access_token
+                payload = jwt.decode(
+                    token, 
+                    settings.SECRET_KEY, 
+                    algorithms=[settings.ALGORITHM]
+                )
+            token_cache.set(token, payload)
             return payload
         except jwt.InvalidTokenError:
             raise HTTPException(
@@ -85,3 +141,157 @@ async def get_current_user(token_data: dict = Security(verify_firebase_token)) -
     """
     return token_data
 
+
+
+class UserContextCache:
+    """
+    Bounded LRU of resolved users, keyed by token subject
+    
+    Entries live for USER_CONTEXT_TTL seconds and are dropped as soon as
+    this process commits a change to the user or their stylist profile.
+    """
+    
+    def __init__(self, ttl: float = 30, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+    
+    def get(self, key: tuple) -> Optional[UserContext]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        context, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return context
+    
+    def set(self, key: tuple, context: UserContext) -> None:
+        self._entries[key] = (context, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, user_ids: set) -> None:
+        stale = [key for key, (context, _) in self._entries.items() if context.id in user_ids]
+        for key in stale:
+            del self._entries[key]
+    
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+user_context_cache = UserContextCache(settings.USER_CONTEXT_TTL, settings.USER_CONTEXT_MAX_ENTRIES)
+
+
+def _subject(token_data: dict) -> Optional[tuple]:
+    """Cache key for the user a token belongs to"""
+    if token_data.get("sub") and "uid" not in token_data:
+        # API access tokens: sub is the user id
+        return ("id", token_data["sub"])
+    if token_data.get("uid"):
+        return ("firebase_uid", token_data["uid"])
+    return None
+
+
+def load_user_context(db: Session, subject: tuple) -> Optional[UserContext]:
+    """Resolve a user and their stylist profile in one query"""
+    column, value = subject
+    row = (
+        db.query(User, Stylist.id, Stylist.salon_id)
+        .outerjoin(Stylist, Stylist.user_id == User.id)
+        .filter(getattr(User, column) == value)
+        .first()
+    )
+    if row is None:
+        return None
+    user, stylist_id, salon_id = row
+    roles = []
+    if user.is_admin:
+        roles.append("admin")
+    if user.is_stylist or stylist_id is not None:
+        roles.append("stylist")
+    return UserContext.model_validate({
+        **UserContext.model_validate(user).model_dump(),
+        "roles": roles,
+        "stylist_id": stylist_id,
+        "salon_id": salon_id,
+    })
+
+
+async def current_user(
+    request: Request,
+    token_data: dict = Security(verify_firebase_token),
+    db: Session = Depends(get_db)
+) -> UserContext:
+    """
+    Dependency resolving the authenticated user
+    
+    Resolved once per request (request.state) and cached per worker for
+    USER_CONTEXT_TTL seconds, so repeat callers skip the users lookup.
+    """
+    context = getattr(request.state, "current_user", None)
+    if context is not None:
+        return context
+    
+    subject = _subject(token_data)
+    if subject is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has no subject"
+        )
+    
+    context = user_context_cache.get(subject)
+    if context is None:
+        context = load_user_context(db, subject)
+        if context is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        user_context_cache.set(subject, context)
+    
+    request.state.current_user = context
+    return context
+
+
+async def require_admin(user: UserContext = Depends(current_user)) -> UserContext:
+    """
+    Dependency allowing only admin users through
+    
+    Accepts API access tokens (sub = user id) and Firebase tokens (uid).
+    """
+    if "admin" not in user.roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return user
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    """Remember which users' contexts the pending transaction changes"""
+    user_ids = session.info.setdefault("changed_user_ids", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            user_ids.add(obj.id)
+        elif isinstance(obj, Stylist):
+            # Both the new and the previous owner of a stylist profile
+            history = inspect(obj).attrs.user_id.history
+            user_ids.update(history.added or [obj.user_id])
+            user_ids.update(history.deleted or ())
+    user_ids.discard(None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_user_contexts(session: Session) -> None:
+    user_ids = session.info.pop("changed_user_ids", None)
+    if user_ids:
+        user_context_cache.invalidate(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop("changed_user_ids", None)
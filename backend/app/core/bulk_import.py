@@ -0,0 +1,406 @@
+"""
+Bulk import of users, salons, stylists and services
+
+Rows are read from CSV or NDJSON files one at a time, validated against
+the import schemas (app.schemas.imports) and loaded in batches:
+
+- PostgreSQL: each batch is streamed with COPY into a temporary staging
+  table; one INSERT ... SELECT ... ON CONFLICT DO UPDATE per entity then
+  moves the rows into the real table
+- SQLite: batches are upserted directly with executemany
+
+Users are matched on email, everything else on id (rows without an id
+get a new one). When a file repeats a key, its last row wins. Rows that
+fail validation are written to a reject file (NDJSON with the line
+number, the errors and the raw row) and do not stop the import; database
+errors such as a stylist pointing at an unknown salon abort the whole
+run, which happens in one transaction.
+
+Stylist cards touched by the import are rebuilt in the same transaction
+and cached responses are invalidated after the commit.
+
+    python -m app.core.bulk_import users=users.csv salons=salons.ndjson \\
+        stylists=stylists.csv services=services.csv --rejects rejects.ndjson
+"""
+from datetime import datetime
+from typing import IO, Callable, Iterator, Optional
+import csv
+import io
+import json
+import sys
+import time
+import uuid
+
+from pydantic import ValidationError
+from sqlalchemy import column, select, table as sql_table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+
+from app.core.cache import TABLE_TAGS, get_response_cache
+from app.core.projections import refresh_stylist_cards
+from app.models import Salon, Service, Stylist, User
+from app.schemas import (
+    ImportSummary, SalonImport, ServiceImport, StylistImport, UserImport
+)
+
+
+# Rows per COPY / executemany batch
+BATCH_SIZE = 5000
+
+# Rows between progress callbacks
+PROGRESS_EVERY = 1000
+
+# Entity -> (model, row schema, conflict key); listed in load order so
+# foreign keys resolve against rows imported earlier in the same run
+ENTITIES = {
+    "users": (User, UserImport, "email"),
+    "salons": (Salon, SalonImport, "id"),
+    "stylists": (Stylist, StylistImport, "id"),
+    "services": (Service, ServiceImport, "id"),
+}
+
+# Columns never overwritten when an existing row is updated
+_KEEP_ON_UPDATE = {"id", "created_at"}
+
+Progress = Callable[[str, int, int], None]  # entity, rows read, rows rejected
+
+
+class ImportFormatError(ValueError):
+    """Raised for an unknown entity or file format"""
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    """ "csv" or "ndjson" from a content type or file extension"""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/jsonl", "application/json"):
+        return "ndjson"
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    raise ImportFormatError(f"Cannot tell the format of {filename or 'the upload'}; use csv or ndjson")
+
+
+def _csv_value(value: str):
+    if value == "":
+        return None
+    if value[:1] in "[{":
+        # List columns (specialties, portfolio_images) are JSON encoded
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def iter_rows(stream: IO[str], fmt: str) -> Iterator[tuple[int, object]]:
+    """(line number, raw row) for each record, without loading the file"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key: _csv_value(value) for key, value in row.items() if key}
+    elif fmt == "ndjson":
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, e
+    else:
+        raise ImportFormatError(f"Unknown format: {fmt}")
+
+
+def _apply_defaults(model, row: dict) -> dict:
+    """Fill Python-side column defaults the way an ORM insert would"""
+    for col in model.__table__.columns:
+        if col.default is None or (col.key in row and (row[col.key] is not None or col.nullable)):
+            continue
+        default = col.default
+        row[col.key] = default.arg(None) if default.is_callable else default.arg
+    return row
+
+
+def _copy_literal(value) -> str:
+    """One field of a COPY ... (FORMAT csv, NULL '\\N') line"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, (list, dict)):
+        value = json.dumps(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_rows(connection: Connection, table_name: str, columns: list, rows) -> None:
+    """COPY value lists into a table through the connection's psycopg2 cursor"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(_copy_literal(value) for value in row) + "\n")
+    buffer.seek(0)
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
+class _Loader:
+    """Batches validated rows of one entity into the database"""
+
+    def __init__(self, connection: Connection, entity: str):
+        self.connection = connection
+        self.entity = entity
+        self.model, _, self.key = ENTITIES[entity]
+        self.table = self.model.__table__
+        self.columns = [c.key for c in self.table.columns]
+        self.dialect = connection.dialect.name
+        self.batch: dict = {}  # key -> row; later rows replace earlier ones
+        self.loaded = 0
+        self.ids: list = []
+        if self.dialect == "postgresql":
+            self.staging = f"import_{self.table.name}"
+            self.line = 0
+            connection.exec_driver_sql(
+                f"CREATE TEMP TABLE {self.staging} "
+                f"(LIKE {self.table.name} INCLUDING DEFAULTS, import_line bigint) ON COMMIT DROP"
+            )
+        elif self.dialect != "sqlite":
+            raise ImportFormatError(f"Bulk import supports PostgreSQL and SQLite, not {self.dialect}")
+
+    def add(self, row: dict) -> None:
+        self.batch[row[self.key]] = row
+        if len(self.batch) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.batch:
+            return
+        rows = list(self.batch.values())
+        self.batch = {}
+        if self.dialect == "postgresql":
+            self._copy(rows)
+        else:
+            self._upsert(sqlite.insert(self.table), rows)
+        self.ids.extend(row["id"] for row in rows)
+
+    def _update_set(self, statement) -> dict:
+        update = {
+            name: statement.excluded[name]
+            for name in self.columns
+            if name not in _KEEP_ON_UPDATE and name != self.key
+        }
+        if "updated_at" in update:
+            update["updated_at"] = datetime.utcnow()
+        return update
+
+    def _upsert(self, statement, rows: list) -> None:
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.key], set_=self._update_set(statement)
+        )
+        self.connection.execute(statement, rows)
+        self.loaded += len(rows)
+
+    def _copy(self, rows: list) -> None:
+        lines = []
+        for row in rows:
+            self.line += 1
+            lines.append([row.get(name) for name in self.columns] + [self.line])
+        copy_rows(self.connection, self.staging, self.columns + ["import_line"], lines)
+
+    def finish(self) -> int:
+        """Flush the last batch (and, on PostgreSQL, merge the staging table)"""
+        self.flush()
+        if self.dialect == "postgresql" and self.line:
+            staging = sql_table(self.staging, *(column(name) for name in self.columns + ["import_line"]))
+            key = staging.c[self.key]
+            # Keys repeated across batches: keep the last row of the file
+            latest = (
+                select(*(staging.c[name] for name in self.columns))
+                .distinct(key)
+                .order_by(key, staging.c.import_line.desc())
+            )
+            statement = postgresql.insert(self.table).from_select(self.columns, latest)
+            statement = statement.on_conflict_do_update(
+                index_elements=[self.key], set_=self._update_set(statement)
+            )
+            self.loaded = self.connection.execute(statement).rowcount
+        return self.loaded
+
+
+def import_entity(
+    connection: Connection,
+    entity: str,
+    stream: IO[str],
+    fmt: str,
+    rejects: Optional[IO[str]] = None,
+    progress: Optional[Progress] = None
+) -> tuple[ImportSummary, list]:
+    """
+    Validate and load one file; returns its summary and the loaded ids
+
+    Runs inside the caller's transaction.
+    """
+    if entity not in ENTITIES:
+        raise ImportFormatError(f"Unknown entity: {entity}")
+    model, schema, _ = ENTITIES[entity]
+    started = time.perf_counter()
+    loader = _Loader(connection, entity)
+    read = rejected = 0
+
+    for number, raw in iter_rows(stream, fmt):
+        read += 1
+        try:
+            if isinstance(raw, Exception):
+                raise raw
+            row = schema.model_validate(raw).model_dump()
+        except (ValidationError, ValueError) as e:
+            rejected += 1
+            if rejects is not None:
+                errors = e.errors(include_url=False) if isinstance(e, ValidationError) else [{"msg": str(e)}]
+                rejects.write(json.dumps(
+                    {"entity": entity, "line": number, "errors": errors, "row": raw if isinstance(raw, dict) else None},
+                    default=str
+                ) + "\n")
+        else:
+            if row.get("id") is None:
+                row["id"] = str(uuid.uuid4())
+            loader.add(_apply_defaults(model, row))
+        if progress is not None and read % PROGRESS_EVERY == 0:
+            progress(entity, read, rejected)
+
+    loaded = loader.finish()
+    if progress is not None:
+        progress(entity, read, rejected)
+    summary = ImportSummary(
+        entity=entity,
+        read=read,
+        loaded=loaded,
+        rejected=rejected,
+        seconds=round(time.perf_counter() - started, 3)
+    )
+    return summary, loader.ids
+
+
+def run_import(
+    connection: Connection,
+    sources: dict,
+    rejects: Optional[IO[str]] = None,
+    progress: Optional[Progress] = None
+) -> tuple[list[ImportSummary], int]:
+    """
+    Import {entity: (text stream, format)} in dependency order and rebuild
+    the affected stylist cards; returns the summaries and cards written
+
+    Call inside a transaction and finish with invalidate_caches() once it
+    has committed.
+    """
+    unknown = set(sources) - set(ENTITIES)
+    if unknown:
+        raise ImportFormatError(f"Unknown entity: {', '.join(sorted(unknown))}")
+
+    summaries = []
+    loaded_ids: dict = {}
+    for entity in ENTITIES:
+        if entity in sources:
+            stream, fmt = sources[entity]
+            summary, ids = import_entity(connection, entity, stream, fmt, rejects, progress)
+            summaries.append(summary)
+            loaded_ids[entity] = ids
+
+    stylist_ids = set(loaded_ids.get("stylists", ()))
+    if loaded_ids.get("services"):
+        services = Service.__table__
+        for start in range(0, len(loaded_ids["services"]), BATCH_SIZE):
+            batch = loaded_ids["services"][start:start + BATCH_SIZE]
+            stylist_ids.update(connection.execute(
+                select(services.c.stylist_id).where(services.c.id.in_(batch))
+            ).scalars())
+    if loaded_ids.get("salons"):
+        stylists = Stylist.__table__
+        for start in range(0, len(loaded_ids["salons"]), BATCH_SIZE):
+            batch = loaded_ids["salons"][start:start + BATCH_SIZE]
+            stylist_ids.update(connection.execute(
+                select(stylists.c.id).where(stylists.c.salon_id.in_(batch))
+            ).scalars())
+    cards = refresh_stylist_cards(connection, stylist_ids) if stylist_ids else 0
+    return summaries, cards
+
+
+def invalidate_caches(entities) -> None:
+    """Drop cached responses and user contexts covering imported tables"""
+    from app.core.auth import user_context_cache
+
+    tags = set()
+    for entity in entities:
+        tags.update(TABLE_TAGS.get(entity, ()))
+    cache = get_response_cache()
+    if cache is not None and tags:
+        cache.invalidate(*sorted(tags))
+    if "users" in entities or "stylists" in entities:
+        user_context_cache.clear()
+
+
+def main(argv: Optional[list] = None) -> int:
+    import argparse
+
+    from app.db import engine
+
+    parser = argparse.ArgumentParser(
+        prog="python -m app.core.bulk_import",
+        description="Import users, salons, stylists and services from CSV or NDJSON files"
+    )
+    parser.add_argument("sources", nargs="+", metavar="ENTITY=PATH", help=f"entity: {', '.join(ENTITIES)}")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="default: from each file's extension")
+    parser.add_argument("--rejects", default="rejects.ndjson", help="file for rows that fail validation")
+    args = parser.parse_args(argv)
+
+    files = {}
+    try:
+        for source in args.sources:
+            entity, sep, path = source.partition("=")
+            if not sep:
+                parser.error(f"expected ENTITY=PATH, got {source}")
+            fmt = args.format or detect_format(path)
+            files[entity] = (open(path, newline="", encoding="utf-8-sig"), fmt)
+
+        reported = []
+
+        def report(entity: str, read: int, rejected: int) -> None:
+            if reported and reported[-1] != entity:
+                sys.stderr.write("\n")
+            reported.append(entity)
+            sys.stderr.write(f"\r{entity}: {read} rows read, {rejected} rejected")
+            sys.stderr.flush()
+
+        with open(args.rejects, "w") as rejects:
+            with engine.begin() as connection:
+                summaries, cards = run_import(connection, files, rejects, report)
+        sys.stderr.write("\n")
+        invalidate_caches(files)
+    except ImportFormatError as e:
+        parser.error(str(e))
+    finally:
+        for stream, _ in files.values():
+            stream.close()
+
+    for summary in summaries:
+        print(f"✅ {summary.entity}: {summary.loaded} loaded, {summary.rejected} rejected ({summary.seconds}s)")
+    print(f"✅ Rebuilt {cards} stylist cards")
+    if any(summary.rejected for summary in summaries):
+        print(f"⚠️  Rejected rows written to {args.rejects}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
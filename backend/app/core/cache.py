@@ -0,0 +1,475 @@
+"""
+Response cache for public catalog endpoints
+
+Handlers opt in with the @cached decorator, which stores the serialized
+JSON body under a key made of the route name and its normalized
+parameters. Hits are written out as-is, without validation or encoding.
+Entries are fresh for `ttl` seconds and then served stale for up to
+`stale_ttl` more seconds while a background task recomputes them.
+
+Concurrent misses on the same key are coalesced through the shared
+single-flight group, so only one request per key hits the database.
+
+Routes with conditional GET support pass their validator function: the
+ETag and Last-Modified it computes are stored with the entry, so a hit
+(including a 304 for a matching If-None-Match) never touches the database.
+
+Invalidation is tag based: each key embeds the current version of its
+tags, and committing a write to a salon, stylist or service bumps the
+matching tag versions so older keys are never read again.
+
+Backends: an in-process LRU or Redis (CACHE_BACKEND=redis), which takes
+any client exposing the redis.asyncio get/set/incr/mget coroutines, so a
+local fake can stand in for tests. Tag versions bumped outside the event
+loop (commit hooks in worker threads, CLI scripts) go through an optional
+synchronous client instead.
+
+The LRU and its tag versions belong to one process: with several workers
+a write would invalidate only the worker that handled it. It is therefore
+refused when several workers run (WEB_CONCURRENCY > 1, or METRICS_DIR
+set); with CACHE_BACKEND unset those deployments use Redis when CACHE_URL
+is set and no cache otherwise.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Iterable, Optional
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.conditional import check_conditional, is_conditional, make_etag
+from app.core.config import settings
+from app.core.serialization import bytes_response, render_json, wants_ndjson
+from app.core.singleflight import default_group
+
+
+logger = logging.getLogger(__name__)
+
+# Tags invalidated when a row of each table is written. Stylist payloads
+# embed salon details and services, so those writes reach "stylists" too.
+TABLE_TAGS = {
+    "salons": ("salons", "stylists"),
+    "stylists": ("stylists", "salons"),
+    "services": ("services", "stylists"),
+}
+
+
+class CacheBackend(ABC):
+    """Interface for cache storage"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    async def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        return [await self.get(key) for key in keys]
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        ...
+
+    def incr_nowait(self, key: str) -> None:
+        """Bump a counter from synchronous code (e.g. a commit hook)"""
+        if not _run_soon(self.incr(key)):
+            logger.warning(
+                "No event loop to bump cache counter %s; entries it versions stay "
+                "readable until their ttl (give RedisBackend a sync_client)", key
+            )
+
+
+class MemoryBackend(CacheBackend):
+    """Bounded in-process LRU cache"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        # Counters (tag versions) live outside the LRU so they are never evicted
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def incr(self, key: str) -> int:
+        return self._incr(key)
+
+    def incr_nowait(self, key: str) -> None:
+        self._incr(key)
+
+    def _incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisBackend(CacheBackend):
+    """Networked cache backed by a redis.asyncio-compatible client"""
+
+    def __init__(self, client, prefix: str = "zelux:", sync_client=None):
+        self.client = client
+        self.prefix = prefix
+        # Blocking client (redis.Redis-compatible) for bumps made off the loop
+        self.sync_client = sync_client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        import redis  # Optional dependency
+        import redis.asyncio
+
+        return cls(redis.asyncio.from_url(url), sync_client=redis.Redis.from_url(url))
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        raws = await self.client.mget([self.prefix + key for key in keys])
+        return [json.loads(raw) if raw is not None else None for raw in raws]
+
+    async def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        await self.client.set(
+            self.prefix + key,
+            json.dumps(value),
+            ex=max(1, int(ttl)) if ttl else None
+        )
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(self.prefix + key)
+
+    def incr_nowait(self, key: str) -> None:
+        # Off the event loop the async client may belong to another loop;
+        # the blocking client also makes the bump visible before returning
+        if self.sync_client is not None and not _on_event_loop():
+            self.sync_client.incr(self.prefix + key)
+            return
+        super().incr_nowait(key)
+
+
+# Event loop serving requests, used to schedule work from worker threads
+_main_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Fire-and-forget work, referenced until done so it is not garbage collected
+_pending: set = set()
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _run_soon(coro: Awaitable) -> bool:
+    """
+    Schedule a coroutine on the running or the serving event loop without
+    waiting for it. Returns False (and discards the coroutine) when there
+    is no loop to run it on.
+    """
+    if _on_event_loop():
+        future = asyncio.get_running_loop().create_task(coro)
+    elif _main_loop is not None and _main_loop.is_running():
+        future = asyncio.run_coroutine_threadsafe(coro, _main_loop)
+    else:
+        coro.close()
+        return False
+    _pending.add(future)
+    future.add_done_callback(_pending.discard)
+    return True
+
+
+class ResponseCache:
+    """Tag-versioned response cache with stale-while-revalidate"""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._refreshing: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def build_key(self, route: str, params: dict, tags: Iterable[str]) -> str:
+        tags = sorted(tags)
+        versions = await self.backend.get_many([f"tag:{tag}" for tag in tags]) if tags else []
+        normalized = json.dumps(
+            {k: v for k, v in params.items() if v is not None},
+            sort_keys=True,
+            default=str
+        )
+        digest = hashlib.sha1(normalized.encode()).hexdigest()
+        version = ".".join(str(v or 0) for v in versions)
+        return f"cache:{route}:{version}:{digest}"
+
+    async def store(self, key: str, payload: dict, ttl: float, stale_ttl: float) -> None:
+        """Store a payload ({"body", "etag", "last_modified"}) as fresh for ttl"""
+        entry = dict(payload, fresh_until=time.time() + ttl)
+        await self.backend.set(key, entry, ttl + stale_ttl)
+
+    def invalidate(self, *tags: str) -> None:
+        """Make every entry carrying one of the tags unreachable"""
+        for tag in tags:
+            self.backend.incr_nowait(f"tag:{tag}")
+
+    def revalidate(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: float, stale_ttl: float) -> None:
+        """Recompute a stale entry in the background (once per key)"""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                await self.store(key, await compute(), ttl, stale_ttl)
+            except Exception:
+                # Keep serving the stale entry; the next miss will retry
+                pass
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_configured = False
+
+
+def cache_backend_name() -> str:
+    """
+    The configured backend, or the default for this deployment
+
+    Raises RuntimeError for the in-process backend when several workers
+    run, since writes would leave the other workers' entries current.
+    """
+    several_workers = settings.WEB_CONCURRENCY > 1 or bool(settings.METRICS_DIR)
+    name = settings.CACHE_BACKEND
+    if name is None:
+        if not several_workers:
+            return "memory"
+        if settings.CACHE_URL:
+            return "redis"
+        logger.warning("Response cache off: several workers need CACHE_URL (Redis) to share it")
+        return "none"
+    if name == "memory" and several_workers:
+        raise RuntimeError(
+            "CACHE_BACKEND=memory is per process and cannot be invalidated across "
+            "workers; set CACHE_BACKEND=redis with CACHE_URL, or CACHE_BACKEND=none"
+        )
+    return name
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache (None when disabled)"""
+    global _response_cache, _response_cache_configured
+    if not _response_cache_configured:
+        name = cache_backend_name()
+        if name == "redis":
+            _response_cache = ResponseCache(RedisBackend.from_url(settings.CACHE_URL))
+        elif name == "memory":
+            _response_cache = ResponseCache(MemoryBackend(settings.CACHE_MAX_ENTRIES))
+        _response_cache_configured = True
+    return _response_cache
+
+
+def _with_fresh_sessions(kwargs: dict) -> tuple[dict, list[Session]]:
+    """
+    Copy handler kwargs, replacing request-scoped sessions with new ones
+    on the same database (a replica session stays on its replica)
+    """
+    from app.db import SessionLocal
+
+    sessions = []
+    fresh = dict(kwargs)
+    for name, value in kwargs.items():
+        if isinstance(value, Session):
+            fresh[name] = SessionLocal(bind=value.get_bind())
+            if value.info.get("replica"):
+                fresh[name].info["replica"] = True
+            sessions.append(fresh[name])
+    return fresh, sessions
+
+
+def _render_body(result: Any) -> str:
+    """Serialized JSON body of a handler result"""
+    if isinstance(result, Response):
+        return result.body.decode()
+    return render_json(result).decode()
+
+
+def _conditional(request: Request, response: Response, payload: dict) -> None:
+    """Apply stored validators: set them on the response or raise 304"""
+    if payload.get("etag") is not None:
+        last_modified = payload.get("last_modified")
+        check_conditional(
+            request,
+            response,
+            payload["etag"],
+            datetime.fromisoformat(last_modified) if last_modified else None
+        )
+
+
+def cached(
+    route: str,
+    ttl: float,
+    stale_ttl: float = 0,
+    tags: tuple = (),
+    case_insensitive: tuple = (),
+    validators: Optional[Callable] = None,
+    vary: Optional[str] = None
+):
+    """
+    Cache the JSON body produced by an async route handler
+
+    route: cache namespace for the handler
+    ttl: seconds an entry is served as fresh
+    stale_ttl: extra seconds an expired entry is served while refreshing
+    tags: invalidation tags (see TABLE_TAGS)
+    case_insensitive: parameters lowercased and stripped before keying
+    validators: function of (a subset of) the handler's parameters
+        returning (etag, last_modified) or None; it runs only on a miss
+        and its result is cached with the body. The handler must take
+        `request` and `response` parameters.
+    vary: Vary header value for every response
+
+    NDJSON requests are streamed straight from the handler and never
+    cached; their ETag is derived from the JSON one.
+    """
+    def decorator(func):
+        validator_params = (
+            list(inspect.signature(validators).parameters) if validators is not None else []
+        )
+
+        async def validate(handler_kwargs: dict) -> dict:
+            if validators is None:
+                return {}
+            result = validators(**{name: handler_kwargs[name] for name in validator_params})
+            if inspect.isawaitable(result):
+                result = await result
+            if result is None:
+                return {}
+            etag, last_modified = result
+            return {
+                "etag": etag,
+                "last_modified": last_modified.isoformat() if last_modified else None,
+            }
+
+        async def render(handler_kwargs: dict) -> dict:
+            payload = await validate(handler_kwargs)
+            payload["body"] = _render_body(await func(**handler_kwargs))
+            return payload
+
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            global _main_loop
+            request = next((v for v in kwargs.values() if isinstance(v, Request)), None)
+            response = next((v for v in kwargs.values() if isinstance(v, Response)), None)
+            if vary and response is not None:
+                response.headers["Vary"] = vary
+
+            cache = get_response_cache()
+            if cache is None or (request is not None and wants_ndjson(request)):
+                payload = await validate(kwargs)
+                if request is not None and wants_ndjson(request) and payload.get("etag"):
+                    payload["etag"] = make_etag(payload["etag"], "ndjson")
+                if request is not None:
+                    _conditional(request, response, payload)
+                return await func(**kwargs)
+            _main_loop = asyncio.get_running_loop()
+
+            params = {}
+            for name, value in kwargs.items():
+                if isinstance(value, (Request, Response, Session)):
+                    continue
+                if name in case_insensitive and isinstance(value, str):
+                    value = value.strip().lower()
+                params[name] = value
+            key = await cache.build_key(route, params, tags)
+
+            async def compute():
+                fresh_kwargs, sessions = _with_fresh_sessions(kwargs)
+                try:
+                    return await render(fresh_kwargs)
+                finally:
+                    for session in sessions:
+                        session.close()
+
+            entry = await cache.backend.get(key)
+            if entry is not None:
+                if entry["fresh_until"] <= time.time():
+                    cache.revalidate(key, compute, ttl, stale_ttl)
+            else:
+                if validators is not None and request is not None and (
+                    is_conditional(request)
+                ):
+                    # Answer a revalidation from the validators alone
+                    _conditional(request, response, await validate(kwargs))
+
+                async def fill():
+                    payload = await render(kwargs)
+                    await cache.store(key, payload, ttl, stale_ttl)
+                    return payload
+
+                # Concurrent misses on a hot key run the handler only once
+                entry = await default_group.do(key, fill)
+
+            if request is not None:
+                _conditional(request, response, entry)
+            return bytes_response(entry["body"].encode(), response)
+
+        return wrapper
+
+    return decorator
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_cache_tags(session: Session, flush_context) -> None:
+    """Remember which tags the pending transaction touches"""
+    tags = session.info.setdefault("cache_tags", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        tags.update(TABLE_TAGS.get(getattr(obj, "__tablename__", None), ()))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    """Invalidate cached responses once the write is durable"""
+    tags = session.info.pop("cache_tags", None)
+    if tags:
+        cache = get_response_cache()
+        if cache is not None:
+            cache.invalidate(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cache_tags(session: Session) -> None:
+    session.info.pop("cache_tags", None)
@@ -0,0 +1,305 @@
+"""
+Response compression and precompressed static media
+
+CompressionMiddleware negotiates brotli (when the optional `brotli`
+package is installed) or gzip from Accept-Encoding. Bodies below
+COMPRESSION_MINIMUM_SIZE, non-compressible content types and responses
+that already carry a Content-Encoding are passed through untouched.
+Single-chunk bodies larger than COMPRESSION_THREAD_THRESHOLD are
+compressed in a worker thread so the event loop keeps serving requests;
+streamed bodies are compressed chunk by chunk and flushed as they go.
+
+PrecompressedStaticFiles serves `file.br` / `file.gz` siblings written
+ahead of time, so media is never compressed per request. Run
+`python -m app.core.compression [root] [--force]` to (re)build the siblings under
+MEDIA_ROOT.
+"""
+from pathlib import Path
+from typing import Optional
+import gzip
+import os
+import stat
+import sys
+import zlib
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # Optional dependency - gzip only
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# File extensions precompressed under MEDIA_ROOT
+COMPRESSIBLE_SUFFIXES = {".json", ".txt", ".html", ".css", ".js", ".svg", ".xml", ".csv"}
+
+# Sibling suffix for each encoding, in order of preference
+ENCODING_SUFFIXES = (("br", ".br"), ("gzip", ".gz"))
+
+
+def accepted_encodings(headers: Headers) -> set[str]:
+    """Encodings the client accepts (q=0 entries excluded)"""
+    accepted = set()
+    for item in headers.get("accept-encoding", "").split(","):
+        name, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose_encoding(headers: Headers) -> Optional[str]:
+    accepted = accepted_encodings(headers)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.lower().startswith(COMPRESSIBLE_TYPES)
+
+
+class _StreamCompressor:
+    """Incremental compressor that flushes after every chunk"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits=31 emits a gzip header and trailer
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+def compress_bytes(data: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    """One-shot compression of a complete body"""
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing eligible HTTP responses"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        thread_threshold: int = 64 * 1024
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.thread_threshold = thread_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-response state: decides on the first body chunk"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_StreamCompressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.downstream(message)
+            return
+
+        if self.passthrough:
+            await self.downstream(message)
+            return
+
+        if self.compressor is not None:
+            await self._send_streamed(message)
+            return
+
+        headers = Headers(raw=self.start_message["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if (
+            "content-encoding" in headers
+            or not is_compressible(headers.get("content-type", ""))
+            or self.start_message["status"] in (204, 206, 304)
+            or (not more_body and len(body) < self.middleware.minimum_size)
+        ):
+            self.passthrough = True
+            await self.downstream(self.start_message)
+            await self.downstream(message)
+            return
+
+        out_headers = MutableHeaders(raw=self.start_message["headers"])
+        out_headers["Content-Encoding"] = self.encoding
+        out_headers.add_vary_header("Accept-Encoding")
+
+        if not more_body:
+            if len(body) >= self.middleware.thread_threshold:
+                # Large bodies would stall the event loop for milliseconds
+                compressed = await anyio.to_thread.run_sync(self._compress_all, body)
+            else:
+                compressed = self._compress_all(body)
+            out_headers["Content-Length"] = str(len(compressed))
+            await self.downstream(self.start_message)
+            await self.downstream({"type": "http.response.body", "body": compressed})
+            return
+
+        # Streamed body: length is unknown up front
+        if "content-length" in out_headers:
+            del out_headers["Content-Length"]
+        self.compressor = _StreamCompressor(
+            self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+        )
+        await self.downstream(self.start_message)
+        await self._send_streamed(message)
+
+    def _compress_all(self, body: bytes) -> bytes:
+        return compress_bytes(
+            body, self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+        )
+
+    async def _send_streamed(self, message: Message) -> None:
+        more_body = message.get("more_body", False)
+        chunk = self.compressor.compress(message.get("body", b""))
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.downstream({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that prefers up-to-date .br/.gz siblings of a file"""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if not isinstance(response, FileResponse) or response.status_code != 200:
+            return response
+
+        request_headers = Headers(scope=scope)
+        accepted = accepted_encodings(request_headers)
+        original = response.stat_result or await anyio.to_thread.run_sync(os.stat, response.path)
+        has_sibling = False
+        for encoding, suffix in ENCODING_SUFFIXES:
+            # Stat off the event loop, as StaticFiles does for the original
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if (
+                stat_result is None
+                or not stat.S_ISREG(stat_result.st_mode)
+                or stat_result.st_mtime < original.st_mtime
+            ):
+                continue
+            has_sibling = True
+            if encoding not in accepted:
+                continue
+            compressed = FileResponse(
+                full_path,
+                stat_result=stat_result,
+                media_type=response.media_type,
+                method=scope["method"],
+                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+            )
+            if self.is_not_modified(compressed.headers, request_headers):
+                return NotModifiedResponse(compressed.headers)
+            return compressed
+
+        if has_sibling:
+            # Caches must not hand the identity body to clients that could decode
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+def precompress_directory(root: str, minimum_size: int = 1024, force: bool = False) -> dict:
+    """
+    Write .gz (and .br when brotli is installed) siblings for compressible
+    files under root. Up-to-date siblings are kept unless force is set, and
+    siblings that would not be smaller than the original are removed.
+    """
+    counts = {"written": 0, "skipped": 0, "removed": 0}
+    encodings = [(e, s) for e, s in ENCODING_SUFFIXES if e != "br" or brotli is not None]
+
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            source = Path(dirpath) / filename
+            if source.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+                continue
+            source_stat = source.stat()
+            if source_stat.st_size < minimum_size:
+                continue
+
+            data = None
+            for encoding, suffix in encodings:
+                target = source.with_name(source.name + suffix)
+                if not force and target.exists() and target.stat().st_mtime >= source_stat.st_mtime:
+                    counts["skipped"] += 1
+                    continue
+                if data is None:
+                    data = source.read_bytes()
+                # Offline, so spend the CPU on the best ratio
+                compressed = compress_bytes(data, encoding, gzip_level=9, brotli_quality=11)
+                if len(compressed) >= len(data):
+                    if target.exists():
+                        target.unlink()
+                        counts["removed"] += 1
+                    continue
+                tmp = target.with_name(target.name + ".tmp")
+                tmp.write_bytes(compressed)
+                os.replace(tmp, target)
+                counts["written"] += 1
+    return counts
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--force"]
+    root = args[0] if args else settings.MEDIA_ROOT
+    counts = precompress_directory(root, settings.COMPRESSION_MINIMUM_SIZE, force="--force" in sys.argv)
+    print(
+        f"✅ Precompressed {root}: {counts['written']} written, "
+        f"{counts['skipped']} up to date, {counts['removed']} removed"
+    )
@@ -0,0 +1,92 @@
+"""
+HTTP conditional GET helpers (ETag / Last-Modified)
+
+Validators are derived from row versions (id + updated_at) with a cheap
+query, before the handler loads and serializes anything. A matching
+If-None-Match (or If-Modified-Since) short-circuits the request with a
+304 raised from the dependency, so the ORM hydration path never runs.
+Handlers that read the row anyway run that probe only for conditional
+requests (is_conditional) and otherwise set the validators from the row
+they loaded (set_validators).
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+import hashlib
+
+from fastapi import HTTPException, Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from row identity and version values"""
+    digest = hashlib.blake2b(
+        "|".join("" if p is None else str(p) for p in parts).encode(),
+        digest_size=12
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def http_date(moment: datetime) -> str:
+    """Format a naive UTC datetime as an HTTP date"""
+    return format_datetime(moment.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match header"""
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since is None:
+        return False
+    return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
+def is_conditional(request: Request) -> bool:
+    """True when the client sent If-None-Match or If-Modified-Since"""
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def _validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime] = None) -> None:
+    """Attach validators computed from data the handler already loaded"""
+    response.headers.update(_validator_headers(etag, last_modified))
+
+
+def check_conditional(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> None:
+    """
+    Attach validators to the response, or raise 304 when the client's copy
+    is current. If-None-Match takes precedence over If-Modified-Since.
+    """
+    headers = _validator_headers(etag, last_modified)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    elif if_modified_since is not None and last_modified is not None:
+        not_modified = _not_modified_since(if_modified_since, last_modified)
+    else:
+        not_modified = False
+
+    if not_modified:
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
@@ -12,12 +12,57 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Zelux API"
     
+    # Maximum ids accepted by the /batch lookup endpoints
+    BATCH_MAX_IDS: int = 100
+    
+    # Maximum GET sub-requests accepted by the multiplexed /batch endpoint
+    BATCH_MAX_REQUESTS: int = 20
+    
     # Database (loaded from .env - uses Neon PostgreSQL)
     DATABASE_URL: str
+    DB_ECHO: bool = False  # Log every statement (slow; for local debugging only)
+    SLOW_QUERY_MS: Optional[float] = 200  # Log statements at least this slow (None disables)
+    
+    # Connection pool (per worker process). Connections idle for longer than
+    # DB_POOL_PING_IDLE seconds are pinged on checkout instead of pinging
+    # every checkout; DB_POOL_RECYCLE replaces connections before Neon or a
+    # load balancer drops them. DB_POOL_WARMUP connections open at startup.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PING_IDLE: Optional[float] = 60
+    DB_POOL_WARMUP: int = 2
+    DB_CONNECT_TIMEOUT: int = 10
+    DB_TCP_KEEPALIVES_IDLE: Optional[int] = 30  # None disables TCP keepalives
+    
+    # Startup compares alembic_version with the migration heads:
+    # "error" refuses to start on a mismatch, "warn" logs it, "off" skips it
+    SCHEMA_CHECK: str = "warn"
+    
+    # Read replicas (comma-separated URLs; unset = all reads on the primary).
+    # GET endpoints read from a replica unless the client wrote within
+    # READ_YOUR_WRITES_SECONDS, or the replica lags by more than
+    # REPLICA_MAX_LAG_SECONDS or failed within REPLICA_RETRY_SECONDS.
+    DATABASE_READ_URLS: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: float = 5
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    REPLICA_CHECK_INTERVAL: float = 5  # seconds between lag checks per replica
+    REPLICA_RETRY_SECONDS: float = 30
     
     # Firebase Auth
     FIREBASE_PROJECT_ID: Optional[str] = None
     FIREBASE_API_KEY: Optional[str] = None
+    # Signing keys for ID tokens (JWKS or x509 map); point at a local stub offline
+    FIREBASE_CERTS_URL: str = "https://www.googleapis.com/service_accounts/v1/jwk/securetoken@system.gserviceaccount.com"
+    
+    # Verified tokens kept in memory (LRU, each until its exp)
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Resolved users (current_user) kept per worker; writes invalidate them
+    # locally, other workers pick changes up once the TTL runs out
+    USER_CONTEXT_TTL: float = 30
+    USER_CONTEXT_MAX_ENTRIES: int = 10000
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -40,6 +85,41 @@ class Settings(BaseSettings):
     MEDIA_ROOT: str = "./media"
     MEDIA_URL: str = "/media"
     
+    # Worker processes; uvicorn --workers and gunicorn default to this variable
+    WEB_CONCURRENCY: int = 1
+    
+    # Response cache: "memory" (in-process LRU), "redis" or "none". The memory
+    # cache is per process, so a write only invalidates the worker that made
+    # it; it is refused with several workers. Unset: memory for one worker,
+    # redis (CACHE_URL) or none for several (see app.core.cache)
+    CACHE_BACKEND: Optional[str] = None
+    CACHE_URL: Optional[str] = None  # e.g. redis://localhost:6379/0
+    CACHE_MAX_ENTRIES: int = 10000
+    
+    # Response compression (brotli needs the optional `brotli` package)
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_THREAD_THRESHOLD: int = 64 * 1024  # compress off the event loop above this
+    
+    # Metrics: with several workers, each writes snapshots to METRICS_DIR
+    # (a directory shared by the workers) and /metrics merges them
+    METRICS_DIR: Optional[str] = None
+    METRICS_FLUSH_INTERVAL: float = 5.0  # seconds
+    
+    # Sampling profiler output (collapsed stacks) and SIGUSR2 profile length
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_SIGNAL_SECONDS: float = 30
+    
+    # Reject files of imports uploaded to /admin/import
+    IMPORT_DIR: str = "./imports"
+    
+    # Tracing: exporter "none" (off), "stdout" or "file" (JSON lines in TRACE_FILE);
+    # TRACE_SAMPLE_RATE applies to requests without a W3C traceparent
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE: str = "./traces.ndjson"
+    TRACE_SAMPLE_RATE: float = 1.0
+    
     # AI Service (Placeholder for Nano Banana)
     AI_SERVICE_URL: Optional[str] = None
     AI_SERVICE_API_KEY: Optional[str] = None
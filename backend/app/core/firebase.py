@@ -0,0 +1,152 @@
+"""
+Firebase ID token signing keys
+
+Google publishes the keys that sign Firebase ID tokens at
+FIREBASE_CERTS_URL, either as a JWKS document ({"keys": [...]}) or as a
+kid -> PEM certificate map; both are accepted. Keys are fetched once and
+kept for the max-age of the response's Cache-Control header. Shortly
+before they expire a background refresh replaces them while the current
+keys keep serving, so verification never waits on the network except on
+the very first token or after an unknown key id shows up.
+
+Point FIREBASE_CERTS_URL at a local stub (or pass `fetch` to
+FirebaseKeyStore) to verify tokens without network access.
+"""
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
+import re
+import time
+
+import jwt
+from cryptography.x509 import load_pem_x509_certificate
+
+from app.core.config import settings
+from app.core.singleflight import default_group
+from app.core.tracing import traced_http_client
+
+
+# Used when the response carries no Cache-Control max-age
+DEFAULT_MAX_AGE = 3600
+
+# Refresh in the background once this share of the max-age has passed
+REFRESH_AFTER = 0.9
+
+# Minimum seconds between fetches triggered by unknown key ids, so tokens
+# with made-up `kid` headers cannot make every request hit Google
+UNKNOWN_KID_REFETCH = 60
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def parse_max_age(cache_control: Optional[str]) -> int:
+    match = _MAX_AGE.search(cache_control or "")
+    return int(match.group(1)) if match else DEFAULT_MAX_AGE
+
+
+def parse_keys(body: Any) -> dict:
+    """kid -> public key from a JWKS document or an x509 certificate map"""
+    if isinstance(body, dict) and "keys" in body:
+        return {key.key_id: key.key for key in jwt.PyJWKSet.from_dict(body).keys}
+    return {
+        kid: load_pem_x509_certificate(pem.encode()).public_key()
+        for kid, pem in body.items()
+    }
+
+
+async def fetch_certs(url: str) -> tuple[Any, Optional[str]]:
+    """GET the key document; returns (parsed JSON, Cache-Control header)"""
+    async with traced_http_client(timeout=10) as client:
+        response = await client.get(url)
+        response.raise_for_status()
+        return response.json(), response.headers.get("cache-control")
+
+
+class FirebaseKeyStore:
+    """Cached Firebase signing keys with background refresh"""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        fetch: Optional[Callable[[str], Awaitable[tuple[Any, Optional[str]]]]] = None
+    ):
+        self.url = url or settings.FIREBASE_CERTS_URL
+        self.fetch = fetch or fetch_certs
+        self.keys: dict = {}
+        self.fetched_at = 0.0
+        self.attempted_at = 0.0
+        self.expires_at = 0.0
+        self.fetch_count = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> None:
+        """Fetch the keys now (concurrent callers share one fetch)"""
+        async def fetch():
+            self.attempted_at = time.time()
+            body, cache_control = await self.fetch(self.url)
+            self.keys = parse_keys(body)
+            self.fetched_at = time.time()
+            self.expires_at = self.fetched_at + parse_max_age(cache_control)
+            self.fetch_count += 1
+
+        await default_group.do(("firebase-certs", self.url), fetch)
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+
+        async def refresh():
+            try:
+                await self.refresh()
+            except Exception:
+                # Keep the current keys; the next verification retries
+                pass
+
+        self._refresh_task = asyncio.get_running_loop().create_task(refresh())
+
+    async def get_key(self, kid: str) -> Any:
+        """Public key for a token's `kid` header"""
+        now = time.time()
+        if now >= self.expires_at or (
+            kid not in self.keys and now - self.attempted_at >= UNKNOWN_KID_REFETCH
+        ):
+            await self.refresh()
+        elif now >= self.fetched_at + (self.expires_at - self.fetched_at) * REFRESH_AFTER:
+            self._refresh_in_background()
+
+        key = self.keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+        return key
+
+
+_key_store: Optional[FirebaseKeyStore] = None
+
+
+def get_key_store() -> FirebaseKeyStore:
+    """Process-wide Firebase key store"""
+    global _key_store
+    if _key_store is None:
+        _key_store = FirebaseKeyStore()
+    return _key_store
+
+
+async def verify_id_token(token: str, project_id: str) -> dict:
+    """
+    Verify a Firebase ID token's signature, audience, issuer and expiry
+
+    The payload gets a "uid" entry (the Firebase user id, i.e. `sub`), as
+    firebase_admin.auth.verify_id_token returns it.
+    """
+    kid = jwt.get_unverified_header(token).get("kid")
+    if not kid:
+        raise jwt.InvalidTokenError("Token has no key id")
+    key = await get_key_store().get_key(kid)
+    payload = jwt.decode(
+        token,
+        key,
+        algorithms=["RS256"],
+        audience=project_id,
+        issuer=f"https://securetoken.google.com/{project_id}"
+    )
+    payload["uid"] = payload["sub"]
+    return payload
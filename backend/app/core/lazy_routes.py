@@ -0,0 +1,85 @@
+"""
+Routers imported on first use
+
+Rarely used routers (AI previews, admin imports) are registered as a
+placeholder route covering their path prefix, so importing app.main does
+not import them or what they depend on. The first request under the
+prefix imports the module, swaps its routes in where the placeholder was
+and re-dispatches; from then on they are ordinary routes. Building the
+OpenAPI schema (/docs) loads every lazy router first.
+"""
+import importlib
+import logging
+import time
+
+from fastapi import FastAPI
+from starlette.routing import BaseRoute, Match, NoMatchFound
+from starlette.types import Receive, Scope, Send
+
+
+logger = logging.getLogger(__name__)
+
+
+class LazyRouterRoute(BaseRoute):
+    """Placeholder for the routes of `module.router`, all under `path`"""
+
+    def __init__(self, app: FastAPI, module: str, path: str, prefix: str = ""):
+        self.app = app
+        self.module = module
+        self.prefix = prefix
+        self.path = prefix + path
+
+    def matches(self, scope: Scope) -> tuple[Match, Scope]:
+        if scope["type"] == "http":
+            path = scope["path"]
+            if path == self.path or path.startswith(self.path + "/"):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, /, **path_params):
+        raise NoMatchFound(name, path_params)
+
+    def load(self) -> None:
+        """Import the router and replace this placeholder with its routes"""
+        routes = self.app.router.routes
+        if self not in routes:
+            return
+        started = time.perf_counter()
+        router = importlib.import_module(self.module).router
+        index = routes.index(self)
+        count = len(routes)
+        self.app.include_router(router, prefix=self.prefix)
+        added = routes[count:]
+        del routes[count:]
+        routes[index:index + 1] = added
+        logger.info("Loaded %s in %.1f ms", self.module, (time.perf_counter() - started) * 1000)
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.load()
+        await self.app.router(scope, receive, send)
+
+
+def include_router_lazily(app: FastAPI, module: str, path: str, prefix: str = "") -> None:
+    """
+    Register `module`'s router (whose routes all start with `path`) to be
+    imported on the first request to prefix + path
+    """
+    if not getattr(app.state, "lazy_routers", None):
+        app.state.lazy_routers = []
+        build_openapi = app.openapi
+
+        def openapi() -> dict:
+            load_lazy_routers(app)
+            return build_openapi()
+
+        app.openapi = openapi
+
+    route = LazyRouterRoute(app, module, path, prefix)
+    app.state.lazy_routers.append(route)
+    app.router.routes.append(route)
+
+
+def load_lazy_routers(app: FastAPI) -> None:
+    """Import every lazily included router now"""
+    for route in getattr(app.state, "lazy_routers", ()):
+        route.load()
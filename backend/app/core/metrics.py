@@ -0,0 +1,369 @@
+"""
+Prometheus-style metrics
+
+Collected per worker process with plain in-memory increments (no locks,
+no I/O on the request path):
+
+- http_requests_total{method,route,status}
+- http_request_duration_seconds{method,route} (histogram)
+- db_pool_checkout_seconds (histogram, via InstrumentedQueuePool)
+- db_pool_size / db_pool_checked_out / db_pool_overflow
+- event_loop_lag_seconds
+
+Routes are labelled by their path template (/api/v1/stylists/{stylist_id}),
+never by the raw path, so label cardinality stays bounded.
+
+With several uvicorn workers, set METRICS_DIR: each worker then writes a
+snapshot file there every METRICS_FLUSH_INTERVAL seconds, and /metrics
+merges the snapshots of live workers (counters and histograms are summed,
+gauges summed or maxed), so every scrape sees the whole server no matter
+which worker answers it. When a worker exits, its counters and
+histograms are folded into metrics-retired.json and its gauges dropped,
+so the merged counters never go backwards (Prometheus would read that as
+a reset).
+"""
+from bisect import bisect_left
+from typing import Iterable, Optional
+import asyncio
+import fcntl
+import json
+import os
+import time
+
+from sqlalchemy.pool import QueuePool
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.tracing import span
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Metric:
+    """Base class: a named family of label tuples mapped to values"""
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values: dict[tuple, object] = {}
+
+    def snapshot(self) -> dict:
+        return {
+            "kind": self.kind,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "values": [[list(labels), value] for labels, value in self.values.items()],
+        }
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), merge: str = "sum"):
+        super().__init__(name, documentation, labelnames)
+        self.merge = merge  # how worker values combine: "sum" or "max"
+
+    def set(self, value: float, labels: tuple = ()) -> None:
+        self.values[labels] = value
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "merge": self.merge}
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        # Layout: one count per bucket, then +Inf, then sum
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> dict:
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+
+registry = Registry()
+
+REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+))
+LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+))
+POOL_CHECKOUT = registry.register(Histogram(
+    "db_pool_checkout_seconds", "Time spent waiting for a pooled DB connection", buckets=POOL_WAIT_BUCKETS
+))
+POOL_SIZE = registry.register(Gauge("db_pool_size", "Configured DB pool size"))
+POOL_CHECKED_OUT = registry.register(Gauge("db_pool_checked_out", "DB connections currently in use"))
+POOL_OVERFLOW = registry.register(Gauge("db_pool_overflow", "DB connections opened beyond the pool size"))
+LOOP_LAG = registry.register(Gauge(
+    "event_loop_lag_seconds", "Latest event loop scheduling delay", merge="max"
+))
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits"""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            with span("db.pool.checkout", "internal"):
+                return super().connect()
+        finally:
+            POOL_CHECKOUT.observe(time.perf_counter() - started)
+
+
+def update_pool_gauges(pool) -> None:
+    """Refresh pool gauges from a QueuePool"""
+    if isinstance(pool, QueuePool):
+        POOL_SIZE.set(pool.size())
+        POOL_CHECKED_OUT.set(pool.checkedout())
+        POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+
+# Endpoint -> route path template
+_templates: dict = {}
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route that handled the request"""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    template = _templates.get(endpoint)
+    if template is None:
+        template = "unmatched"
+        for route in scope["app"].routes:
+            if getattr(route, "endpoint", None) is endpoint or (
+                isinstance(route, Mount) and route.app is endpoint
+            ):
+                template = route.path_format
+                break
+        _templates[endpoint] = template
+    return template
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request counts and latency"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_template(scope)
+            REQUESTS.inc((scope["method"], route, str(status_code)))
+            LATENCY.observe(time.perf_counter() - started, (scope["method"], route))
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(settings.METRICS_DIR, f"metrics-{pid}.json")
+
+
+def write_snapshot(snapshot: dict) -> None:
+    """Write this worker's metrics where other workers can merge them"""
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    path = _snapshot_path(os.getpid())
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Counters and histograms of exited workers, merged into one snapshot
+RETIRED_FILENAME = "metrics-retired.json"
+
+
+def _load_snapshot(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _retire_snapshot(path: str) -> None:
+    """Fold a dead worker's counters and histograms into the retired snapshot"""
+    # Claim the file first so concurrent scrapes fold it only once
+    claimed = f"{path}.{os.getpid()}.retiring"
+    try:
+        os.rename(path, claimed)
+    except FileNotFoundError:
+        return
+    retired_path = os.path.join(settings.METRICS_DIR, RETIRED_FILENAME)
+    with open(os.path.join(settings.METRICS_DIR, "metrics-retired.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        dead = _load_snapshot(claimed) or {}
+        counters = {name: family for name, family in dead.items() if family.get("kind") != "gauge"}
+        merged = merge_snapshots([_load_snapshot(retired_path) or {}, counters])
+        tmp = f"{retired_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(to_snapshot(merged), f)
+        os.replace(tmp, retired_path)
+        os.remove(claimed)
+
+
+def collect_snapshots() -> list[dict]:
+    """Snapshots of every live worker (this one taken fresh) and of retired ones"""
+    own = registry.snapshot()
+    if not settings.METRICS_DIR or not os.path.isdir(settings.METRICS_DIR):
+        return [own]
+
+    snapshots = [own]
+    for filename in os.listdir(settings.METRICS_DIR):
+        pid_part = filename[len("metrics-"):-len(".json")]
+        if not (filename.startswith("metrics-") and filename.endswith(".json") and pid_part.isdigit()):
+            # Not a worker snapshot (editor backups, copies, ...)
+            continue
+        pid = int(pid_part)
+        if pid == os.getpid():
+            continue
+        path = os.path.join(settings.METRICS_DIR, filename)
+        if not _pid_alive(pid):
+            _retire_snapshot(path)
+            continue
+        snapshot = _load_snapshot(path)
+        if snapshot is not None:
+            snapshots.append(snapshot)
+
+    retired = _load_snapshot(os.path.join(settings.METRICS_DIR, RETIRED_FILENAME))
+    if retired is not None:
+        snapshots.append(retired)
+    return snapshots
+
+
+def merge_snapshots(snapshots: Iterable[dict]) -> dict:
+    """Combine worker snapshots into one"""
+    merged: dict = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            target = merged.setdefault(name, {**family, "values": {}})
+            values = target["values"]
+            for labels, value in family["values"]:
+                key = tuple(labels)
+                if key not in values:
+                    values[key] = list(value) if isinstance(value, list) else value
+                elif family["kind"] == "histogram":
+                    values[key] = [a + b for a, b in zip(values[key], value)]
+                elif family["kind"] == "gauge" and family.get("merge") == "max":
+                    values[key] = max(values[key], value)
+                else:
+                    values[key] += value
+    return merged
+
+
+def to_snapshot(merged: dict) -> dict:
+    """Turn merge_snapshots() output back into the snapshot file format"""
+    return {
+        name: {**family, "values": [[list(labels), value] for labels, value in family["values"].items()]}
+        for name, family in merged.items()
+    }
+
+
+def _format_labels(names: list, values: Iterable, extra: Optional[tuple] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render(merged: dict) -> str:
+    """Prometheus text exposition format (0.0.4)"""
+    lines = []
+    for name, family in merged.items():
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['kind']}")
+        names = family["labelnames"]
+        for labels, value in sorted(family["values"].items()):
+            if family["kind"] != "histogram":
+                lines.append(f"{name}{_format_labels(names, labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(family["buckets"] + ["+Inf"], value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(names, labels, ('le', bound))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(names, labels)} {value[-1]}")
+            lines.append(f"{name}_count{_format_labels(names, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+async def run_background_tasks(interval: float = 0.5) -> None:
+    """
+    Measure event-loop lag and periodically flush this worker's snapshot
+
+    Lag is how late a sleep of `interval` seconds wakes up: a busy or
+    blocked event loop delays every coroutine by the same amount.
+    """
+    from app.db import engine
+
+    loop = asyncio.get_running_loop()
+    last_flush = 0.0
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        LOOP_LAG.set(max(loop.time() - expected, 0.0))
+        if settings.METRICS_DIR and loop.time() - last_flush >= settings.METRICS_FLUSH_INTERVAL:
+            last_flush = loop.time()
+            update_pool_gauges(engine.pool)
+            # Copy on the loop thread; only the file write is offloaded
+            snapshot = json.loads(json.dumps(registry.snapshot()))
+            await asyncio.to_thread(write_snapshot, snapshot)
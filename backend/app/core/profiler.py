@@ -0,0 +1,278 @@
+"""
+Statistical sampling profiler for live workers
+
+A daemon thread wakes every `interval` seconds, reads the current Python
+stack of every other thread (sys._current_frames) and counts identical
+stacks. Idle threads (event loop waiting in select, pool workers waiting
+for work) are skipped. Results are written as collapsed stacks, one
+`frame;frame;frame count` line per stack, which flamegraph.pl and
+speedscope read directly.
+
+Ways to start it:
+
+- GET /admin/profile?seconds=N profiles the whole worker for N seconds
+- POST /admin/profile/route samples only while a random fraction of
+  requests to one route template are in flight
+- SIGUSR2 profiles the worker for PROFILE_SIGNAL_SECONDS
+
+When no profile is running, the only cost is ProfilerMiddleware checking
+one module attribute per request.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Optional
+import asyncio
+import os
+import random
+import re
+import signal
+import sys
+import sysconfig
+import threading
+import time
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+DEFAULT_INTERVAL = 0.005  # seconds between samples
+
+# Innermost frames of threads that are waiting for work
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+_PATH_PREFIXES = sorted(
+    {p for p in (sysconfig.get_paths()["purelib"], sysconfig.get_paths()["stdlib"], os.getcwd()) if p},
+    key=len,
+    reverse=True
+)
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another one is running"""
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):].lstrip(os.sep)
+    return filename
+
+
+class SamplingProfiler:
+    """Samples the stacks of all other threads from a background thread"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, gate: Optional[Callable[[], bool]] = None):
+        self.interval = interval
+        self.gate = gate  # sample only while gate() is true
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self._labels: dict = {}  # code object -> frame label
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if self.gate is not None and not self.gate():
+                continue
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.stacks[";".join(reversed(frames))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Collapsed-stack text, heaviest stacks first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def save(self, directory: Optional[str] = None) -> str:
+        """Write the collapsed stacks to PROFILE_DIR and return the path"""
+        directory = directory or settings.PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(directory, f"profile-{os.getpid()}-{stamp}.collapsed")
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+        return path
+
+
+class RouteSampling:
+    """Profile state for requests to one route template"""
+
+    def __init__(self, app, route: str, sample_rate: float):
+        self.route = route
+        self.sample_rate = sample_rate
+        self.in_flight = 0
+        self.sampled_requests = 0
+        self.path_regex = None
+        for candidate in app.routes:
+            if getattr(candidate, "path_format", None) == route:
+                self.path_regex = candidate.path_regex
+                break
+        if self.path_regex is None:
+            # Templates as typed by the caller, e.g. /api/v1/stylists/{stylist_id}
+            self.path_regex = re.compile("^" + re.sub(r"\\{[^/]+\\}", "[^/]+", re.escape(route)) + "$")
+
+    def matches(self, path: str) -> bool:
+        return self.path_regex.match(path) is not None
+
+
+_lock = threading.Lock()
+_current: Optional[SamplingProfiler] = None
+_route_sampling: Optional[RouteSampling] = None
+_last_output: Optional[str] = None
+
+
+def _begin(profiler: SamplingProfiler) -> None:
+    global _current
+    with _lock:
+        if _current is not None:
+            raise ProfilerBusy("A profile is already running")
+        _current = profiler
+    profiler.start()
+
+
+def _end(profiler: SamplingProfiler) -> str:
+    global _current, _route_sampling, _last_output
+    profiler.stop()
+    try:
+        _last_output = profiler.save()
+        return _last_output
+    finally:
+        with _lock:
+            _current = None
+            _route_sampling = None
+
+
+def profile_status() -> dict:
+    """What is being profiled right now, and where the last result went"""
+    current, sampling = _current, _route_sampling
+    return {
+        "running": current is not None,
+        "started_at": current.started_at if current else None,
+        "samples": current.samples if current else None,
+        "route": sampling.route if sampling else None,
+        "sampled_requests": sampling.sampled_requests if sampling else None,
+        "last_output": _last_output,
+    }
+
+
+def start_profile(interval: float = DEFAULT_INTERVAL) -> SamplingProfiler:
+    """Start profiling the whole worker; finish with finish_profile()"""
+    profiler = SamplingProfiler(interval)
+    _begin(profiler)
+    return profiler
+
+
+def finish_profile(profiler: SamplingProfiler) -> str:
+    """Stop a profile and return the path of its collapsed-stack file"""
+    return _end(profiler)
+
+
+def start_route_profile(
+    app,
+    route: str,
+    sample_rate: float,
+    seconds: float,
+    interval: float = DEFAULT_INTERVAL
+) -> RouteSampling:
+    """
+    Sample stacks while chosen requests to `route` are in flight
+
+    Other requests interleaved on the same event loop can show up in the
+    samples; their share shrinks as the sampled traffic grows.
+    """
+    global _route_sampling
+    sampling = RouteSampling(app, route, sample_rate)
+    profiler = SamplingProfiler(interval, gate=lambda: sampling.in_flight > 0)
+    _begin(profiler)
+    _route_sampling = sampling
+    timer = threading.Timer(seconds, _end, args=(profiler,))
+    timer.daemon = True
+    timer.start()
+    return sampling
+
+
+class ProfilerMiddleware:
+    """Marks sampled requests while a route profile is running"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        sampling = _route_sampling
+        if (
+            sampling is None
+            or scope["type"] != "http"
+            or not sampling.matches(scope["path"])
+            or random.random() >= sampling.sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        sampling.in_flight += 1
+        sampling.sampled_requests += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            sampling.in_flight -= 1
+
+
+def _start_signal_profile() -> None:
+    try:
+        profiler = start_profile()
+    except ProfilerBusy:
+        return
+    timer = threading.Timer(settings.PROFILE_SIGNAL_SECONDS, _end, args=(profiler,))
+    timer.daemon = True
+    timer.start()
+
+
+def install_signal_handler(loop: Optional[asyncio.AbstractEventLoop] = None) -> bool:
+    """
+    Profile for PROFILE_SIGNAL_SECONDS on SIGUSR2 (`kill -USR2 <pid>`)
+
+    The handler is registered with the event loop, so the profile starts
+    from a loop callback: a plain signal handler would take the
+    non-reentrant profiler lock on top of whatever the interrupted thread
+    holds, and could deadlock.
+    """
+    if not hasattr(signal, "SIGUSR2") or threading.current_thread() is not threading.main_thread():
+        return False
+    loop = loop or asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGUSR2, _start_signal_profile)
+    return True
@@ -0,0 +1,180 @@
+"""
+Read-model projections maintained on write
+
+The stylist card (app.models.StylistCard) is rebuilt inside the same
+transaction whenever a stylist, its salon or one of its services is
+flushed through the ORM. Bulk Core statements bypass the session hooks;
+call refresh_stylist_cards() after those.
+
+Run `python -m app.core.projections` to rebuild every card.
+"""
+from datetime import datetime
+from itertools import chain
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, event, insert, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.salon import Salon
+from app.models.stylist import Stylist, Service
+from app.models.stylist_card import StylistCard
+
+
+# Stylists rebuilt per round trip during a refresh
+REFRESH_BATCH_SIZE = 500
+
+_stylists = Stylist.__table__
+_salons = Salon.__table__
+_services = Service.__table__
+_cards = StylistCard.__table__
+
+
+def _service_json(row) -> dict:
+    """Serialize a service row the way ServiceResponse expects it"""
+    return {
+        "id": row.id,
+        "stylist_id": row.stylist_id,
+        "name": row.name,
+        "description": row.description,
+        "category": row.category,
+        "duration_minutes": row.duration_minutes,
+        "price": row.price,
+        "image_url": row.image_url,
+        "is_active": row.is_active,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+    }
+
+
+def _build_cards(connection: Connection, stylist_ids: list) -> list[dict]:
+    """Build card rows for a batch of stylist ids (two queries)"""
+    stylist_rows = connection.execute(
+        select(
+            _stylists,
+            _salons.c.name.label("salon_name"),
+            _salons.c.address.label("salon_address"),
+            _salons.c.city.label("salon_city"),
+            _salons.c.state.label("salon_state"),
+            _salons.c.latitude,
+            _salons.c.longitude,
+        )
+        .select_from(_stylists.outerjoin(_salons, _salons.c.id == _stylists.c.salon_id))
+        .where(_stylists.c.id.in_(stylist_ids))
+    ).all()
+
+    services_by_stylist: dict[str, list] = {}
+    service_rows = connection.execute(
+        select(_services)
+        .where(_services.c.stylist_id.in_(stylist_ids), _services.c.is_active == True)
+        .order_by(_services.c.created_at, _services.c.id)
+    ).all()
+    for row in service_rows:
+        services_by_stylist.setdefault(row.stylist_id, []).append(row)
+
+    now = datetime.utcnow()
+    cards = []
+    for row in stylist_rows:
+        services = services_by_stylist.get(row.id, [])
+        prices = [s.price for s in services]
+        location = f"{row.salon_city}, {row.salon_state}" if row.salon_name is not None else None
+        cards.append({
+            "id": row.id,
+            "user_id": row.user_id,
+            "salon_id": row.salon_id,
+            "name": row.name,
+            "bio": row.bio,
+            "specialties": row.specialties,
+            "years_experience": row.years_experience,
+            "profile_image_url": row.profile_image_url,
+            "portfolio_images": row.portfolio_images,
+            "rating": row.rating,
+            "review_count": row.review_count,
+            "base_price": row.base_price,
+            "min_price": min(prices) if prices else None,
+            "max_price": max(prices) if prices else None,
+            "is_active": row.is_active,
+            "is_verified": row.is_verified,
+            "salon_name": row.salon_name,
+            "salon_address": row.salon_address,
+            "salon_city": row.salon_city,
+            "salon_state": row.salon_state,
+            "location": location,
+            "latitude": row.latitude,
+            "longitude": row.longitude,
+            "service_categories": sorted({s.category for s in services}),
+            "services": [_service_json(s) for s in services],
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "refreshed_at": now,
+        })
+    return cards
+
+
+def refresh_stylist_cards(connection: Connection, stylist_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Rebuild stylist cards for the given stylist ids, or for every stylist
+    when stylist_ids is None. Cards of deleted stylists are removed.
+    Returns the number of cards written.
+    """
+    if stylist_ids is None:
+        connection.execute(delete(_cards))
+        ids = connection.execute(select(_stylists.c.id).order_by(_stylists.c.id)).scalars().all()
+    else:
+        ids = sorted(set(stylist_ids))
+        if not ids:
+            return 0
+
+    written = 0
+    for start in range(0, len(ids), REFRESH_BATCH_SIZE):
+        batch = ids[start:start + REFRESH_BATCH_SIZE]
+        cards = _build_cards(connection, batch)
+        if stylist_ids is not None:
+            connection.execute(delete(_cards).where(_cards.c.id.in_(batch)))
+        if cards:
+            connection.execute(insert(_cards), cards)
+        written += len(cards)
+    return written
+
+
+def _touched_stylist_ids(session: Session) -> set:
+    """Collect stylist ids whose card is affected by the pending flush"""
+    stylist_ids = set()
+    salon_ids = set()
+
+    modified = (obj for obj in session.dirty if session.is_modified(obj))
+    for obj in chain(session.new, modified, session.deleted):
+        if isinstance(obj, Stylist):
+            stylist_ids.add(obj.id)
+        elif isinstance(obj, Service):
+            stylist_ids.add(obj.stylist_id)
+            # A service moved to another stylist changes both cards
+            stylist_ids.update(inspect(obj).attrs.stylist_id.history.deleted or ())
+        elif isinstance(obj, Salon):
+            salon_ids.add(obj.id)
+
+    if salon_ids:
+        stylist_ids.update(
+            session.connection().execute(
+                select(_stylists.c.id).where(_stylists.c.salon_id.in_(salon_ids))
+            ).scalars()
+        )
+
+    stylist_ids.discard(None)
+    return stylist_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_cards_after_flush(session: Session, flush_context) -> None:
+    """Keep stylist cards in step with ORM writes, in the same transaction"""
+    stylist_ids = _touched_stylist_ids(session)
+    if stylist_ids:
+        refresh_stylist_cards(session.connection(), stylist_ids)
+
+
+if __name__ == "__main__":
+    from app.db import engine
+
+    with engine.begin() as connection:
+        count = refresh_stylist_cards(connection)
+    print(f"✅ Rebuilt {count} stylist cards")
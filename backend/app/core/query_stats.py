@@ -0,0 +1,226 @@
+"""
+Per-request SQL instrumentation
+
+Engine-level cursor events count statements and time spent in the
+database; the same listeners open the SQL spans of traced requests. Counts are collected into the QueryStats object of the current
+request (held in a context variable, which follows the request into
+threadpool workers) and reported by QueryStatsMiddleware as a
+Server-Timing header:
+
+    Server-Timing: db;dur=3.42;desc="4 queries", app;dur=11.80
+
+Streamed bodies (NDJSON) run their queries after the headers are sent,
+so they carry no Server-Timing header rather than a count of 0.
+
+Statements slower than SLOW_QUERY_MS are logged to the "app.sql.slow"
+logger with their parameters redacted to type names.
+
+query_budget() and assert_query_budget() let tests and scripts assert how
+many statements a block of code or a route may issue.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.tracing import start_sql_span
+
+
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+# Longest statement text written to the slow log
+SLOW_LOG_MAX_STATEMENT = 2000
+
+
+class QueryStats:
+    """Statement count and cumulative database time"""
+
+    def __init__(self, keep_statements: bool = False):
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.statements: Optional[list[str]] = [] if keep_statements else None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        if self.statements is not None:
+            self.statements.append(statement)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block issues more statements (or DB time) than allowed"""
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+# Process-wide collectors opened by query_budget(); they see statements from
+# every thread, e.g. the server thread behind a TestClient
+_budgets: list[QueryStats] = []
+_budgets_lock = threading.Lock()
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats of the request being served, if any"""
+    return _request_stats.get()
+
+
+def redact_params(parameters: Any) -> Any:
+    """Replace bound values with their type names"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: report the batch shape only
+            return f"<{len(parameters)} parameter sets>"
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append((time.perf_counter(), start_sql_span(conn, statement)))
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    started, sql_span = conn.info["query_start"].pop()
+    elapsed = time.perf_counter() - started
+    if sql_span is not None:
+        sql_span.end()
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if _budgets:
+        with _budgets_lock:
+            for budget in _budgets:
+                budget.record(statement, elapsed)
+
+    if settings.SLOW_QUERY_MS is not None and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        slow_query_logger.warning(
+            "slow query (%.1f ms): %s params=%s",
+            elapsed * 1000,
+            statement[:SLOW_LOG_MAX_STATEMENT],
+            redact_params(parameters)
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_timer(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        _, sql_span = connection.info["query_start"].pop()
+        if sql_span is not None:
+            sql_span.status = "error"
+            sql_span.attributes["error"] = type(exception_context.original_exception).__name__
+            sql_span.end()
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware adding per-request DB stats as Server-Timing"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Sub-requests dispatched by /batch roll up into the parent request
+        parent = _request_stats.get()
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        start_message: Optional[Message] = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Held until the first body chunk shows whether the body is streamed
+                start_message = message
+                return
+            if start_message is not None:
+                if message["type"] == "http.response.body" and not message.get("more_body", False):
+                    headers = MutableHeaders(scope=start_message)
+                    headers.append(
+                        "Server-Timing",
+                        f'db;dur={stats.duration_ms:.2f};desc="{stats.count} queries", '
+                        f"app;dur={(time.perf_counter() - started) * 1000:.2f}"
+                    )
+                await send(start_message)
+                start_message = None
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            if parent is not None:
+                parent.count += stats.count
+                parent.duration += stats.duration
+
+
+@contextmanager
+def query_budget(max_queries: int, max_duration_ms: Optional[float] = None) -> Iterator[QueryStats]:
+    """
+    Count every statement issued while the block runs and fail if it
+    issues more than max_queries (or spends more than max_duration_ms)
+
+        with query_budget(3):
+            client.get("/api/v1/stylists")
+    """
+    stats = QueryStats(keep_statements=True)
+    with _budgets_lock:
+        _budgets.append(stats)
+    try:
+        yield stats
+    finally:
+        with _budgets_lock:
+            _budgets.remove(stats)
+
+    if stats.count > max_queries:
+        listing = "\n".join(f"  {i}. {s}" for i, s in enumerate(stats.statements, 1))
+        raise QueryBudgetExceeded(f"{stats.count} queries issued, budget is {max_queries}:\n{listing}")
+    if max_duration_ms is not None and stats.duration_ms > max_duration_ms:
+        raise QueryBudgetExceeded(
+            f"{stats.duration_ms:.1f} ms spent in the database, budget is {max_duration_ms} ms"
+        )
+
+
+_SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def assert_query_budget(response, max_queries: int, max_duration_ms: Optional[float] = None) -> None:
+    """
+    Check a response's Server-Timing header against a query budget
+
+    Works for in-process clients and live servers alike. Streamed
+    responses have no header; use query_budget() for those.
+    """
+    match = _SERVER_TIMING_DB.search(response.headers.get("server-timing", ""))
+    if match is None:
+        raise QueryBudgetExceeded("response has no db Server-Timing entry")
+    duration_ms, count = float(match.group(1)), int(match.group(2))
+    if count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{response.request.url.path} issued {count} queries, budget is {max_queries}"
+        )
+    if max_duration_ms is not None and duration_ms > max_duration_ms:
+        raise QueryBudgetExceeded(
+            f"{response.request.url.path} spent {duration_ms:.1f} ms in the database, "
+            f"budget is {max_duration_ms} ms"
+        )
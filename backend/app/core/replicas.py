@@ -0,0 +1,234 @@
+"""
+Read-replica routing
+
+With DATABASE_READ_URLS set, get_read_db (app.db) hands GET endpoints a
+session on one of the replicas, picked round-robin. A replica is skipped:
+
+- for REPLICA_RETRY_SECONDS after a connection to it fails
+- while its replication lag is above REPLICA_MAX_LAG_SECONDS
+
+and the primary serves reads when no replica is usable. A background task
+started with the app checks each replica (connect, and on PostgreSQL
+measure the replay lag) every REPLICA_CHECK_INTERVAL seconds, so picking
+one never waits on the network; a replica is only used once it has passed
+a check. Connection errors during a request also take it out of rotation.
+
+Read-your-writes: ReadYourWritesMiddleware sets a short-lived cookie on
+any response whose request committed a write through a Session. While the
+cookie is valid (READ_YOUR_WRITES_SECONDS), that client's reads go to the
+primary, so it never sees a replica that has not caught up yet.
+
+To try it locally, point DATABASE_READ_URLS at a second database, e.g.
+DATABASE_URL=sqlite:///./primary.db DATABASE_READ_URLS=sqlite:///./replica.db;
+reads then show the second file's rows except right after a write.
+"""
+from contextvars import ContextVar
+from http.cookies import SimpleCookie
+from itertools import count
+from typing import Optional
+import asyncio
+import logging
+import threading
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+COOKIE_NAME = "zelux_primary"
+
+# (in recovery, replayed everything received, seconds since the last replayed commit)
+_PG_LAG = text(
+    "SELECT pg_is_in_recovery(), "
+    "pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn(), "
+    "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+)
+
+
+def replication_lag(in_recovery: bool, caught_up: Optional[bool], replay_age: Optional[float]) -> float:
+    """
+    Seconds a replica is behind, from the _PG_LAG row
+
+    The age of the last replayed commit only means lag while replay is
+    behind what was received; a caught-up replica of an idle primary has
+    an old replay timestamp but no lag. caught_up is NULL when WAL comes
+    from an archive rather than streaming, and the age is used then.
+    """
+    if not in_recovery or caught_up:
+        return 0.0
+    return max(float(replay_age or 0), 0.0)
+
+
+class Replica:
+    """One read replica and what is known about its health"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.failed_until = 0.0
+        self.lag: Optional[float] = None
+        event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, exception_context) -> None:
+        if exception_context.is_disconnect or exception_context.connection is None:
+            self.mark_failed(exception_context.original_exception)
+
+    def mark_failed(self, error) -> None:
+        if self.failed_until <= time.monotonic():
+            logger.warning("Read replica %s unavailable: %s", self.engine.url.host or self.engine.url, error)
+        self.failed_until = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+        # Unusable after the retry window until a check succeeds again
+        self.lag = None
+
+    def check_lag(self) -> None:
+        """Measure replication lag (0 outside PostgreSQL) or mark the replica failed"""
+        try:
+            with self.engine.connect() as connection:
+                if self.engine.dialect.name == "postgresql":
+                    self.lag = replication_lag(*connection.execute(_PG_LAG).one())
+                else:
+                    self.lag = 0.0
+        except Exception as e:
+            self.mark_failed(e)
+
+    @property
+    def usable(self) -> bool:
+        """From the last check; does no I/O"""
+        return (
+            self.failed_until <= time.monotonic()
+            and self.lag is not None
+            and self.lag <= settings.REPLICA_MAX_LAG_SECONDS
+        )
+
+
+class ReplicaSet:
+    """Round-robin over the usable replicas"""
+
+    def __init__(self, engines: list):
+        self.replicas = [Replica(engine) for engine in engines]
+        self._next = count()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self) -> Optional[Engine]:
+        """Engine of the next usable replica, or None to use the primary"""
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = self.replicas[next(self._next) % len(self.replicas)]
+            if replica.usable:
+                return replica.engine
+        return None
+
+    async def check(self) -> None:
+        """Check every replica outside its retry window, in parallel threads"""
+        now = time.monotonic()
+        await asyncio.gather(*[
+            asyncio.to_thread(replica.check_lag)
+            for replica in self.replicas
+            if replica.failed_until <= now
+        ])
+
+    async def run_checks(self) -> None:
+        """Re-check the replicas every REPLICA_CHECK_INTERVAL seconds, forever"""
+        while True:
+            await asyncio.sleep(settings.REPLICA_CHECK_INTERVAL)
+            await self.check()
+
+
+class _RequestWrites:
+    __slots__ = ("wrote",)
+
+    def __init__(self):
+        self.wrote = False
+
+
+# Per request: whether reads must go to the primary, and whether the
+# request committed a write. Both follow the request into worker threads.
+_prefer_primary: ContextVar[bool] = ContextVar("prefer_primary", default=False)
+_request_writes: ContextVar[Optional[_RequestWrites]] = ContextVar("request_writes", default=None)
+
+
+def prefer_primary() -> bool:
+    """True when the current request's reads should go to the primary"""
+    return _prefer_primary.get()
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware pinning a client's reads to the primary after it writes"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        pinned = False
+        for key, value in scope["headers"]:
+            if key == b"cookie" and COOKIE_NAME.encode() in value:
+                morsel = SimpleCookie(value.decode("latin-1")).get(COOKIE_NAME)
+                try:
+                    pinned = morsel is not None and float(morsel.value) > time.time()
+                except ValueError:
+                    pinned = False
+                break
+
+        writes = _RequestWrites()
+        primary_token = _prefer_primary.set(pinned)
+        writes_token = _request_writes.set(writes)
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and writes.wrote:
+                window = settings.READ_YOUR_WRITES_SECONDS
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{COOKIE_NAME}={time.time() + window:.0f}; Max-Age={window:.0f}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _prefer_primary.reset(primary_token)
+            _request_writes.reset(writes_token)
+
+
+@event.listens_for(Session, "before_flush")
+def _refuse_replica_writes(session: Session, flush_context, instances) -> None:
+    if session.info.get("replica") and (session.new or session.dirty or session.deleted):
+        raise RuntimeError("Cannot write through a read-replica session; use get_db")
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flush(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_bulk_write(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_request_write(session: Session) -> None:
+    if session.info.pop("wrote", False):
+        writes = _request_writes.get()
+        if writes is not None:
+            writes.wrote = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_write(session: Session) -> None:
+    session.info.pop("wrote", None)
@@ -0,0 +1,85 @@
+"""
+Fast JSON serialization for API responses
+
+Handlers validate their rows once against the response schema (straight
+from ORM attributes) and hand the result to pydantic-core, which emits
+JSON bytes directly. Returning the bytes as a Response skips FastAPI's
+second validation pass against response_model and the stdlib encoder;
+response_model stays on the route for the OpenAPI schema.
+
+Everything else goes through ORJSONResponse, the app's default class.
+"""
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel, TypeAdapter
+import orjson
+
+from app.core.tracing import span
+
+
+# Media type clients send in Accept to opt into row-per-line streaming
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request) -> bool:
+    """True when the client asked for newline-delimited JSON"""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+class JSONBytesResponse(Response):
+    """Response for a body that is already serialized JSON"""
+    media_type = "application/json"
+
+
+@lru_cache(maxsize=None)
+def get_adapter(schema: Any) -> TypeAdapter:
+    """Pre-built validator/serializer for a response schema"""
+    return TypeAdapter(schema)
+
+
+def serialize(schema: Any, value: Any) -> bytes:
+    """
+    Validate value against schema once (from attributes) and return JSON bytes
+
+    Instances of the schema itself are serialized without re-validation.
+    """
+    adapter = get_adapter(schema)
+    with span("serialize") as current:
+        if current is not None:
+            current.attributes["schema"] = getattr(schema, "__name__", None) if isinstance(schema, type) else str(schema)
+        if not (isinstance(schema, type) and isinstance(value, schema)):
+            value = adapter.validate_python(value, from_attributes=True)
+        return adapter.dump_json(value)
+
+
+def json_response(schema: Any, value: Any, response: Optional[Response] = None) -> JSONBytesResponse:
+    """
+    Serialize value with the schema's pre-built serializer
+
+    Pass the route's `response` so headers set by dependencies (ETag,
+    Last-Modified) are carried over to the returned response.
+    """
+    return bytes_response(serialize(schema, value), response)
+
+
+def bytes_response(body: bytes, response: Optional[Response] = None) -> JSONBytesResponse:
+    """Wrap serialized JSON, keeping headers set on the route's `response`"""
+    headers = dict(response.headers) if response is not None else None
+    if headers:
+        headers.pop("content-length", None)
+    return JSONBytesResponse(content=body, headers=headers)
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def render_json(value: Any) -> bytes:
+    """Serialize an arbitrary value (dicts, lists, models, datetimes) with orjson"""
+    if isinstance(value, BaseModel):
+        return value.__pydantic_serializer__.to_json(value)
+    return orjson.dumps(value, default=_orjson_default)
@@ -0,0 +1,124 @@
+"""
+Single-flight request coalescing
+
+When several coroutines ask for the same key at once, only the first
+(the leader) runs the computation; the others await the leader's future
+and receive the same result or exception. If the leader is cancelled
+(e.g. its client disconnected), the cancellation is not passed on: one
+of the waiters takes over and runs the computation itself. Per-key
+counters record how many calls were coalesced.
+
+Use SingleFlight.do() directly, the @singleflight decorator on async
+route handlers, or Depends(get_singleflight) inside a handler.
+"""
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+import asyncio
+import functools
+import json
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+
+# Keys whose counters are kept (least recently used keys are dropped)
+MAX_TRACKED_KEYS = 1024
+
+# Result handed to waiters when the leader stopped without an outcome
+_LEADER_GONE = object()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key"""
+
+    def __init__(self, max_tracked_keys: int = MAX_TRACKED_KEYS):
+        self.max_tracked_keys = max_tracked_keys
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._counters: OrderedDict = OrderedDict()
+
+    def _count(self, key: Hashable, field: str) -> None:
+        counters = self._counters.pop(key, None) or {"calls": 0, "coalesced": 0}
+        counters[field] += 1
+        self._counters[key] = counters
+        while len(self._counters) > self.max_tracked_keys:
+            self._counters.popitem(last=False)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() once per key among concurrent callers"""
+        while (future := self._inflight.get(key)) is not None:
+            self._count(key, "coalesced")
+            # Shield so a cancelled waiter does not cancel the shared result
+            result = await asyncio.shield(future)
+            if result is not _LEADER_GONE:
+                return result
+            # The leader was cancelled; the first waiter back becomes leader
+
+        self._count(key, "calls")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved when nobody was waiting
+            future.exception()
+            raise
+        except BaseException:
+            # Cancellation belongs to this caller only
+            future.set_result(_LEADER_GONE)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    def stats(self, key: Optional[Hashable] = None) -> dict:
+        """Counters for one key, or for every tracked key"""
+        if key is not None:
+            return dict(self._counters.get(key, {"calls": 0, "coalesced": 0}))
+        return {k: dict(v) for k, v in self._counters.items()}
+
+    @property
+    def total_coalesced(self) -> int:
+        return sum(c["coalesced"] for c in self._counters.values())
+
+
+# Process-wide group shared by the cache layer and route handlers
+default_group = SingleFlight()
+
+
+def get_singleflight() -> SingleFlight:
+    """Dependency returning the shared single-flight group"""
+    return default_group
+
+
+def singleflight(name: Optional[str] = None, group: Optional[SingleFlight] = None):
+    """
+    Coalesce concurrent calls of an async route handler with equal arguments
+
+    Sessions, requests and responses are ignored when building the key.
+    """
+    def decorator(func):
+        key_prefix = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            params = {
+                k: v for k, v in kwargs.items()
+                if not isinstance(v, (Session, Request, Response))
+            }
+            key = f"{key_prefix}:{json.dumps(params, sort_keys=True, default=str)}"
+            result = await (group or default_group).do(key, lambda: func(*args, **kwargs))
+            if isinstance(result, Response):
+                # Every coalesced request gets its own response object
+                return Response(
+                    content=result.body,
+                    status_code=result.status_code,
+                    headers=dict(result.headers)
+                )
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,109 @@
+"""
+Streaming helpers for large result sets
+
+Rows are read through a server-side cursor (yield_per) and handed out in
+fixed-size batches, so memory stays bounded no matter the result size.
+Each stream opens its own read session (a replica when configured)
+because the response body is produced after the request's session has
+been released.
+
+Endpoints that support `Accept: application/x-ndjson` return
+ndjson_response(), which writes one JSON object per line.
+"""
+from datetime import date, datetime
+from typing import Any, Iterator, Optional, Sequence
+import json
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+import orjson
+
+from app.core.serialization import NDJSON_MEDIA_TYPE, get_adapter
+from app.db import read_session
+
+
+# Rows fetched from the cursor per batch
+STREAM_BATCH_SIZE = 500
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps fallback for values found in database rows"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def stream_row_batches(
+    statement: Select,
+    batch_size: int = STREAM_BATCH_SIZE,
+    scalars: bool = False
+) -> Iterator[Sequence]:
+    """
+    Execute a Core or ORM select and yield its rows in batches
+
+    With scalars=True the first column of each row is yielded instead
+    (the entity, for select(Model)).
+    """
+    with read_session() as db:
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        if scalars:
+            result = result.scalars()
+        for partition in result.partitions():
+            yield partition
+
+
+def stream_json_array(statement: Select, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Yield the rows of a Core select as the comma-separated items of a JSON
+    array (without the surrounding brackets), one chunk per batch
+    """
+    first = True
+    for rows in stream_row_batches(statement, batch_size):
+        chunk = ",".join(json.dumps(row._asdict(), default=json_default) for row in rows)
+        yield (chunk if first else "," + chunk).encode()
+        first = False
+
+
+def stream_ndjson(
+    statement: Select,
+    schema: Any = None,
+    batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[bytes]:
+    """
+    Yield newline-delimited JSON, one chunk per batch
+
+    With a schema, statement selects ORM entities that are serialized
+    through the schema; without one, Core rows are written column by column.
+    """
+    if schema is not None:
+        adapter = get_adapter(schema)
+        for entities in stream_row_batches(statement, batch_size, scalars=True):
+            yield b"".join(
+                adapter.dump_json(adapter.validate_python(entity, from_attributes=True)) + b"\n"
+                for entity in entities
+            )
+    else:
+        for rows in stream_row_batches(statement, batch_size):
+            yield b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+
+
+def ndjson_response(
+    statement: Select,
+    schema: Any = None,
+    response: Optional[Response] = None
+) -> StreamingResponse:
+    """
+    Stream a select as NDJSON
+
+    Pass the route's `response` so headers set by dependencies (ETag,
+    Last-Modified) are carried over.
+    """
+    headers = dict(response.headers) if response is not None else None
+    if headers:
+        headers.pop("content-length", None)
+    return StreamingResponse(
+        stream_ndjson(statement, schema),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers=headers
+    )
@@ -0,0 +1,338 @@
+"""
+Lightweight request tracing
+
+A trace is started for each sampled HTTP request by TracingMiddleware and
+collects spans for:
+
+- the request itself (server span, named after the route template)
+- each route: dependency resolution, the handler and response
+  serialization (routers are built with traced_router())
+- the handler call
+- connection checkout and every SQL statement (started from the engine
+  listeners in app.core.query_stats)
+- outbound HTTP made with traced_http_client()
+- anything wrapped in `with span("name"):`
+
+W3C `traceparent` is honoured on incoming requests (trace id, parent and
+sampled flag) and injected into outbound requests. Finished traces go to
+the configured exporter: TRACE_EXPORTER=none (default, tracing off),
+stdout or file (JSON lines in TRACE_FILE). Other exporters can be plugged
+in with set_exporter(). TRACE_SAMPLE_RATE picks the share of requests
+without a traceparent that are traced.
+
+With no trace in progress, span() costs one context variable lookup.
+"""
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+import asyncio
+import functools
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+from fastapi import APIRouter
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+# Longest statement text recorded on a SQL span
+MAX_STATEMENT_LENGTH = 500
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "attributes", "status", "start", "_started", "duration")
+
+    def __init__(self, trace: "Trace", name: str, kind: str, parent_id: Optional[str], attributes: dict):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.status = "ok"
+        self.start = time.time_ns()
+        self._started = time.perf_counter()
+        self.duration: Optional[float] = None
+
+    def end(self) -> None:
+        self.duration = time.perf_counter() - self._started
+        self.trace.spans.append(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """Finished spans of one trace, exported together"""
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.spans: list[Span] = []
+
+
+class Exporter(ABC):
+    """Sink for finished traces"""
+
+    @abstractmethod
+    def export(self, spans: list[Span]) -> None:
+        ...
+
+
+class StdoutExporter(Exporter):
+    def export(self, spans: list[Span]) -> None:
+        sys.stdout.write("".join(json.dumps(s.to_dict(), default=str) + "\n" for s in spans))
+        sys.stdout.flush()
+
+
+class FileExporter(Exporter):
+    """Appends spans as JSON lines"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        lines = "".join(json.dumps(s.to_dict(), default=str) + "\n" for s in spans)
+        with self._lock, open(self.path, "a") as f:
+            f.write(lines)
+
+
+_exporter: Optional[Exporter] = None
+_exporter_configured = False
+
+
+def get_exporter() -> Optional[Exporter]:
+    """Exporter from settings unless one was set explicitly (None = off)"""
+    global _exporter, _exporter_configured
+    if not _exporter_configured:
+        if settings.TRACE_EXPORTER == "stdout":
+            _exporter = StdoutExporter()
+        elif settings.TRACE_EXPORTER == "file":
+            _exporter = FileExporter(settings.TRACE_FILE)
+        _exporter_configured = True
+    return _exporter
+
+
+def set_exporter(exporter: Optional[Exporter]) -> None:
+    """Plug in an exporter (None turns tracing off)"""
+    global _exporter, _exporter_configured
+    _exporter = exporter
+    _exporter_configured = True
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_child(name: str, kind: str = "internal", attributes: Optional[dict] = None) -> Optional[Span]:
+    """Open a child of the current span (None when not tracing); call end() on it"""
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, kind, parent.span_id, attributes or {})
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Optional[Span]]:
+    """Trace the enclosed block as a child of the current span"""
+    child = start_child(name, kind, attributes)
+    if child is None:
+        yield None
+        return
+    token = _current_span.set(child)
+    try:
+        yield child
+    except HTTPException as e:
+        # 304s and 4xx raised by handlers and dependencies are normal outcomes
+        child.attributes["http.status_code"] = e.status_code
+        if e.status_code >= 500:
+            child.status = "error"
+        raise
+    except BaseException as e:
+        child.status = "error"
+        child.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple[str, str, bool]]:
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header"""
+    match = _TRACEPARENT.match(header.strip().lower()) if header else None
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware opening the server span of sampled requests"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        exporter = get_exporter()
+        if scope["type"] != "http" or exporter is None or _current_span.get() is not None:
+            # Off, or a /batch sub-request already inside the parent's trace
+            await self.app(scope, receive, send)
+            return
+
+        header = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                header = value.decode("latin-1")
+                break
+        incoming = parse_traceparent(header)
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id = None, None
+            sampled = random.random() < settings.TRACE_SAMPLE_RATE
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(trace_id)
+        server = Span(trace, f"{scope['method']} {scope['path']}", "server", parent_id, {
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        })
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = _current_span.set(server)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_span.reset(token)
+            from app.core.metrics import route_template
+
+            route = route_template(scope)
+            server.name = f"{scope['method']} {route}"
+            server.attributes["http.route"] = route
+            server.attributes["http.status_code"] = status_code
+            if status_code >= 500:
+                server.status = "error"
+            server.end()
+            exporter.export(trace.spans)
+
+
+def _traced_call(func, name: str):
+    """Wrap an endpoint function in a handler span, keeping sync/async"""
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def traced(*args, **kwargs):
+            with span(name, "internal"):
+                return await func(*args, **kwargs)
+    else:
+        @functools.wraps(func)
+        def traced(*args, **kwargs):
+            with span(name, "internal"):
+                return func(*args, **kwargs)
+    return traced
+
+
+class TracedRoute(APIRoute):
+    """
+    APIRoute adding a span per route (dependency resolution, handler and
+    serialization) and a nested span for the handler call itself
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, endpoint, **kwargs)
+        # Only the call is wrapped; self.endpoint stays the original function
+        self.dependant.call = _traced_call(self.dependant.call, f"handler {endpoint.__name__}")
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        name = f"route {self.path_format}"
+
+        async def traced_handler(request):
+            with span(name, "internal"):
+                return await handler(request)
+
+        return traced_handler
+
+
+def traced_router(**kwargs) -> APIRouter:
+    """APIRouter whose routes are TracedRoutes; takes the usual arguments"""
+    return APIRouter(route_class=TracedRoute, **kwargs)
+
+
+def start_sql_span(conn, statement: str) -> Optional[Span]:
+    """Span for a statement about to run (None when not tracing); call end() on it"""
+    if _current_span.get() is None:
+        return None
+    return start_child("sql", "client", {
+        "db.system": conn.dialect.name,
+        "db.statement": statement[:MAX_STATEMENT_LENGTH],
+    })
+
+
+def traced_http_client(**kwargs):
+    """
+    httpx.AsyncClient whose requests are traced and carry traceparent
+
+    Accepts the usual AsyncClient arguments.
+    """
+    import httpx
+
+    class TracingTransport(httpx.AsyncBaseTransport):
+        def __init__(self, inner: httpx.AsyncBaseTransport):
+            self.inner = inner
+
+        async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+            with span(f"HTTP {request.method}", "client", **{
+                "http.method": request.method,
+                "http.url": str(request.url.copy_with(query=None)),
+            }) as child:
+                if child is not None:
+                    request.headers["traceparent"] = child.traceparent
+                response = await self.inner.handle_async_request(request)
+                if child is not None:
+                    child.attributes["http.status_code"] = response.status_code
+                    if response.status_code >= 500:
+                        child.status = "error"
+                return response
+
+        async def aclose(self) -> None:
+            await self.inner.aclose()
+
+    transport = kwargs.pop("transport", None) or httpx.AsyncHTTPTransport()
+    return httpx.AsyncClient(transport=TracingTransport(transport), **kwargs)
@@ -1,32 +1,142 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import Request
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
+import glob
+import inspect
+import logging
+import os
+import re
+import time
 
 from app.core.config import settings
+from app.core.metrics import InstrumentedQueuePool
+from app.core.replicas import ReplicaSet, prefer_primary
+
+
+logger = logging.getLogger(__name__)
+
+
+def create_db_engine(url: str) -> Engine:
+    """
+    Engine with the pool settings from config
+    
+    Instead of pool_pre_ping (a round trip on every checkout), only
+    connections idle for DB_POOL_PING_IDLE seconds are pinged, and TCP
+    keepalives let the OS notice dead peers. Nothing relies on session
+    state or server-side prepared statements, so PgBouncer in transaction
+    mode (e.g. Neon's -pooler endpoints) works unchanged.
+    """
+    connect_args = {}
+    if make_url(url).get_backend_name() == "postgresql":
+        connect_args["connect_timeout"] = settings.DB_CONNECT_TIMEOUT
+        if settings.DB_TCP_KEEPALIVES_IDLE is not None:
+            connect_args.update(
+                keepalives=1,
+                keepalives_idle=settings.DB_TCP_KEEPALIVES_IDLE,
+                keepalives_interval=10,
+                keepalives_count=3
+            )
+    
+    db_engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,  # Records checkout wait for /metrics
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_use_lifo=True,  # Reuse warm connections; idle extras age out
+        connect_args=connect_args,
+        echo=settings.DB_ECHO
+    )
+    
+    if settings.DB_POOL_PING_IDLE is not None:
+        event.listen(db_engine, "checkin", _mark_checkin)
+        event.listen(db_engine, "checkout", _ping_if_idle)
+    return db_engine
+
+
+def _mark_checkin(dbapi_connection, connection_record) -> None:
+    connection_record.info["checked_in_at"] = time.monotonic()
+
+
+def _ping_if_idle(dbapi_connection, connection_record, connection_proxy) -> None:
+    """Check connections that sat idle long enough to have been dropped"""
+    checked_in_at = connection_record.info.get("checked_in_at")
+    if checked_in_at is None or time.monotonic() - checked_in_at < settings.DB_POOL_PING_IDLE:
+        return
+    try:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        finally:
+            cursor.close()
+    except Exception as e:
+        # The pool discards this connection and retries with a fresh one
+        raise exc.DisconnectionError(f"Idle connection failed ping: {e}")
+
+
+def warm_pool(db_engine: Engine, connections: int) -> int:
+    """
+    Open `connections` pooled connections in parallel, so the first
+    requests do not pay for connection setup (or a Neon compute resume).
+    Returns how many were opened.
+    """
+    connections = min(connections, db_engine.pool.size())
+    if connections <= 0:
+        return 0
+    
+    def connect(_):
+        try:
+            return db_engine.connect()
+        except exc.SQLAlchemyError as e:
+            logger.warning("Pool warmup connection failed: %s", e)
+            return None
+    
+    with ThreadPoolExecutor(connections) as executor:
+        opened = [c for c in executor.map(connect, range(connections)) if c is not None]
+    for connection in opened:
+        connection.close()
+    return len(opened)
 
 
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=True  # Set to False in production
-)
+engine = create_db_engine(settings.DATABASE_URL)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read replicas used by get_read_db (empty when DATABASE_READ_URLS is unset)
+replicas = ReplicaSet([
+    create_db_engine(url.strip())
+    for url in (settings.DATABASE_READ_URLS or "").split(",")
+    if url.strip()
+])
+
 # Create Base class for models
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
+def get_db(request: Request) -> Generator[Session, None, None]:
     """
     Dependency to get database session
+    
+    Sub-requests dispatched by the /batch endpoint carry a shared session
+    in their request state. It is only reused by coroutine endpoints: they
+    run on the event loop and never interleave mid-statement, whereas
+    plain `def` endpoints run in worker threads and get their own session.
     """
+    shared = request.scope.get("state", {}).get("shared_db")
+    if shared is not None and inspect.iscoroutinefunction(request.scope.get("endpoint")):
+        yield shared
+        return
+    
     db = SessionLocal()
     try:
         yield db
@@ -34,9 +144,123 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def read_session() -> Session:
+    """
+    Session for reads: on the next usable replica, or on the primary when
+    there is none or the current client has just written (see
+    app.core.replicas). Replica sessions refuse to flush changes.
+    """
+    replica = replicas.pick() if replicas and not prefer_primary() else None
+    if replica is None:
+        return SessionLocal()
+    db = SessionLocal(bind=replica)
+    db.info["replica"] = True
+    return db
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Dependency to get a read-only database session (see read_session)
+    
+    For endpoints that never write. Reuses the /batch shared session the
+    same way as get_db.
+    """
+    shared = request.scope.get("state", {}).get("shared_db")
+    if shared is not None and inspect.iscoroutinefunction(request.scope.get("endpoint")):
+        yield shared
+        return
+    
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic", "versions")
+
+_REVISION = re.compile(r"^revision\s*(?::[^=]*)?=\s*['\"]([^'\"]+)['\"]", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision\s*(?::[^=]*)?=\s*(.+)$", re.MULTILINE)
+
+
+def migration_heads(versions_dir: str = MIGRATIONS_DIR) -> set:
+    """
+    Head revisions of the Alembic scripts, read from the files' revision
+    identifiers without importing Alembic or the scripts themselves
+    """
+    revisions, parents = set(), set()
+    for path in glob.glob(os.path.join(versions_dir, "*.py")):
+        with open(path) as f:
+            source = f.read()
+        revision = _REVISION.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION.search(source)
+        if down_revision:
+            parents.update(re.findall(r"['\"]([^'\"]+)['\"]", down_revision.group(1)))
+    return revisions - parents
+
+
+def check_schema_version(db_engine: Engine, mode: str = "warn") -> bool:
+    """
+    Compare the database's alembic_version with the migration heads
+    
+    One query instead of create_all's per-table reflection. mode "error"
+    raises on a mismatch (the worker refuses to start), "warn" logs it,
+    "off" skips the check. Returns True when the schema is current.
+    """
+    if mode == "off":
+        return True
+    heads = migration_heads()
+    if not heads:
+        logger.debug("No migration scripts in %s; schema check skipped", MIGRATIONS_DIR)
+        return True
+    
+    try:
+        with db_engine.connect() as connection:
+            current = set(connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalars())
+    except exc.SQLAlchemyError:
+        current = set()
+    if current == heads:
+        return True
+    
+    message = (
+        f"Database schema is at {', '.join(sorted(current)) or 'no Alembic revision'}, "
+        f"expected {', '.join(sorted(heads))}; run `alembic upgrade head`"
+    )
+    if mode == "error":
+        raise RuntimeError(message)
+    logger.warning(message)
+    return False
+
+
+_session_hooks_registered = False
+
+
+def register_session_hooks() -> None:
+    """
+    Install the Session event hooks that keep the stylist card projection
+    and the response cache current
+
+    Runs when this module is imported, so every session from SessionLocal
+    has them, whatever the entry point. Calling it again does nothing.
+    """
+    global _session_hooks_registered
+    if _session_hooks_registered:
+        return
+    _session_hooks_registered = True
+    # The hook modules import the models, which only need Base from here
+    from app.core import cache, projections  # noqa: F401
+
+
 def init_db():
     """
     Initialize database - create all tables
+    
+    For local scripts (seed_data.py); the app expects Alembic migrations.
     """
     Base.metadata.create_all(bind=engine)
 
+
+register_session_hooks()
@@ -2,14 +2,59 @@
 Zelux API - Main FastAPI application
 A stylist-first platform connecting customers with professional stylists
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+import asyncio
 import os
 
+from app.core.cache import get_response_cache
+from app.core.compression import CompressionMiddleware, PrecompressedStaticFiles
 from app.core.config import settings
-from app.routers import auth, salons, stylists, pros, ai, feed, pro_dashboard
-from app.db import init_db
+from app.core.lazy_routes import include_router_lazily
+from app.core.metrics import MetricsMiddleware, run_background_tasks
+from app.core.profiler import ProfilerMiddleware, install_signal_handler
+from app.core.tracing import TracingMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.replicas import ReadYourWritesMiddleware
+from app.routers import auth, salons, stylists, services, pros, feed, pro_dashboard, batch, sync, metrics
+from app.db import check_schema_version, engine, replicas, warm_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Check the schema revision and warm the connection pool on startup;
+    background tasks started here are cancelled on shutdown
+    """
+    print("🚀 Starting Zelux API...")
+    # Tables come from Alembic (`alembic upgrade head`), not create_all;
+    # one query confirms the database is at the latest revision while
+    # pooled connections open for the first requests
+    await asyncio.gather(
+        asyncio.to_thread(check_schema_version, engine, settings.SCHEMA_CHECK),
+        asyncio.to_thread(warm_pool, engine, settings.DB_POOL_WARMUP),
+        replicas.check()
+    )
+    tasks = []
+    if replicas:
+        # Lag probes run here, never on the request path
+        app.state.replica_task = asyncio.create_task(replicas.run_checks())
+        tasks.append(app.state.replica_task)
+    # Refuses an in-process cache that several workers could not invalidate
+    get_response_cache()
+    # Event-loop lag sampling and per-worker metrics snapshots
+    app.state.metrics_task = asyncio.create_task(run_background_tasks())
+    tasks.append(app.state.metrics_task)
+    # `kill -USR2 <pid>` profiles this worker (see app.core.profiler)
+    install_signal_handler()
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
 
 
 # Create FastAPI application
@@ -18,7 +63,9 @@ app = FastAPI(
     version="1.0.0",
     description="Backend API for Zelux - Stylist-First Beauty Platform",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS - Allow all localhost/127.0.0.1 with any port
@@ -30,29 +77,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON and text responses (gzip, or brotli when installed)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    thread_threshold=settings.COMPRESSION_THREAD_THRESHOLD,
+)
+
+# After a write, pin the client's reads to the primary for a few seconds
+# (only matters with DATABASE_READ_URLS set)
+if settings.DATABASE_READ_URLS:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Report per-request query count and DB time in Server-Timing
+app.add_middleware(QueryStatsMiddleware)
+
+# Per-route request counts and latency histograms for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Marks requests sampled by a route profile (no-op when none is running)
+app.add_middleware(ProfilerMiddleware)
+
+# Request tracing (off unless TRACE_EXPORTER is set); outermost so the
+# server span covers every other middleware
+app.add_middleware(TracingMiddleware)
+
 # Create media directory if it doesn't exist
 os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
 
-# Mount static files for media
-app.mount(settings.MEDIA_URL, StaticFiles(directory=settings.MEDIA_ROOT), name="media")
+# Mount static files for media (serves .br/.gz siblings built by
+# `python -m app.core.compression`)
+app.mount(settings.MEDIA_URL, PrecompressedStaticFiles(directory=settings.MEDIA_ROOT), name="media")
 
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_STR)
 app.include_router(salons.router, prefix=settings.API_V1_STR)
 app.include_router(stylists.router, prefix=settings.API_V1_STR)
+app.include_router(services.router, prefix=settings.API_V1_STR)
 app.include_router(pros.router, prefix=settings.API_V1_STR)  # Mobile app compatibility (/pros alias)
 app.include_router(pro_dashboard.router, prefix=settings.API_V1_STR)  # Pro app endpoints
-app.include_router(ai.router, prefix=settings.API_V1_STR)
+include_router_lazily(app, "app.routers.ai", "/ai", prefix=settings.API_V1_STR)  # Imported on first use
 app.include_router(feed.router, prefix=settings.API_V1_STR)
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database on startup"""
-    print("🚀 Starting Zelux API...")
-    print("📊 Initializing database...")
-    init_db()
-    print("✅ Database initialized!")
+app.include_router(batch.router, prefix=settings.API_V1_STR)  # Multiplexed GETs
+app.include_router(sync.router, prefix=settings.API_V1_STR)  # Mobile delta sync
+include_router_lazily(app, "app.routers.admin", "/admin", prefix=settings.API_V1_STR)  # Admin-only, imported on first use
+app.include_router(metrics.router)  # Prometheus scrape endpoint
 
 
 @app.get("/")
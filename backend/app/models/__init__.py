@@ -4,11 +4,13 @@ Models package - exports all database models
 from app.models.user import User
 from app.models.salon import Salon
 from app.models.stylist import Stylist, Service
+from app.models.stylist_card import StylistCard
 
 __all__ = [
     "User",
     "Salon",
     "Stylist",
     "Service",
+    "StylistCard",
 ]
 
@@ -0,0 +1,68 @@
+"""
+Stylist card projection for Zelux platform
+
+A denormalized, one-row-per-stylist read model holding everything the
+stylist list and detail endpoints return. Rows are maintained by
+app.core.projections whenever stylists, salons or services are written.
+"""
+from sqlalchemy import Column, String, Text, Float, DateTime, Boolean, Integer, JSON, Index
+from datetime import datetime
+
+from app.db import Base
+
+
+class StylistCard(Base):
+    """Denormalized stylist card (stylist + salon location + service summary)"""
+    __tablename__ = "stylist_cards"
+
+    # Same primary key as the stylist it projects
+    id = Column(String, primary_key=True)
+    user_id = Column(String, nullable=True)
+    salon_id = Column(String, nullable=False, index=True)
+
+    # Profile
+    name = Column(String, nullable=False)
+    bio = Column(Text, nullable=True)
+    specialties = Column(JSON, nullable=True)
+    years_experience = Column(Integer, default=0)
+
+    # Media
+    profile_image_url = Column(String, nullable=True)
+    portfolio_images = Column(JSON, nullable=True)
+
+    # Ratings
+    rating = Column(Float, default=0.0)
+    review_count = Column(Integer, default=0)
+
+    # Pricing
+    base_price = Column(Float, default=0.0)
+    min_price = Column(Float, nullable=True)
+    max_price = Column(Float, nullable=True)
+
+    # Status
+    is_active = Column(Boolean, default=True)
+    is_verified = Column(Boolean, default=False)
+
+    # Salon location
+    salon_name = Column(String, nullable=True)
+    salon_address = Column(String, nullable=True)
+    salon_city = Column(String, nullable=True)
+    salon_state = Column(String, nullable=True)
+    location = Column(String, nullable=True)  # "City, State" format
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+
+    # Services
+    service_categories = Column(JSON, nullable=True)  # Sorted list of active categories
+    services = Column(JSON, nullable=True)  # Active services, ServiceResponse-shaped
+
+    # Timestamps (copied from the stylist row)
+    created_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+
+    # Last time the projection row was rebuilt
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_stylist_cards_active_rating", "is_active", "rating"),
+    )
@@ -1,7 +1,15 @@
 """
 Routers package - exports all API routers
+
+Submodules are imported on attribute access, so importing one router
+does not import the others (ai and admin are loaded lazily by app.main).
 """
-from app.routers import auth, salons, stylists, ai, feed
+import importlib
+
+__all__ = ["auth", "salons", "stylists", "services", "ai", "feed", "batch", "sync", "admin", "metrics"]
 
-__all__ = ["auth", "salons", "stylists", "ai", "feed"]
 
+def __getattr__(name: str):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,215 @@
+"""
+Admin router - operational endpoints restricted to admin users
+"""
+from fastapi import Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from typing import AsyncIterator, Optional
+import anyio.from_thread
+import anyio.to_thread
+import asyncio
+import io
+import logging
+import os
+import time
+
+from app.core import bulk_import, profiler
+from app.core.auth import require_admin
+from app.core.config import settings
+from app.core.streaming import ndjson_response
+from app.core.tracing import traced_router
+from app.db import engine
+from app.models import Salon, Stylist, Service, StylistCard
+from app.schemas import ImportFailure, ImportResponse
+
+
+import_logger = logging.getLogger("app.import")
+
+router = traced_router(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+# Tables that can be exported, by URL name
+EXPORT_TABLES = {
+    "salons": Salon.__table__,
+    "stylists": Stylist.__table__,
+    "services": Service.__table__,
+    "stylist_cards": StylistCard.__table__,
+}
+
+
+@router.get("/export/{entity}")
+def export_entity(entity: str):
+    """
+    Export every row of a table as NDJSON (one JSON object per line)
+    
+    Rows are read through a server-side cursor and streamed in batches,
+    so memory use does not grow with the table size.
+    """
+    table = EXPORT_TABLES.get(entity)
+    if table is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown export: {entity}"
+        )
+    
+    response = ndjson_response(select(table).order_by(table.c.id))
+    response.headers["Content-Disposition"] = f'attachment; filename="{entity}.ndjson"'
+    return response
+
+
+class _RequestBodyReader(io.RawIOBase):
+    """
+    Blocking file object over an async request body, for use in an anyio
+    worker thread: each read pulls the next chunk from the event loop, so
+    the upload is never held in memory or on disk as a whole
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    async def _next_chunk(self) -> bytes:
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = anyio.from_thread.run(self._next_chunk)
+            if not chunk:
+                return 0
+            self._pending = chunk
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _run_upload_import(entity: str, upload: _RequestBodyReader, fmt: str, reject_path: str):
+    def report(entity: str, read: int, rejected: int) -> None:
+        import_logger.info("import %s: %d rows read, %d rejected", entity, read, rejected)
+    
+    stream = io.TextIOWrapper(io.BufferedReader(upload), encoding="utf-8-sig", newline="")
+    with open(reject_path, "w") as rejects:
+        # engine.begin() rolls the whole run back if anything raises
+        with engine.begin() as connection:
+            return bulk_import.run_import(connection, {entity: (stream, fmt)}, rejects, report)
+
+
+def _import_failed(status_code: int, message: str, error: Exception, reject_path: str) -> HTTPException:
+    """Structured error for a rolled-back import; keeps a non-empty reject file"""
+    if os.path.exists(reject_path) and os.path.getsize(reject_path) == 0:
+        os.remove(reject_path)
+    reject_file = reject_path if os.path.exists(reject_path) else None
+    detail = ImportFailure(message=message, error=type(error).__name__, reject_file=reject_file)
+    return HTTPException(status_code=status_code, detail=detail.model_dump())
+
+
+@router.post("/import/{entity}", response_model=ImportResponse)
+async def import_upload(
+    entity: str,
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Default: from Content-Type")
+):
+    """
+    Bulk import users, salons, stylists or services from the request body
+    
+    The body is a CSV or NDJSON file, read as it arrives. Rows are
+    validated as they are read and loaded in one transaction (see
+    app.core.bulk_import); rows that fail validation are skipped and
+    written to a reject file under IMPORT_DIR. Progress is logged to the
+    "app.import" logger.
+    
+    A database error rolls the whole import back and is answered with an
+    ImportFailure detail (409 for constraint violations, 500 otherwise).
+    """
+    if entity not in bulk_import.ENTITIES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown import: {entity}"
+        )
+    try:
+        fmt = format or bulk_import.detect_format(None, request.headers.get("content-type"))
+    except bulk_import.ImportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    
+    os.makedirs(settings.IMPORT_DIR, exist_ok=True)
+    reject_path = os.path.join(settings.IMPORT_DIR, f"rejects-{entity}-{int(time.time() * 1000)}.ndjson")
+    upload = _RequestBodyReader(request.stream())
+    try:
+        summaries, cards = await anyio.to_thread.run_sync(_run_upload_import, entity, upload, fmt, reject_path)
+    except IntegrityError as e:
+        import_logger.warning("import %s rolled back: %s", entity, e.orig)
+        raise _import_failed(
+            status.HTTP_409_CONFLICT, f"Import rolled back: {e.orig}", e, reject_path
+        )
+    except SQLAlchemyError as e:
+        import_logger.exception("import %s rolled back", entity)
+        raise _import_failed(
+            status.HTTP_500_INTERNAL_SERVER_ERROR, "Import rolled back: database error", e, reject_path
+        )
+    
+    bulk_import.invalidate_caches([entity])
+    if not summaries[0].rejected:
+        os.remove(reject_path)
+        reject_path = None
+    return ImportResponse(results=summaries, stylist_cards_refreshed=cards, reject_file=reject_path)
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=300),
+    interval_ms: float = Query(5, ge=1, le=1000)
+):
+    """
+    Profile this worker for `seconds` and return collapsed stacks
+    
+    The output feeds flamegraph.pl or speedscope directly and is also
+    saved under PROFILE_DIR (path in the X-Profile-File header). Only the
+    worker that receives the request is profiled.
+    """
+    try:
+        session = profiler.start_profile(interval_ms / 1000)
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    
+    await asyncio.sleep(seconds)
+    path = await asyncio.to_thread(profiler.finish_profile, session)
+    return PlainTextResponse(session.collapsed(), headers={"X-Profile-File": path})
+
+
+@router.post("/profile/route", status_code=status.HTTP_202_ACCEPTED)
+async def profile_route(
+    request: Request,
+    route: str = Query(..., description="Route template, e.g. /api/v1/stylists/{stylist_id}"),
+    sample_rate: float = Query(0.1, gt=0, le=1),
+    seconds: float = Query(60, gt=0, le=3600),
+    interval_ms: float = Query(5, ge=1, le=1000)
+):
+    """
+    Profile a sampled fraction of requests to one route in the background
+    
+    Stacks are only sampled while a chosen request is in flight. The
+    collapsed-stack file is written to PROFILE_DIR when the time is up;
+    see /admin/profile/status for its path.
+    """
+    try:
+        sampling = profiler.start_route_profile(
+            request.app, route, sample_rate, seconds, interval_ms / 1000
+        )
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    
+    return {"route": sampling.route, "sample_rate": sampling.sample_rate, "seconds": seconds}
+
+
+@router.get("/profile/status")
+async def profile_status():
+    """
+    Current profile (if any) and the path of the last finished one
+    """
+    return profiler.profile_status()
@@ -1,15 +1,16 @@
 """
 AI router - handles AI-powered features (placeholder for Nano Banana integration)
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
+from fastapi import UploadFile, File, HTTPException, status
 from typing import List
 import uuid
 import os
 
 from app.core.config import settings
+from app.core.tracing import traced_router
 
 
-router = APIRouter(prefix="/ai", tags=["AI Features"])
+router = traced_router(prefix="/ai", tags=["AI Features"])
 
 
 @router.post("/preview")
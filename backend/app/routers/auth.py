@@ -1,16 +1,63 @@
 """
 Authentication router - handles user authentication and registration
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.db import get_db
-from app.core.auth import verify_firebase_token, create_access_token
+from app.core.auth import verify_firebase_token, create_access_token, current_user
+from app.core.tracing import traced_router
 from app.models import User
-from app.schemas import UserCreate, UserResponse, TokenResponse
+from app.schemas import UserCreate, UserResponse, UserContext, TokenResponse
 
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = traced_router(prefix="/auth", tags=["Authentication"])
+
+_DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert_user(db: Session, firebase_uid: str, email: str, name: str) -> User:
+    """
+    Return the user for a Firebase uid, creating it if needed
+    
+    Returning users cost one SELECT and write nothing, so logging in does
+    not create a new row version or pin the client to the primary. A new
+    uid is inserted with INSERT ... ON CONFLICT (firebase_uid) DO NOTHING
+    RETURNING on PostgreSQL and SQLite; when a concurrent first login wins
+    the race, nothing is returned and the winner's row is selected, so
+    both get the one row. Existing users keep their stored profile.
+    """
+    existing = select(User).where(User.firebase_uid == firebase_uid)
+    user = db.scalars(existing).first()
+    if user is not None:
+        return user
+    
+    dialect_insert = _DIALECT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        user = User(firebase_uid=firebase_uid, email=email, name=name)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    
+    statement = dialect_insert(User).values(
+        firebase_uid=firebase_uid, email=email, name=name
+    ).on_conflict_do_nothing(index_elements=[User.firebase_uid]).returning(User)
+    user = db.scalars(statement).one_or_none()
+    if user is None:
+        # Lost the race; the other login's row is committed by now
+        user = db.scalars(existing.execution_options(populate_existing=True)).one()
+    # Detached before the commit so it keeps its loaded attributes instead
+    # of being expired and re-selected on first access
+    db.expunge(user)
+    db.commit()
+    return user
 
 
 @router.post("/verify-token", response_model=TokenResponse)
@@ -28,19 +75,15 @@ async def verify_token(
     email = token_data.get("email")
     name = token_data.get("name", email.split("@")[0] if email else "User")
     
-    # Check if user exists
-    user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
-    
-    if not user:
-        # Create new user
-        user = User(
-            firebase_uid=firebase_uid,
-            email=email,
-            name=name
+    try:
+        user = upsert_user(db, firebase_uid, email, name)
+    except IntegrityError:
+        # e.g. the email already belongs to a user with another uid
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A user with this email already exists"
         )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
     
     # Create access token for API
     access_token = create_access_token(
@@ -171,21 +214,8 @@ async def register_user(
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(
-    token_data: dict = Depends(verify_firebase_token),
-    db: Session = Depends(get_db)
-):
+async def get_current_user_info(user: UserContext = Depends(current_user)):
     """
     Get current authenticated user information
     """
-    user_id = token_data.get("sub")
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    return UserResponse.model_validate(user)
-
+    return user
@@ -0,0 +1,147 @@
+"""
+Batch router - bundles several GET calls into one HTTP request
+
+Sub-requests are dispatched straight into the ASGI app (no network hop),
+run concurrently and may share one database session.
+"""
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import json
+
+from app.core.config import settings
+from app.core.tracing import traced_router
+from app.db import read_session
+from app.schemas import MultiplexRequest, MultiplexResponse, SubRequest
+
+
+router = traced_router(prefix="/batch", tags=["Batch"])
+
+# Parent headers that describe the batch body itself, not the sub-requests
+_DROPPED_HEADERS = {b"content-length", b"content-type", b"accept-encoding", b"transfer-encoding"}
+
+
+def _is_dispatchable(path: str) -> bool:
+    """Only API routes are reachable, and /batch may not call itself"""
+    route = path.split("?", 1)[0]
+    return (
+        route.startswith(settings.API_V1_STR + "/")
+        and not route.startswith(settings.API_V1_STR + router.prefix)
+    )
+
+
+def _error(sub: SubRequest, status_code: int, detail: str) -> bytes:
+    """Render a sub-response for a call that was refused or failed"""
+    return json.dumps({
+        "id": sub.id,
+        "status": status_code,
+        "headers": {"content-type": "application/json"},
+        "body": {"detail": detail},
+    }).encode()
+
+
+async def _dispatch(request: Request, sub: SubRequest, shared_db) -> bytes:
+    """
+    Run one GET through the app and render its sub-response
+
+    JSON bodies are spliced in as raw bytes instead of being decoded and
+    re-encoded.
+    """
+    if not _is_dispatchable(sub.path):
+        return _error(sub, 400, "Only GET requests to API routes can be batched")
+
+    path, _, query = sub.path.partition("?")
+    parent = request.scope
+    own = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in sub.headers.items()]
+    # A sub-request's own header replaces the parent's (lookups take the first)
+    replaced = _DROPPED_HEADERS | {k for k, _ in own}
+    headers = [(k, v) for k, v in parent["headers"] if k not in replaced] + own
+    scope = {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": parent.get("scheme", "http"),
+        "server": parent.get("server"),
+        "client": parent.get("client"),
+        "root_path": parent.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": headers,
+        "state": {"shared_db": shared_db},
+    }
+
+    status_code = None
+    response_headers = {}
+    body = bytearray()
+    finished = asyncio.Event()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Streaming responses listen for disconnects; hold them until done
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            for key, value in message.get("headers", []):
+                response_headers[key.decode("latin-1")] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # A failed statement leaves the shared transaction aborted on
+        # PostgreSQL; roll back so the other sub-requests can continue
+        shared_db.rollback()
+        # Whatever was sent before the failure may be a truncated body
+        return _error(sub, 500, "Internal Server Error")
+    finally:
+        finished.set()
+
+    response_headers.pop("content-length", None)
+    if response_headers.get("content-type", "").startswith("application/json") and body:
+        rendered_body = bytes(body)
+    else:
+        rendered_body = json.dumps(body.decode("utf-8", errors="replace") if body else None).encode()
+
+    meta = json.dumps({"id": sub.id, "status": status_code, "headers": response_headers})
+    return meta[:-1].encode() + b', "body": ' + rendered_body + b"}"
+
+
+@router.post("", response_model=MultiplexResponse)
+async def batch_requests(
+    batch: MultiplexRequest,
+    request: Request
+):
+    """
+    Run several GET requests in one round trip
+
+    Sub-requests execute concurrently inside the app and share one
+    database session where that is safe. Responses come back in request
+    order, each with its own status code, headers and body; a sub-request
+    that fails, even midway through a streamed body, comes back as a 500.
+    """
+    # In a worker thread, as FastAPI runs get_read_db for the other routes
+    shared_db = await run_in_threadpool(read_session)
+    try:
+        rendered = await asyncio.gather(
+            *[_dispatch(request, sub, shared_db) for sub in batch.requests]
+        )
+    finally:
+        shared_db.close()
+
+    return Response(
+        content=b'{"responses": [' + b", ".join(rendered) + b"]}",
+        media_type="application/json"
+    )
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import HTTPException
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 
-router = APIRouter(prefix="/feed", tags=["feed"])
+from app.core.tracing import traced_router
+
+router = traced_router(prefix="/feed", tags=["feed"])
 
 
 def _mock_posts() -> List[Dict[str, Any]]:
@@ -0,0 +1,26 @@
+"""
+Metrics router - Prometheus scrape endpoint
+"""
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import collect_snapshots, merge_snapshots, render, update_pool_gauges
+from app.core.tracing import traced_router
+from app.db import engine
+
+
+router = traced_router(tags=["Monitoring"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """
+    Request, DB pool and event-loop metrics in Prometheus text format
+    
+    Merges the snapshots of every live worker when METRICS_DIR is set.
+    Runs on the event loop so the in-memory metrics are read consistently.
+    """
+    update_pool_gauges(engine.pool)
+    return PlainTextResponse(
+        render(merge_snapshots(collect_snapshots())),
+        media_type="text/plain; version=0.0.4"
+    )
@@ -2,13 +2,14 @@
 Pro Dashboard API endpoints for Zelus Pro (Business App)
 Endpoints for stylists and salon owners to manage their business
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import HTTPException, Depends
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, date, timedelta
+from ..core.tracing import traced_router
 from ..db import get_db
 
-router = APIRouter(prefix="/pro", tags=["Pro Dashboard"])
+router = traced_router(prefix="/pro", tags=["Pro Dashboard"])
 
 
 # ==================== DASHBOARD ====================
@@ -2,97 +2,106 @@
 Professionals (pros) router - Mobile app compatibility alias for stylists
 This is essentially the same as stylists but uses /pros path for mobile app
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from app.db import get_db
-from app.models import Stylist, Service, Salon
+from app.core.cache import cached
+from app.core.serialization import json_response, wants_ndjson
+from app.core.singleflight import singleflight
+from app.core.tracing import traced_router
+from app.db import get_read_db
+from app.routers.stylists import (
+    filter_stylist_cards, check_stylist, set_card_validators, stream_stylist_cards,
+    stylist_list_validators, stylist_services_validators
+)
+from app.models import Stylist, Service, StylistCard
 from app.schemas import StylistResponse, StylistDetailResponse, ServiceResponse
 
 
-router = APIRouter(prefix="/pros", tags=["Professionals"])
+router = traced_router(prefix="/pros", tags=["Professionals"])
+
+
+async def pro_validators(pro_id: str, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    check_stylist(request, response, db, pro_id)
+
+
+def pro_services_validators(pro_id: str, db: Session):
+    return stylist_services_validators(pro_id, db)
 
 
 @router.get("", response_model=list[StylistResponse])
+@cached(
+    "pros:list", ttl=60, stale_ttl=300, tags=("stylists",), case_insensitive=("city",),
+    validators=stylist_list_validators, vary="Accept"
+)
 async def list_professionals(
+    response: Response,
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     city: Optional[str] = None,
     service: Optional[str] = None,
     min_rating: Optional[float] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     List all professionals (stylists) with pagination and filters
     Mobile app endpoint
-    """
-    query = db.query(Stylist).filter(Stylist.is_active == True)
-    
-    # Apply filters
-    if city:
-        # Filter by salon city
-        salon_ids = db.query(Salon.id).filter(Salon.city.ilike(f"%{city}%")).all()
-        salon_ids = [s[0] for s in salon_ids]
-        query = query.filter(Stylist.salon_id.in_(salon_ids))
     
-    if min_rating:
-        query = query.filter(Stylist.rating >= min_rating)
+    Send `Accept: application/x-ndjson` to stream every matching
+    professional, one JSON object per line, instead of a page.
+    """
+    if wants_ndjson(request):
+        return stream_stylist_cards(city, min_rating, response)
     
-    # Get total count
-    total = query.count()
+    # Read from the denormalized stylist cards (one row per stylist)
+    query = filter_stylist_cards(db.query(StylistCard), city, min_rating)
     
     # Apply pagination
     offset = (page - 1) * page_size
-    stylists = query.order_by(Stylist.rating.desc()).offset(offset).limit(page_size).all()
+    cards = query.order_by(StylistCard.rating.desc()).offset(offset).limit(page_size).all()
     
-    return [StylistResponse.model_validate(stylist) for stylist in stylists]
+    return json_response(list[StylistResponse], cards, response)
 
 
-@router.get("/{pro_id}", response_model=StylistDetailResponse)
+@router.get("/{pro_id}", response_model=StylistDetailResponse, dependencies=[Depends(pro_validators)])
+@singleflight()
 async def get_professional(
     pro_id: str,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     """
     Get detailed information about a specific professional (stylist)
     Mobile app endpoint
     """
-    stylist = db.query(Stylist).filter(Stylist.id == pro_id).first()
+    # The stylist card already carries salon info, location and services
+    card = db.query(StylistCard).filter(StylistCard.id == pro_id).first()
     
-    if not stylist:
+    if not card:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Professional not found"
         )
     
-    # Get salon information
-    salon = db.query(Salon).filter(Salon.id == stylist.salon_id).first()
-    
-    # Convert to response model
-    stylist_data = StylistResponse.model_validate(stylist)
-    
-    # Add location field for mobile app
-    location = f"{salon.city}, {salon.state}" if salon else None
-    
-    return StylistDetailResponse(
-        **stylist_data.model_dump(),
-        salon_name=salon.name if salon else None,
-        salon_address=salon.address if salon else None,
-        location=location
-    )
+    set_card_validators(response, card)
+    return json_response(StylistDetailResponse, card, response)
 
 
 @router.get("/{pro_id}/services", response_model=list[ServiceResponse])
+@cached("pros:services", ttl=300, stale_ttl=600, tags=("services",), validators=pro_services_validators)
 async def get_professional_services(
     pro_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all services offered by a specific professional (stylist)
     Mobile app endpoint
     """
-    stylist = db.query(Stylist).filter(Stylist.id == pro_id).first()
+    stylist = db.query(Stylist.id).filter(Stylist.id == pro_id).first()
     
     if not stylist:
         raise HTTPException(
@@ -105,5 +114,5 @@ async def get_professional_services(
         Service.is_active == True
     ).all()
     
-    return [ServiceResponse.model_validate(service) for service in services]
+    return json_response(list[ServiceResponse], services, response)
 
@@ -1,39 +1,108 @@
 """
 Salons router - handles salon discovery and details
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import Depends, HTTPException, Request, Response, status, Query
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from app.db import get_db
-from app.models import Salon
-from app.schemas import SalonResponse, SalonListResponse
+from app.core.cache import cached
+from app.core.conditional import make_etag
+from app.core.serialization import bytes_response, json_response, render_json, wants_ndjson
+from app.core.streaming import ndjson_response
+from app.core.tracing import traced_router
+from app.db import get_read_db
+from app.models import Salon, StylistCard
+from app.schemas import (
+    SalonResponse, SalonListResponse, StylistResponse, StylistDetailResponse, ServiceResponse,
+    BatchRequest, SalonBatchResponse
+)
 
 
-router = APIRouter(prefix="/salons", tags=["Salons"])
+router = traced_router(prefix="/salons", tags=["Salons"])
+
+# Fields clients may request from the bundle endpoint
+BUNDLE_SALON_FIELDS = list(SalonResponse.model_fields)
+BUNDLE_STYLIST_FIELDS = [f for f in StylistDetailResponse.model_fields if f != "services"]
+BUNDLE_SERVICE_FIELDS = list(ServiceResponse.model_fields)
+
+
+def _parse_fields(raw: Optional[str], allowed: list[str], name: str) -> list[str]:
+    """
+    Parse a comma-separated sparse field list, always keeping "id"
+    """
+    if not raw:
+        return allowed
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown {name}: {', '.join(unknown)}"
+        )
+    return ["id"] + [f for f in fields if f != "id"]
+
+
+def _filter_salons(query, city: Optional[str], search: Optional[str]):
+    """Apply the public salon list filters to a query"""
+    query = query.filter(Salon.is_active == True)
+    if city:
+        query = query.filter(Salon.city.ilike(f"%{city}%"))
+    if search:
+        query = query.filter(
+            (Salon.name.ilike(f"%{search}%")) |
+            (Salon.description.ilike(f"%{search}%"))
+        )
+    return query
+
+
+def salon_list_validators(db: Session, city: Optional[str] = None, search: Optional[str] = None):
+    """
+    Collection ETag for the salon list: max(updated_at) plus row count
+
+    Runs on cache misses only (see app.core.cache.cached).
+    """
+    last_modified, total = _filter_salons(
+        db.query(func.max(Salon.updated_at), func.count(Salon.id)), city, search
+    ).one()
+    return make_etag("salons", last_modified, total), last_modified
+
+
+def salon_validators(salon_id: str, db: Session):
+    """
+    ETag for a single salon from its id and updated_at
+    """
+    row = db.query(Salon.updated_at).filter(Salon.id == salon_id).first()
+    if row:
+        return make_etag(salon_id, row.updated_at), row.updated_at
+    return None
 
 
 @router.get("", response_model=SalonListResponse)
+@cached(
+    "salons:list", ttl=60, stale_ttl=300, tags=("salons",), case_insensitive=("city", "search"),
+    validators=salon_list_validators, vary="Accept"
+)
 async def list_salons(
+    response: Response,
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     city: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     List all salons with pagination and filters
+    
+    Send `Accept: application/x-ndjson` to stream every matching salon,
+    one JSON object per line, instead of a page.
     """
-    query = db.query(Salon).filter(Salon.is_active == True)
+    if wants_ndjson(request):
+        statement = _filter_salons(select(Salon), city, search)
+        return ndjson_response(statement.order_by(Salon.rating.desc(), Salon.id), SalonResponse, response)
     
-    # Apply filters
-    if city:
-        query = query.filter(Salon.city.ilike(f"%{city}%"))
-    if search:
-        query = query.filter(
-            (Salon.name.ilike(f"%{search}%")) |
-            (Salon.description.ilike(f"%{search}%"))
-        )
+    query = _filter_salons(db.query(Salon), city, search)
     
     # Get total count
     total = query.count()
@@ -42,18 +111,40 @@ async def list_salons(
     offset = (page - 1) * page_size
     salons = query.order_by(Salon.rating.desc()).offset(offset).limit(page_size).all()
     
-    return SalonListResponse(
-        salons=[SalonResponse.model_validate(salon) for salon in salons],
-        total=total,
-        page=page,
-        page_size=page_size
-    )
+    return json_response(SalonListResponse, {
+        "salons": salons,
+        "total": total,
+        "page": page,
+        "page_size": page_size
+    }, response)
+
+
+@router.post("/batch", response_model=SalonBatchResponse)
+async def get_salons_batch(
+    request: BatchRequest,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get several salons by id in a single query
+    
+    Unknown ids are listed in `missing` instead of failing the request.
+    """
+    salons = db.query(Salon).filter(Salon.id.in_(request.ids)).all()
+    items = {salon.id: salon for salon in salons}
+    
+    return json_response(SalonBatchResponse, {
+        "items": items,
+        "missing": [salon_id for salon_id in request.ids if salon_id not in items]
+    })
 
 
 @router.get("/{salon_id}", response_model=SalonResponse)
+@cached("salons:detail", ttl=300, stale_ttl=600, tags=("salons",), validators=salon_validators)
 async def get_salon(
     salon_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     """
     Get detailed information about a specific salon
@@ -66,31 +157,84 @@ async def get_salon(
             detail="Salon not found"
         )
     
-    return SalonResponse.model_validate(salon)
+    return json_response(SalonResponse, salon, response)
 
 
 @router.get("/{salon_id}/stylists")
 async def get_salon_stylists(
     salon_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all stylists for a specific salon
     """
-    from app.models import Stylist
-    from app.schemas import StylistResponse
-    
-    salon = db.query(Salon).filter(Salon.id == salon_id).first()
+    salon = db.query(Salon.id).filter(Salon.id == salon_id).first()
     if not salon:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Salon not found"
         )
     
-    stylists = db.query(Stylist).filter(
-        Stylist.salon_id == salon_id,
-        Stylist.is_active == True
+    # Stylist cards embed services, avoiding a lazy load per stylist
+    cards = db.query(StylistCard).filter(
+        StylistCard.salon_id == salon_id,
+        StylistCard.is_active == True
     ).all()
     
-    return [StylistResponse.model_validate(stylist) for stylist in stylists]
+    return json_response(list[StylistResponse], cards)
 
+
+@router.get("/{salon_id}/bundle")
+async def get_salon_bundle(
+    salon_id: str,
+    salon_fields: Optional[str] = None,
+    stylist_fields: Optional[str] = None,
+    service_fields: Optional[str] = None,
+    include_services: bool = True,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get a salon with its active stylists and their active services in one call
+    
+    Runs two queries regardless of the number of stylists: the salon row
+    and the salon's stylist cards (which already embed active services).
+    Pass comma-separated `salon_fields`, `stylist_fields` and `service_fields`
+    to receive only those columns; "id" is always included.
+    """
+    salon_columns = _parse_fields(salon_fields, BUNDLE_SALON_FIELDS, "salon_fields")
+    stylist_columns = _parse_fields(stylist_fields, BUNDLE_STYLIST_FIELDS, "stylist_fields")
+    service_keys = _parse_fields(service_fields, BUNDLE_SERVICE_FIELDS, "service_fields")
+    
+    salon = db.query(
+        *[getattr(Salon, f) for f in salon_columns]
+    ).filter(Salon.id == salon_id).first()
+    
+    if not salon:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Salon not found"
+        )
+    
+    card_columns = [getattr(StylistCard, f) for f in stylist_columns]
+    if include_services:
+        card_columns.append(StylistCard.services)
+    
+    cards = db.query(*card_columns).filter(
+        StylistCard.salon_id == salon_id,
+        StylistCard.is_active == True
+    ).order_by(StylistCard.rating.desc()).all()
+    
+    stylists = []
+    for card in cards:
+        stylist = {f: getattr(card, f) for f in stylist_columns}
+        if include_services:
+            stylist["services"] = [
+                {k: service.get(k) for k in service_keys}
+                for service in card.services or []
+            ]
+        stylists.append(stylist)
+    
+    return bytes_response(render_json({
+        "salon": dict(salon._mapping),
+        "stylists": stylists,
+    }))
@@ -0,0 +1,33 @@
+"""
+Services router - handles lookups of stylist services
+"""
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from app.core.serialization import json_response
+from app.core.tracing import traced_router
+from app.db import get_read_db
+from app.models import Service
+from app.schemas import ServiceResponse, BatchRequest, ServiceBatchResponse
+
+
+router = traced_router(prefix="/services", tags=["Services"])
+
+
+@router.post("/batch", response_model=ServiceBatchResponse)
+async def get_services_batch(
+    request: BatchRequest,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get several services by id in a single query
+    
+    Unknown ids are listed in `missing` instead of failing the request.
+    """
+    services = db.query(Service).filter(Service.id.in_(request.ids)).all()
+    items = {service.id: service for service in services}
+    
+    return json_response(ServiceBatchResponse, {
+        "items": items,
+        "missing": [service_id for service_id in request.ids if service_id not in items]
+    })
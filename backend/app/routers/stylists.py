@@ -1,95 +1,182 @@
 """
 Stylists router - handles stylist profiles and services
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import Depends, HTTPException, Request, Response, status, Query
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from app.db import get_db
-from app.models import Stylist, Service, Salon
-from app.schemas import StylistResponse, StylistDetailResponse, ServiceResponse
+from app.core.cache import cached
+from app.core.conditional import check_conditional, is_conditional, make_etag, set_validators
+from app.core.serialization import json_response, wants_ndjson
+from app.core.streaming import ndjson_response
+from app.core.singleflight import singleflight
+from app.core.tracing import traced_router
+from app.db import get_read_db
+from app.models import Stylist, Service, StylistCard
+from app.schemas import (
+    StylistResponse, StylistDetailResponse, ServiceResponse,
+    BatchRequest, StylistBatchResponse
+)
 
 
-router = APIRouter(prefix="/stylists", tags=["Stylists"])
+router = traced_router(prefix="/stylists", tags=["Stylists"])
+
+
+def filter_stylist_cards(query, city: Optional[str], min_rating: Optional[float]):
+    """Apply the public stylist list filters to a stylist card query"""
+    query = query.filter(StylistCard.is_active == True)
+    if city:
+        query = query.filter(StylistCard.salon_city.ilike(f"%{city}%"))
+    if min_rating:
+        query = query.filter(StylistCard.rating >= min_rating)
+    return query
+
+
+def stylist_list_validators(db: Session, city: Optional[str] = None, min_rating: Optional[float] = None):
+    """
+    Collection ETag for stylist lists: newest card refresh plus row count
+    
+    Cards are refreshed whenever the stylist, its salon or its services
+    change, so refreshed_at versions the whole card. Runs on cache misses
+    only (see app.core.cache.cached).
+    """
+    last_modified, total = filter_stylist_cards(
+        db.query(func.max(StylistCard.refreshed_at), func.count(StylistCard.id)), city, min_rating
+    ).one()
+    return make_etag("stylists", last_modified, total), last_modified
+
+
+def stream_stylist_cards(city: Optional[str], min_rating: Optional[float], response: Response):
+    """NDJSON stream of every stylist card matching the list filters"""
+    statement = filter_stylist_cards(select(StylistCard), city, min_rating)
+    return ndjson_response(
+        statement.order_by(StylistCard.rating.desc(), StylistCard.id), StylistResponse, response
+    )
+
+
+def check_stylist(request: Request, response: Response, db: Session, stylist_id: str) -> None:
+    """
+    Answer a conditional request for a stylist card with a 304 before the
+    card is loaded. Unconditional requests skip the probe query; the
+    handler sets the validators from the card it reads (set_card_validators).
+    """
+    if not is_conditional(request):
+        return
+    row = db.query(StylistCard.refreshed_at).filter(StylistCard.id == stylist_id).first()
+    if row:
+        check_conditional(request, response, make_etag(stylist_id, row.refreshed_at), row.refreshed_at)
+
+
+def set_card_validators(response: Response, card: StylistCard) -> None:
+    """ETag and Last-Modified of a loaded stylist card"""
+    set_validators(response, make_etag(card.id, card.refreshed_at), card.refreshed_at)
+
+
+def stylist_services_validators(stylist_id: str, db: Session):
+    """Collection ETag for a stylist's active services (cache misses only)"""
+    last_modified, total = db.query(func.max(Service.updated_at), func.count(Service.id)).filter(
+        Service.stylist_id == stylist_id,
+        Service.is_active == True
+    ).one()
+    if total:
+        return make_etag("services", stylist_id, last_modified, total), last_modified
+    return None
+
+
+async def stylist_validators(stylist_id: str, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    check_stylist(request, response, db, stylist_id)
 
 
 @router.get("", response_model=list[StylistResponse])
+@cached(
+    "stylists:list", ttl=60, stale_ttl=300, tags=("stylists",), case_insensitive=("city",),
+    validators=stylist_list_validators, vary="Accept"
+)
 async def list_stylists(
+    response: Response,
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     city: Optional[str] = None,
     service: Optional[str] = None,
     min_rating: Optional[float] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     List all stylists with pagination and filters
     Mobile app compatibility: Also accessible via /pros endpoint
-    """
-    query = db.query(Stylist).filter(Stylist.is_active == True)
     
-    # Apply filters
-    if city:
-        # Filter by salon city
-        salon_ids = db.query(Salon.id).filter(Salon.city.ilike(f"%{city}%")).all()
-        salon_ids = [s[0] for s in salon_ids]
-        query = query.filter(Stylist.salon_id.in_(salon_ids))
-    
-    if min_rating:
-        query = query.filter(Stylist.rating >= min_rating)
+    Send `Accept: application/x-ndjson` to stream every matching stylist,
+    one JSON object per line, instead of a page.
+    """
+    if wants_ndjson(request):
+        return stream_stylist_cards(city, min_rating, response)
     
-    # Get total count
-    total = query.count()
+    # Read from the denormalized stylist cards (one row per stylist)
+    query = filter_stylist_cards(db.query(StylistCard), city, min_rating)
     
     # Apply pagination
     offset = (page - 1) * page_size
-    stylists = query.order_by(Stylist.rating.desc()).offset(offset).limit(page_size).all()
+    cards = query.order_by(StylistCard.rating.desc()).offset(offset).limit(page_size).all()
     
-    return [StylistResponse.model_validate(stylist) for stylist in stylists]
+    return json_response(list[StylistResponse], cards, response)
 
 
-@router.get("/{stylist_id}", response_model=StylistDetailResponse)
+@router.post("/batch", response_model=StylistBatchResponse)
+async def get_stylists_batch(
+    request: BatchRequest,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get several stylists (with salon info and services) by id in a single query
+    
+    Unknown ids are listed in `missing` instead of failing the request.
+    """
+    cards = db.query(StylistCard).filter(StylistCard.id.in_(request.ids)).all()
+    items = {card.id: card for card in cards}
+    
+    return json_response(StylistBatchResponse, {
+        "items": items,
+        "missing": [stylist_id for stylist_id in request.ids if stylist_id not in items]
+    })
+
+
+@router.get("/{stylist_id}", response_model=StylistDetailResponse, dependencies=[Depends(stylist_validators)])
+@singleflight()
 async def get_stylist(
     stylist_id: str,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     """
     Get detailed information about a specific stylist including services
     """
-    stylist = db.query(Stylist).filter(Stylist.id == stylist_id).first()
+    # The stylist card already carries salon info, location and services
+    card = db.query(StylistCard).filter(StylistCard.id == stylist_id).first()
     
-    if not stylist:
+    if not card:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Stylist not found"
         )
     
-    # Get salon information
-    salon = db.query(Salon).filter(Salon.id == stylist.salon_id).first()
-    
-    # Convert to response model
-    stylist_data = StylistResponse.model_validate(stylist)
-    
-    # Add location field for mobile app
-    location = f"{salon.city}, {salon.state}" if salon else None
-    
-    return StylistDetailResponse(
-        **stylist_data.model_dump(),
-        salon_name=salon.name if salon else None,
-        salon_address=salon.address if salon else None,
-        location=location
-    )
+    set_card_validators(response, card)
+    return json_response(StylistDetailResponse, card, response)
 
 
 @router.get("/{stylist_id}/services", response_model=list[ServiceResponse])
+@cached("stylists:services", ttl=300, stale_ttl=600, tags=("services",), validators=stylist_services_validators)
 async def get_stylist_services(
     stylist_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all services offered by a specific stylist
     """
-    stylist = db.query(Stylist).filter(Stylist.id == stylist_id).first()
+    stylist = db.query(Stylist.id).filter(Stylist.id == stylist_id).first()
     
     if not stylist:
         raise HTTPException(
@@ -102,14 +189,14 @@ async def get_stylist_services(
         Service.is_active == True
     ).all()
     
-    return [ServiceResponse.model_validate(service) for service in services]
+    return json_response(list[ServiceResponse], services, response)
 
 
 @router.get("/{stylist_id}/availability")
 async def get_stylist_availability(
     stylist_id: str,
     date: str,  # Format: YYYY-MM-DD
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get available time slots for a stylist on a specific date
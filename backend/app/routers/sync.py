@@ -0,0 +1,94 @@
+"""
+Sync router - delta sync for mobile catalog caches
+"""
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from typing import Iterator, Optional
+from datetime import datetime, timedelta
+import base64
+
+from app.core.streaming import stream_json_array
+from app.core.tracing import traced_router
+from app.models import Salon, Stylist, Service
+
+
+router = traced_router(prefix="/sync", tags=["Sync"])
+
+# Tables exposed to the sync endpoint, in response order
+SYNC_TABLES = {
+    "salons": Salon.__table__,
+    "stylists": Stylist.__table__,
+    "services": Service.__table__,
+}
+
+# Next tokens start slightly in the past so rows committed by transactions
+# that were still open when the sync ran are picked up next time.
+# Clients upsert by id, so the overlap only costs a few duplicate rows.
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+def encode_sync_token(moment: datetime) -> str:
+    """Encode a sync position as an opaque token"""
+    return base64.urlsafe_b64encode(f"v1:{moment.isoformat()}".encode()).decode()
+
+
+def decode_sync_token(token: str) -> datetime:
+    """Decode a token produced by encode_sync_token"""
+    try:
+        version, _, moment = base64.urlsafe_b64decode(token.encode()).decode().partition(":")
+        if version != "v1":
+            raise ValueError(version)
+        return datetime.fromisoformat(moment)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
+
+
+def _sync_body(since: Optional[datetime], next_token: str, entities: list[str]) -> Iterator[bytes]:
+    """Stream the sync document table by table, chunk by chunk"""
+    yield f'{{"next_token": "{next_token}"'.encode()
+    for name in entities:
+        table = SYNC_TABLES[name]
+        statement = select(table).order_by(table.c.updated_at, table.c.id)
+        if since is not None:
+            statement = statement.where(table.c.updated_at >= since)
+        yield f', "{name}": ['.encode()
+        yield from stream_json_array(statement)
+        yield b"]"
+    yield b"}"
+
+
+@router.get("")
+def sync_catalog(
+    since: Optional[str] = None,
+    entities: Optional[str] = None
+):
+    """
+    Get salons, stylists and services changed since the given sync token
+    
+    Omit `since` for a full snapshot. Deactivated rows are included with
+    is_active=false so clients can drop them. Store `next_token` and send
+    it back as `since` on the next launch. `entities` limits the response
+    to a comma-separated subset of salons, stylists and services.
+    """
+    since_at = decode_sync_token(since) if since else None
+    
+    names = list(SYNC_TABLES)
+    if entities:
+        names = [name.strip() for name in entities.split(",") if name.strip()]
+        unknown = [name for name in names if name not in SYNC_TABLES]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown entities: {', '.join(unknown)}"
+            )
+    
+    next_token = encode_sync_token(datetime.utcnow() - SYNC_OVERLAP)
+    
+    return StreamingResponse(
+        _sync_body(since_at, next_token, names),
+        media_type="application/json"
+    )
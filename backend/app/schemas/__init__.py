@@ -2,7 +2,7 @@
 Schemas package - exports all Pydantic schemas
 """
 from app.schemas.user import (
-    UserBase, UserCreate, UserUpdate, UserResponse, TokenResponse
+    UserBase, UserCreate, UserUpdate, UserResponse, UserContext, TokenResponse
 )
 from app.schemas.salon import (
     SalonBase, SalonCreate, SalonUpdate, SalonResponse, SalonListResponse
@@ -11,15 +11,28 @@ from app.schemas.stylist import (
     ServiceBase, ServiceCreate, ServiceUpdate, ServiceResponse,
     StylistBase, StylistCreate, StylistUpdate, StylistResponse, StylistDetailResponse
 )
+from app.schemas.batch import (
+    BatchRequest, SalonBatchResponse, StylistBatchResponse, ServiceBatchResponse,
+    SubRequest, MultiplexRequest, SubResponse, MultiplexResponse
+)
+from app.schemas.imports import (
+    UserImport, SalonImport, StylistImport, ServiceImport, ImportSummary, ImportResponse, ImportFailure
+)
 
 __all__ = [
     # User schemas
-    "UserBase", "UserCreate", "UserUpdate", "UserResponse", "TokenResponse",
+    "UserBase", "UserCreate", "UserUpdate", "UserResponse", "UserContext", "TokenResponse",
     # Salon schemas
     "SalonBase", "SalonCreate", "SalonUpdate", "SalonResponse", "SalonListResponse",
     # Service schemas
     "ServiceBase", "ServiceCreate", "ServiceUpdate", "ServiceResponse",
     # Stylist schemas
     "StylistBase", "StylistCreate", "StylistUpdate", "StylistResponse", "StylistDetailResponse",
+    # Batch schemas
+    "BatchRequest", "SalonBatchResponse", "StylistBatchResponse", "ServiceBatchResponse",
+    "SubRequest", "MultiplexRequest", "SubResponse", "MultiplexResponse",
+    # Import schemas
+    "UserImport", "SalonImport", "StylistImport", "ServiceImport", "ImportSummary", "ImportResponse",
+    "ImportFailure",
 ]
 
@@ -0,0 +1,86 @@
+"""
+Pydantic schemas for batch fetch endpoints
+"""
+from pydantic import BaseModel, field_validator
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.schemas.salon import SalonResponse
+from app.schemas.stylist import ServiceResponse, StylistDetailResponse
+
+
+class BatchRequest(BaseModel):
+    """Schema for fetching several records by id"""
+    ids: List[str]
+    
+    @field_validator("ids")
+    @classmethod
+    def dedupe_ids(cls, ids: List[str]) -> List[str]:
+        """Drop duplicate ids (keeping order) and enforce the batch limit"""
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            raise ValueError("at least one id is required")
+        if len(ids) > settings.BATCH_MAX_IDS:
+            raise ValueError(f"at most {settings.BATCH_MAX_IDS} ids per batch")
+        return ids
+
+
+class SalonBatchResponse(BaseModel):
+    """Schema for batch salon lookup"""
+    items: Dict[str, SalonResponse]
+    missing: List[str] = []
+
+
+class StylistBatchResponse(BaseModel):
+    """Schema for batch stylist lookup"""
+    items: Dict[str, StylistDetailResponse]
+    missing: List[str] = []
+
+
+class ServiceBatchResponse(BaseModel):
+    """Schema for batch service lookup"""
+    items: Dict[str, ServiceResponse]
+    missing: List[str] = []
+
+
+class SubRequest(BaseModel):
+    """A single GET call bundled into a multiplexed /batch request"""
+    id: Optional[str] = None
+    path: str  # Full API path including query string, e.g. "/api/v1/salons?city=NY"
+    headers: Dict[str, str] = {}
+    
+    @field_validator("path")
+    @classmethod
+    def path_is_absolute(cls, path: str) -> str:
+        """Only absolute in-app paths are dispatched"""
+        if not path.startswith("/"):
+            raise ValueError("path must start with '/'")
+        return path
+
+
+class MultiplexRequest(BaseModel):
+    """Schema for the multiplexed /batch endpoint"""
+    requests: List[SubRequest]
+    
+    @field_validator("requests")
+    @classmethod
+    def limit_requests(cls, requests: List[SubRequest]) -> List[SubRequest]:
+        """Enforce the sub-request limit"""
+        if not requests:
+            raise ValueError("at least one request is required")
+        if len(requests) > settings.BATCH_MAX_REQUESTS:
+            raise ValueError(f"at most {settings.BATCH_MAX_REQUESTS} requests per batch")
+        return requests
+
+
+class SubResponse(BaseModel):
+    """Result of one sub-request"""
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str] = {}
+    body: Any = None
+
+
+class MultiplexResponse(BaseModel):
+    """Schema for the multiplexed /batch response, in request order"""
+    responses: List[SubResponse]
@@ -0,0 +1,61 @@
+"""
+Pydantic schemas for bulk import rows
+"""
+from pydantic import BaseModel
+from typing import List, Optional
+
+from app.schemas.user import UserCreate
+from app.schemas.salon import SalonCreate
+from app.schemas.stylist import ServiceCreate, StylistCreate
+
+
+class UserImport(UserCreate):
+    """User row in an import file (matched on email)"""
+    id: Optional[str] = None
+    is_admin: bool = False
+
+
+class SalonImport(SalonCreate):
+    """Salon row in an import file (matched on id)"""
+    id: Optional[str] = None
+    rating: float = 0.0
+    review_count: float = 0
+    is_active: bool = True
+
+
+class StylistImport(StylistCreate):
+    """Stylist row in an import file (matched on id)"""
+    id: Optional[str] = None
+    rating: float = 0.0
+    review_count: int = 0
+    is_active: bool = True
+    is_verified: bool = False
+
+
+class ServiceImport(ServiceCreate):
+    """Service row in an import file (matched on id)"""
+    id: Optional[str] = None
+    is_active: bool = True
+
+
+class ImportSummary(BaseModel):
+    """Outcome of importing one entity"""
+    entity: str
+    read: int
+    loaded: int
+    rejected: int
+    seconds: float
+
+
+class ImportResponse(BaseModel):
+    """Outcome of an import run"""
+    results: List[ImportSummary]
+    stylist_cards_refreshed: int
+    reject_file: Optional[str] = None
+
+
+class ImportFailure(BaseModel):
+    """Why an import run was rolled back"""
+    message: str
+    error: str  # exception class, e.g. IntegrityError
+    reject_file: Optional[str] = None
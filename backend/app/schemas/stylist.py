@@ -97,4 +97,7 @@ class StylistDetailResponse(StylistResponse):
     salon_name: Optional[str] = None
     salon_address: Optional[str] = None
     location: Optional[str] = None  # Mobile app compatibility: "City, State" format
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    service_categories: List[str] = []
 
@@ -3,7 +3,7 @@ Pydantic schemas for User model
 """
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class UserBase(BaseModel):
@@ -40,6 +40,13 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserContext(UserResponse):
+    """Authenticated user resolved by the current_user dependency"""
+    roles: List[str] = []  # "admin", "stylist"
+    stylist_id: Optional[str] = None
+    salon_id: Optional[str] = None
+
+
 class TokenResponse(BaseModel):
     """Schema for token response"""
     access_token: str
@@ -0,0 +1,123 @@
+"""
+Serialization microbenchmark - per-row cost of each response schema
+
+Compares the legacy path (model_validate per row, then FastAPI's
+re-validation against response_model, jsonable_encoder and stdlib json)
+with the single-validation path in app.core.serialization.
+
+Run from backend/: python -m benchmarks.bench_serialization [--rows 100] [--json]
+"""
+from datetime import datetime
+from types import SimpleNamespace
+import argparse
+import json
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.serialization import serialize
+from app.schemas import SalonResponse, ServiceResponse, StylistResponse, StylistDetailResponse
+
+
+NOW = datetime(2025, 10, 20, 12, 0, 0)
+
+
+def _service(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=f"service-{i}", stylist_id="stylist-1", name=f"Service {i}",
+        description="Precision cut with blow-dry styling", category="haircut",
+        duration_minutes=60, price=75.0, image_url=None, is_active=True,
+        created_at=NOW, updated_at=NOW,
+    )
+
+
+def _salon(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=f"salon-{i}", name=f"Salon {i}", description="Premier salon",
+        address="123 Main Street", city="New York", state="NY", zip_code="10001",
+        country="USA", phone="+1-555-1001", email="contact@example.com",
+        website=None, booking_url=None, latitude=40.7589, longitude=-73.9851,
+        cover_image_url=None, logo_url=None, rating=4.8, review_count=234,
+        is_active=True, created_at=NOW, updated_at=NOW,
+    )
+
+
+def _stylist(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=f"stylist-{i}", salon_id="salon-1", user_id=None, name=f"Stylist {i}",
+        bio="Award-winning stylist", specialties=["Haircuts", "Color", "Balayage"],
+        years_experience=8, profile_image_url=None,
+        portfolio_images=[f"/media/portfolio/{i}-{n}.jpg" for n in range(6)],
+        base_price=75.0, rating=4.9, review_count=156, is_active=True,
+        is_verified=True, created_at=NOW, updated_at=NOW,
+        services=[_service(n) for n in range(4)],
+        salon_name="Elite Hair Studio", salon_address="123 Main Street",
+        location="New York, NY", min_price=45.0, max_price=200.0,
+        service_categories=["color", "haircut"],
+    )
+
+
+SCHEMAS = {
+    "SalonResponse": (SalonResponse, _salon),
+    "ServiceResponse": (ServiceResponse, _service),
+    "StylistResponse": (StylistResponse, _stylist),
+    "StylistDetailResponse": (StylistDetailResponse, _stylist),
+}
+
+
+def legacy_path(schema, rows) -> bytes:
+    """model_validate per row, then what FastAPI does with response_model"""
+    models = [schema.model_validate(row) for row in rows]
+    dumped = [model.model_dump() for model in models]
+    revalidated = TypeAdapter(list[schema]).validate_python(dumped)
+    return json.dumps(jsonable_encoder(revalidated)).encode()
+
+
+def fast_path(schema, rows) -> bytes:
+    return serialize(list[schema], rows)
+
+
+def measure(fn, schema, rows, repeat: int) -> float:
+    """Best-of-N microseconds per row"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(schema, rows)
+        best = min(best, time.perf_counter() - start)
+    return best / len(rows) * 1e6
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100, help="rows per response")
+    parser.add_argument("--repeat", type=int, default=50, help="repetitions (best is kept)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, (schema, factory) in SCHEMAS.items():
+        rows = [factory(i) for i in range(args.rows)]
+        # Warm up adapters so one-off schema building is not measured
+        legacy_path(schema, rows[:1])
+        fast_path(schema, rows[:1])
+        legacy = measure(legacy_path, schema, rows, args.repeat)
+        fast = measure(fast_path, schema, rows, args.repeat)
+        results[name] = {
+            "legacy_us_per_row": round(legacy, 2),
+            "fast_us_per_row": round(fast, 2),
+            "speedup": round(legacy / fast, 2),
+        }
+
+    if args.json:
+        print(json.dumps({"rows": args.rows, "results": results}, indent=2))
+    else:
+        print(f"{'schema':<24}{'legacy µs/row':>15}{'fast µs/row':>14}{'speedup':>10}")
+        for name, r in results.items():
+            print(f"{name:<24}{r['legacy_us_per_row']:>15}{r['fast_us_per_row']:>14}{r['speedup']:>9}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
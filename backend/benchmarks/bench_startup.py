@@ -0,0 +1,197 @@
+"""
+Startup benchmark - import time and time to first request
+
+Every run starts a fresh interpreter, so nothing is cached in-process
+(the OS file cache stays warm after the first run). Two modes:
+
+- in-process (default): the child times `import app.main`, the lifespan
+  startup (schema check, pool warmup) and the first requests to /health
+  and a catalog route through httpx.ASGITransport
+- --server: starts `uvicorn app.main:app` and polls /health until it
+  answers; measures spawn to first response, as a deploy or autoscaler
+  sees it
+
+Reports the median, min and max over --runs. --imports N also prints the
+N slowest modules of one `python -X importtime` import of app.main.
+
+Run from backend/:
+
+    python -m benchmarks.bench_startup --runs 10
+    python -m benchmarks.bench_startup --server --output startup.json
+    python -m benchmarks.bench_startup --imports 25
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# First request that touches the database
+CATALOG_PATH = "/api/v1/salons"
+
+CHILD = """
+import time
+started = time.perf_counter()
+import asyncio, json
+from app.main import app
+imported = time.perf_counter()
+
+async def main():
+    import httpx
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://startup") as client:
+            health = await client.get("/health")
+            first = time.perf_counter()
+            catalog = await client.get({catalog!r})
+            catalog_done = time.perf_counter()
+    return {{
+        "import_s": imported - started,
+        "startup_s": ready - imported,
+        "first_request_s": first - ready,
+        "first_catalog_request_s": catalog_done - first,
+        "to_first_response_s": first - started,
+        "statuses": [health.status_code, catalog.status_code],
+    }}
+
+print("STARTUP " + json.dumps(asyncio.run(main())))
+"""
+
+
+def run_in_process() -> dict:
+    """One fresh interpreter; timings from inside it plus process wall time"""
+    spawned = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(catalog=CATALOG_PATH)],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - spawned
+    for line in result.stdout.splitlines():
+        if line.startswith("STARTUP "):
+            timings = json.loads(line[len("STARTUP "):])
+            timings["process_s"] = wall
+            return timings
+    raise SystemExit(f"Startup run failed:\n{result.stderr[-2000:]}")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_server(timeout: float = 60.0) -> dict:
+    """Spawn uvicorn and time until /health, then a catalog route, answer"""
+    port = _free_port()
+    spawned = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=10) as client:
+            while True:
+                if server.poll() is not None:
+                    raise SystemExit(f"uvicorn exited:\n{server.stderr.read()[-2000:]}")
+                if time.perf_counter() - spawned > timeout:
+                    raise SystemExit(f"No response within {timeout:.0f}s")
+                try:
+                    health = client.get("/health")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.005)
+            first = time.perf_counter()
+            catalog = client.get(CATALOG_PATH)
+            catalog_done = time.perf_counter()
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "to_first_response_s": first - spawned,
+        "first_catalog_request_s": catalog_done - first,
+        "statuses": [health.status_code, catalog.status_code],
+    }
+
+
+def slowest_imports(limit: int) -> list:
+    """(cumulative µs, self µs, module) of the slowest imports of app.main"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        own, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), int(own), module.rstrip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def summarize(runs: list) -> dict:
+    summary = {}
+    for key in runs[0]:
+        if key.endswith("_s"):
+            values = [run[key] for run in runs]
+            summary[key[:-2] + "_ms"] = {
+                "median": round(statistics.median(values) * 1000, 2),
+                "min": round(min(values) * 1000, 2),
+                "max": round(max(values) * 1000, 2),
+            }
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.bench_startup",
+        description=__doc__.splitlines()[1]
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--server", action="store_true", help="time a real uvicorn process instead")
+    parser.add_argument("--imports", type=int, metavar="N", help="also list the N slowest imports")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    measure = run_server if args.server else run_in_process
+    runs = []
+    for number in range(1, args.runs + 1):
+        runs.append(measure())
+        print(
+            f"run {number}: first response after {runs[-1]['to_first_response_s'] * 1000:.0f} ms",
+            file=sys.stderr
+        )
+    failed = {status for run in runs for status in run["statuses"] if status >= 400}
+    if failed:
+        print(f"note: requests answered with {sorted(failed)}", file=sys.stderr)
+
+    report = {
+        "mode": "server" if args.server else "in-process",
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "timings": summarize(runs),
+    }
+    if args.imports:
+        report["slowest_imports"] = [
+            {"module": module.strip(), "cumulative_ms": round(cumulative / 1000, 2), "self_ms": round(own / 1000, 2)}
+            for cumulative, own, module in slowest_imports(args.imports)
+        ]
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
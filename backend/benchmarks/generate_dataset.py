@@ -0,0 +1,321 @@
+"""
+Synthetic dataset generator - realistic volumes for benchmarks
+
+Generates users, salons, stylists and services from a fixed seed, so the
+same arguments always produce the same rows (ids gen-salon-0, ...):
+
+- salons are spread over US metro areas by population (a few large
+  cities hold most of them), with coordinates scattered around each
+  city centre
+- stylists per salon and services per stylist are heavy-tailed: most
+  salons are small, a few employ dozens of stylists
+- specialties and service categories follow a Zipf-like popularity
+- ratings cluster around 4.0-4.9; review counts are Pareto distributed
+
+PostgreSQL targets are loaded with COPY, SQLite targets with batched
+executemany. Stylist cards are rebuilt at the end unless --skip-cards.
+There is no bookings table in the schema, so no bookings are generated.
+
+Run from backend/:
+
+    python -m benchmarks.generate_dataset --salons 100000 --stylists 1000000 \\
+        --services 10000000 --database-url postgresql://localhost/zelux_bench
+    python -m benchmarks.generate_dataset --salons 2000 --database-url sqlite:///./bench.db
+"""
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Iterator
+import argparse
+import random
+import sys
+import time
+
+from sqlalchemy import create_engine, delete, event, func, insert, select
+
+from app.core.bulk_import import copy_rows
+from app.core.config import settings
+from app.core.projections import refresh_stylist_cards
+from app.db import Base
+from app.models import Salon, Service, Stylist, StylistCard, User
+
+
+BATCH_SIZE = 10000
+
+START = datetime(2024, 1, 1)
+
+# (city, state, latitude, longitude, metro population in millions)
+CITIES = [
+    ("New York", "NY", 40.7128, -74.0060, 19.5),
+    ("Los Angeles", "CA", 34.0522, -118.2437, 12.9),
+    ("Chicago", "IL", 41.8781, -87.6298, 9.4),
+    ("Dallas", "TX", 32.7767, -96.7970, 7.9),
+    ("Houston", "TX", 29.7604, -95.3698, 7.3),
+    ("Washington", "DC", 38.9072, -77.0369, 6.4),
+    ("Philadelphia", "PA", 39.9526, -75.1652, 6.2),
+    ("Miami", "FL", 25.7617, -80.1918, 6.1),
+    ("Atlanta", "GA", 33.7490, -84.3880, 6.2),
+    ("Boston", "MA", 42.3601, -71.0589, 4.9),
+    ("Phoenix", "AZ", 33.4484, -112.0740, 5.0),
+    ("San Francisco", "CA", 37.7749, -122.4194, 4.6),
+    ("Detroit", "MI", 42.3314, -83.0458, 4.3),
+    ("Seattle", "WA", 47.6062, -122.3321, 4.0),
+    ("Minneapolis", "MN", 44.9778, -93.2650, 3.7),
+    ("San Diego", "CA", 32.7157, -117.1611, 3.3),
+    ("Tampa", "FL", 27.9506, -82.4572, 3.3),
+    ("Denver", "CO", 39.7392, -104.9903, 3.0),
+    ("Baltimore", "MD", 39.2904, -76.6122, 2.8),
+    ("St. Louis", "MO", 38.6270, -90.1994, 2.8),
+    ("Orlando", "FL", 28.5383, -81.3792, 2.7),
+    ("Charlotte", "NC", 35.2271, -80.8431, 2.7),
+    ("San Antonio", "TX", 29.4241, -98.4936, 2.6),
+    ("Portland", "OR", 45.5152, -122.6784, 2.5),
+    ("Austin", "TX", 30.2672, -97.7431, 2.4),
+    ("Sacramento", "CA", 38.5816, -121.4944, 2.4),
+    ("Pittsburgh", "PA", 40.4406, -79.9959, 2.4),
+    ("Las Vegas", "NV", 36.1699, -115.1398, 2.3),
+    ("Cincinnati", "OH", 39.1031, -84.5120, 2.2),
+    ("Kansas City", "MO", 39.0997, -94.5786, 2.2),
+    ("Columbus", "OH", 39.9612, -82.9988, 2.1),
+    ("Indianapolis", "IN", 39.7684, -86.1581, 2.1),
+    ("Cleveland", "OH", 41.4993, -81.6944, 2.1),
+    ("Nashville", "TN", 36.1627, -86.7816, 2.0),
+    ("San Jose", "CA", 37.3382, -121.8863, 2.0),
+    ("Jacksonville", "FL", 30.3322, -81.6557, 1.7),
+    ("Raleigh", "NC", 35.7796, -78.6382, 1.5),
+    ("Salt Lake City", "UT", 40.7608, -111.8910, 1.3),
+    ("New Orleans", "LA", 29.9511, -90.0715, 1.3),
+    ("Boise", "ID", 43.6150, -116.2023, 0.8),
+]
+
+# Most popular first; picked with Zipf weights
+SPECIALTIES = [
+    "Haircuts", "Color", "Balayage", "Highlights", "Blowouts", "Styling",
+    "Curly Hair", "Extensions", "Bridal", "Keratin", "Men's Cuts", "Braids",
+    "Updos", "Fades", "Perms", "Hair Treatments", "Natural Hair", "Locs",
+    "Beard Trims", "Scalp Care",
+]
+
+# (category, typical service names, minutes, base price)
+CATEGORIES = [
+    ("haircut", ["Women's Haircut", "Men's Haircut", "Kids Cut", "Bang Trim"], 45, 55.0),
+    ("color", ["Full Color", "Root Touch-Up", "Balayage", "Highlights"], 120, 150.0),
+    ("styling", ["Blowout", "Updo", "Special Event Styling"], 60, 65.0),
+    ("treatment", ["Deep Conditioning", "Keratin Treatment", "Scalp Treatment"], 75, 90.0),
+    ("extensions", ["Tape-In Extensions", "Sew-In Extensions"], 180, 350.0),
+    ("barber", ["Fade", "Beard Trim", "Hot Towel Shave"], 30, 35.0),
+]
+
+_STREETS = ["Main St", "Oak Ave", "Maple Dr", "Park Blvd", "Elm St", "Broadway", "Market St", "2nd Ave"]
+_FIRST = ["Alex", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Sam", "Maria", "Chris"]
+_LAST = ["Smith", "Garcia", "Lee", "Patel", "Brown", "Nguyen", "Martin", "Lopez", "Kim", "Davis", "Clark", "Young"]
+_SALON_WORDS = ["Studio", "Salon", "Hair Lounge", "Beauty Bar", "Atelier", "Collective"]
+
+
+def _zipf_weights(n: int, s: float = 1.1) -> list:
+    return [1 / (rank ** s) for rank in range(1, n + 1)]
+
+
+def _heavy_tail_weights(rng: random.Random, n: int, sigma: float) -> list:
+    """Cumulative lognormal weights: a few items get a large share"""
+    return list(accumulate(rng.lognormvariate(0, sigma) for _ in range(n)))
+
+
+def _timestamp(rng: random.Random) -> datetime:
+    return START + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+
+
+def _rating(rng: random.Random) -> float:
+    return round(3.0 + 2.0 * rng.betavariate(6, 1.6), 1)
+
+
+def _reviews(rng: random.Random) -> int:
+    return min(int(rng.paretovariate(1.3) * 5) - 5, 5000)
+
+
+def generate_users(rng: random.Random, count: int, stylists: int) -> Iterator[dict]:
+    for i in range(count):
+        created = _timestamp(rng)
+        yield {
+            "id": f"gen-user-{i}",
+            "firebase_uid": f"gen-uid-{i}",
+            "email": f"user{i}@example.com",
+            "name": f"{rng.choice(_FIRST)} {rng.choice(_LAST)}",
+            "phone": f"+1-555-{rng.randrange(10000):04d}",
+            "profile_image_url": None,
+            "is_stylist": i < stylists,
+            "is_admin": False,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def generate_salons(rng: random.Random, count: int) -> Iterator[dict]:
+    city_weights = list(accumulate(city[4] for city in CITIES))
+    for i in range(count):
+        city, state, lat, lng, _ = rng.choices(CITIES, cum_weights=city_weights)[0]
+        created = _timestamp(rng)
+        yield {
+            "id": f"gen-salon-{i}",
+            "name": f"{rng.choice(_LAST)} {rng.choice(_SALON_WORDS)}",
+            "description": f"Neighbourhood salon in {city}",
+            "address": f"{rng.randrange(1, 9999)} {rng.choice(_STREETS)}",
+            "city": city,
+            "state": state,
+            "zip_code": f"{rng.randrange(10000, 99999)}",
+            "country": "USA",
+            "phone": f"+1-555-{rng.randrange(10000):04d}",
+            "email": f"salon{i}@example.com",
+            "website": None,
+            "booking_url": None,
+            # Most salons within ~10 km of the centre, some in the suburbs
+            "latitude": round(rng.gauss(lat, 0.08), 6),
+            "longitude": round(rng.gauss(lng, 0.1), 6),
+            "cover_image_url": None,
+            "logo_url": None,
+            "rating": _rating(rng),
+            "review_count": _reviews(rng),
+            "is_active": rng.random() > 0.03,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def generate_stylists(rng: random.Random, count: int, salons: int, users: int) -> Iterator[dict]:
+    salon_weights = _heavy_tail_weights(rng, salons, 1.0)
+    specialty_weights = list(accumulate(_zipf_weights(len(SPECIALTIES))))
+    for i in range(count):
+        salon = rng.choices(range(salons), cum_weights=salon_weights)[0]
+        specialties = sorted(set(rng.choices(SPECIALTIES, cum_weights=specialty_weights, k=rng.randint(1, 4))))
+        created = _timestamp(rng)
+        yield {
+            "id": f"gen-stylist-{i}",
+            # The first stylists double as app users
+            "user_id": f"gen-user-{i}" if i < users else None,
+            "salon_id": f"gen-salon-{salon}",
+            "name": f"{rng.choice(_FIRST)} {rng.choice(_LAST)}",
+            "bio": f"Specialist in {', '.join(specialties).lower()}",
+            "specialties": specialties,
+            "years_experience": min(int(rng.expovariate(1 / 7)), 40),
+            "profile_image_url": None,
+            "portfolio_images": [f"/media/portfolio/gen-{i}-{n}.jpg" for n in range(rng.randint(0, 6))],
+            "rating": _rating(rng),
+            "review_count": _reviews(rng),
+            "base_price": round(rng.lognormvariate(4.0, 0.4), 2),
+            "is_active": rng.random() > 0.05,
+            "is_verified": rng.random() > 0.3,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def generate_services(rng: random.Random, count: int, stylists: int) -> Iterator[dict]:
+    stylist_weights = _heavy_tail_weights(rng, stylists, 0.7)
+    category_weights = list(accumulate(_zipf_weights(len(CATEGORIES), 0.9)))
+    for i in range(count):
+        stylist = rng.choices(range(stylists), cum_weights=stylist_weights)[0]
+        category, names, minutes, price = rng.choices(CATEGORIES, cum_weights=category_weights)[0]
+        created = _timestamp(rng)
+        yield {
+            "id": f"gen-service-{i}",
+            "stylist_id": f"gen-stylist-{stylist}",
+            "name": rng.choice(names),
+            "description": None,
+            "category": category,
+            "duration_minutes": max(15, int(rng.gauss(minutes, minutes / 4)) // 15 * 15),
+            "price": round(price * rng.lognormvariate(0, 0.35), 2),
+            "image_url": None,
+            "is_active": rng.random() > 0.05,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def _batches(rows: Iterator[dict]) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load(engine, table, rows: Iterator[dict]) -> int:
+    """Write generated rows, one transaction per batch"""
+    columns = [c.key for c in table.columns]
+    written = 0
+    for batch in _batches(rows):
+        with engine.begin() as connection:
+            if connection.dialect.name == "postgresql":
+                copy_rows(connection, table.name, columns, ([row[name] for name in columns] for row in batch))
+            else:
+                connection.execute(insert(table), batch)
+        written += len(batch)
+        sys.stderr.write(f"\r{table.name}: {written} rows")
+        sys.stderr.flush()
+    sys.stderr.write("\n")
+    return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.generate_dataset",
+        description="Generate a deterministic synthetic dataset"
+    )
+    parser.add_argument("--salons", type=int, default=1000)
+    parser.add_argument("--stylists", type=int, help="default: 10 per salon")
+    parser.add_argument("--services", type=int, help="default: 8 per stylist")
+    parser.add_argument("--users", type=int, help="default: one per stylist")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--reset", action="store_true", help="delete existing rows first")
+    parser.add_argument("--skip-cards", action="store_true", help="do not rebuild stylist cards")
+    args = parser.parse_args(argv)
+
+    stylists = args.stylists if args.stylists is not None else args.salons * 10
+    services = args.services if args.services is not None else stylists * 8
+    users = args.users if args.users is not None else stylists
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _fast_sqlite(dbapi_connection, connection_record):
+            # Throwaway benchmark data: trade durability for load speed
+            dbapi_connection.execute("PRAGMA synchronous=OFF")
+            dbapi_connection.execute("PRAGMA journal_mode=MEMORY")
+
+    Base.metadata.create_all(bind=engine)
+    tables = [User.__table__, Salon.__table__, Stylist.__table__, Service.__table__]
+    with engine.begin() as connection:
+        if args.reset:
+            for table in [StylistCard.__table__] + tables[::-1]:
+                connection.execute(delete(table))
+        elif connection.execute(select(func.count()).select_from(Salon.__table__)).scalar():
+            parser.error("the database already has salons; pass --reset to replace them")
+
+    started = time.perf_counter()
+    # One generator per table, each seeded from the run seed, so changing
+    # one volume does not reshuffle the others
+    load(engine, User.__table__, generate_users(random.Random(f"{args.seed}-users"), users, stylists))
+    load(engine, Salon.__table__, generate_salons(random.Random(f"{args.seed}-salons"), args.salons))
+    load(engine, Stylist.__table__, generate_stylists(
+        random.Random(f"{args.seed}-stylists"), stylists, args.salons, users
+    ))
+    load(engine, Service.__table__, generate_services(
+        random.Random(f"{args.seed}-services"), services, stylists
+    ))
+    if not args.skip_cards:
+        with engine.begin() as connection:
+            cards = refresh_stylist_cards(connection)
+        print(f"✅ Rebuilt {cards} stylist cards")
+
+    print(
+        f"✅ {users} users, {args.salons} salons, {stylists} stylists, {services} services "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+End-to-end HTTP benchmark - latency and throughput per scenario
+
+Drives the API through httpx, either in-process (ASGITransport, no
+network or server needed) or against a running server (--url), and
+reports requests/s and p50/p95/p99 latency for each scenario:
+
+- browse        GET /salons, random page
+- search        GET /salons?search= and /stylists?city=
+- detail        GET /stylists/{id}
+- availability  GET /stylists/{id}/availability?date=
+- booking       GET /pro/bookings, then PUT /pro/bookings/{id}/status
+- feed          GET /feed
+
+Concurrency models:
+
+- closed (default): --concurrency workers each send their next request
+  as soon as the previous one finishes
+- open: requests start at --rate per second (Poisson arrivals) whatever
+  the server does; latency is measured from the scheduled start, so a
+  stalled server shows up as queueing instead of fewer samples
+
+Ids and cities are sampled from the API itself, so any dataset works;
+--generate N first fills the configured database with N salons through
+benchmarks.generate_dataset (in-process runs only).
+
+Run from backend/:
+
+    python -m benchmarks.http_bench --duration 20 --output bench.json
+    python -m benchmarks.http_bench --url http://127.0.0.1:8000 --model open --rate 200
+    python -m benchmarks.http_bench --compare bench.json --max-regression 15
+"""
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Optional
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+API = "/api/v1"
+
+SCENARIOS: dict[str, Callable[["Context", httpx.AsyncClient], Awaitable[httpx.Response]]] = {}
+
+
+def scenario(name: str):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+class Context:
+    """Ids and filter values the scenarios pick from"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.salon_pages = 1
+        self.cities: list[str] = []
+        self.search_terms: list[str] = []
+        self.stylist_ids: list[str] = []
+
+    async def discover(self, client: httpx.AsyncClient) -> None:
+        response = await client.get(f"{API}/salons", params={"page_size": 100})
+        response.raise_for_status()
+        listing = response.json()
+        self.salon_pages = max(1, math.ceil(listing["total"] / 10))
+        self.cities = sorted({salon["city"] for salon in listing["salons"]})
+        self.search_terms = sorted({salon["name"].split()[0] for salon in listing["salons"]})
+
+        response = await client.get(f"{API}/stylists", params={"page_size": 100})
+        response.raise_for_status()
+        self.stylist_ids = [stylist["id"] for stylist in response.json()]
+        if not self.stylist_ids or not self.cities:
+            raise SystemExit("The target has no salons or stylists; load a dataset first (--generate)")
+
+
+@scenario("browse")
+async def browse(ctx: Context, client: httpx.AsyncClient) -> httpx.Response:
+    page = ctx.rng.randint(1, min(ctx.salon_pages, 20))
+    return await client.get(f"{API}/salons", params={"page": page})
+
+
+@scenario("search")
+async def search(ctx: Context, client: httpx.AsyncClient) -> httpx.Response:
+    if ctx.rng.random() < 0.5:
+        return await client.get(f"{API}/salons", params={"search": ctx.rng.choice(ctx.search_terms)})
+    return await client.get(f"{API}/stylists", params={"city": ctx.rng.choice(ctx.cities)})
+
+
+@scenario("detail")
+async def detail(ctx: Context, client: httpx.AsyncClient) -> httpx.Response:
+    return await client.get(f"{API}/stylists/{ctx.rng.choice(ctx.stylist_ids)}")
+
+
+@scenario("availability")
+async def availability(ctx: Context, client: httpx.AsyncClient) -> httpx.Response:
+    day = date.today() + timedelta(days=ctx.rng.randint(0, 30))
+    return await client.get(
+        f"{API}/stylists/{ctx.rng.choice(ctx.stylist_ids)}/availability",
+        params={"date": day.isoformat()}
+    )
+
+
+@scenario("booking")
+async def booking(ctx: Context, client: httpx.AsyncClient) -> httpx.Response:
+    response = await client.get(f"{API}/pro/bookings")
+    if response.status_code != 200 or not response.json():
+        return response
+    booking_id = ctx.rng.choice(response.json())["id"]
+    return await client.put(f"{API}/pro/bookings/{booking_id}/status", params={"status": "confirmed"})
+
+
+@scenario("feed")
+async def feed(ctx: Context, client: httpx.AsyncClient) -> httpx.Response:
+    return await client.get(f"{API}/feed")
+
+
+class Samples:
+    """Latencies and outcomes of one scenario"""
+
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.statuses: dict[str, int] = {}
+        self.errors = 0
+
+    def record(self, latency: float, status: str, ok: bool) -> None:
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+
+def percentile(sorted_values: list, q: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: Samples, seconds: float) -> dict:
+    latencies = sorted(samples.latencies)
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 3)
+
+    return {
+        "requests": len(latencies),
+        "errors": samples.errors,
+        "rps": round(len(latencies) / seconds, 2) if seconds else 0.0,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+        "statuses": samples.statuses,
+    }
+
+
+async def _timed(ctx: Context, client: httpx.AsyncClient, name: str, samples: Samples, started: float) -> None:
+    try:
+        response = await SCENARIOS[name](ctx, client)
+        status, ok = str(response.status_code), response.status_code < 400
+    except httpx.HTTPError as e:
+        status, ok = type(e).__name__, False
+    samples.record(time.perf_counter() - started, status, ok)
+
+
+async def run_closed(ctx: Context, client: httpx.AsyncClient, name: str, concurrency: int, duration: float) -> Samples:
+    samples = Samples()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await _timed(ctx, client, name, samples, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+async def run_open(ctx: Context, client: httpx.AsyncClient, name: str, rate: float, duration: float) -> Samples:
+    samples = Samples()
+    tasks = []
+    start = time.perf_counter()
+    scheduled = start
+    while scheduled < start + duration:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(_timed(ctx, client, name, samples, scheduled)))
+        scheduled += ctx.rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+    return samples
+
+
+def _make_client(url: Optional[str], concurrency: int) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if url:
+        return httpx.AsyncClient(base_url=url, limits=limits, timeout=30)
+    from app.main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    ctx = Context(rng)
+    results = {}
+    async with _make_client(args.url, args.concurrency) as client:
+        await ctx.discover(client)
+        for name in args.scenarios:
+            if args.warmup:
+                await run_closed(ctx, client, name, args.concurrency, args.warmup)
+            started = time.perf_counter()
+            if args.model == "open":
+                samples = await run_open(ctx, client, name, args.rate, args.duration)
+            else:
+                samples = await run_closed(ctx, client, name, args.concurrency, args.duration)
+            results[name] = summarize(samples, time.perf_counter() - started)
+            print(_format_row(name, results[name]), file=sys.stderr)
+    return {
+        "meta": {
+            "target": args.url or "in-process",
+            "model": args.model,
+            "concurrency": args.concurrency,
+            "rate": args.rate if args.model == "open" else None,
+            "duration": args.duration,
+            "seed": args.seed,
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "scenarios": results,
+    }
+
+
+def _format_row(name: str, result: dict) -> str:
+    return (
+        f"{name:<13} {result['rps']:>9.1f} rps  p50 {result['p50_ms'] or 0:>8.2f} ms  "
+        f"p95 {result['p95_ms'] or 0:>8.2f} ms  p99 {result['p99_ms'] or 0:>8.2f} ms  "
+        f"errors {result['errors']}"
+    )
+
+
+def compare(report: dict, baseline: dict, max_regression: Optional[float]) -> bool:
+    """Print p95 and RPS changes against a baseline; False on a regression"""
+    ok = True
+    for key in ("target", "model", "concurrency", "rate"):
+        if baseline.get("meta", {}).get(key) != report["meta"][key]:
+            print(f"note: baseline {key} differs ({baseline.get('meta', {}).get(key)})", file=sys.stderr)
+    for name, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or not before.get("p95_ms") or not result.get("p95_ms"):
+            continue
+        p95_change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        rps_change = (result["rps"] - before["rps"]) / before["rps"] * 100 if before["rps"] else 0.0
+        flag = ""
+        if max_regression is not None and p95_change > max_regression:
+            flag, ok = "  REGRESSION", False
+        print(f"{name:<13} p95 {p95_change:+7.1f}%  rps {rps_change:+7.1f}%{flag}", file=sys.stderr)
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.http_bench",
+        description=__doc__.splitlines()[1]
+    )
+    parser.add_argument("--url", help="server to benchmark (default: the app in-process)")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--model", choices=["closed", "open"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=10, help="closed model workers / connection limit")
+    parser.add_argument("--rate", type=float, default=100.0, help="open model requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--generate", type=int, metavar="SALONS", help="load a generated dataset first")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, help="fail if a p95 grows by more than this %%")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        if args.url:
+            parser.error("--generate only applies to in-process runs")
+        from benchmarks import generate_dataset
+
+        generate_dataset.main(["--salons", str(args.generate), "--reset", "--seed", str(args.seed)])
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""
+Query-plan snapshots - catch ORM changes that lose an index
+
+Calls every GET route (plus a few filtered variants) in-process against a
+seeded dataset, records each SELECT the route issues together with its
+bound parameters, and asks the database for its plan:
+
+- PostgreSQL: EXPLAIN (FORMAT JSON); the snapshot keeps the plan shape
+  (node types, relations, indexes, join types) and the total cost
+- SQLite: EXPLAIN QUERY PLAN; shape only, SQLite reports no costs
+
+Plans are compared with the snapshot in benchmarks/plan_snapshots/ for
+the database's dialect. A changed plan shape, a different number of
+queries for a route, or a cost above the snapshot by more than
+--cost-tolerance fails the run (exit status 1) with a diff; new
+sequential scans are called out. After an intended change, rerun with
+--update and commit the snapshot.
+
+Without --database-url a temporary SQLite database is filled by
+benchmarks.generate_dataset with a fixed seed and analyzed, so plans are
+reproducible.
+For PostgreSQL, point --database-url at a database loaded the same way
+(python -m benchmarks.generate_dataset --salons 200 --seed 7) and run
+ANALYZE first.
+
+Run from backend/:
+
+    python -m benchmarks.query_plans
+    python -m benchmarks.query_plans --database-url postgresql://localhost/zelux_plans --update
+"""
+from typing import Optional
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "plan_snapshots")
+
+DATASET = ["--salons", "200", "--seed", "7"]
+
+# Routes needing credentials, or not touching the catalog
+SKIP_PREFIXES = ("/api/v1/admin", "/metrics", "/docs", "/redoc", "/openapi")
+
+# Values for required query parameters
+QUERY_DEFAULTS = {"date": "2025-06-02", "start_date": "2025-06-02"}
+
+# Filtered variants of list routes; {city} and {search} come from the data
+VARIANTS = [
+    "/api/v1/salons?city={city}",
+    "/api/v1/salons?search={search}",
+    "/api/v1/salons?page=3&page_size=20",
+    "/api/v1/stylists?city={city}",
+    "/api/v1/stylists?min_rating=4.5",
+    "/api/v1/pros?city={city}",
+    "/api/v1/sync?entities=stylists",
+]
+
+_WHITESPACE = re.compile(r"\s+")
+_EXPANDED_IN = re.compile(r"\((?:\s*(?:\?|%\([^)]+\)s|:\w+)\s*,)+\s*(?:\?|%\([^)]+\)s|:\w+)\s*\)")
+_NUMBERS = re.compile(r"\b\d+\b")
+
+
+def normalize_sql(statement: str) -> str:
+    """Whitespace collapsed and IN lists of any length made equal"""
+    return _EXPANDED_IN.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def _pg_shape(node: dict, depth: int = 0) -> list:
+    label = node["Node Type"]
+    if node.get("Join Type"):
+        label = f"{node['Join Type']} {label}"
+    if node.get("Index Name"):
+        label += f" using {node['Index Name']}"
+    if node.get("Relation Name"):
+        label += f" on {node['Relation Name']}"
+    lines = ["  " * depth + label]
+    for child in node.get("Plans", ()):
+        lines.extend(_pg_shape(child, depth + 1))
+    return lines
+
+
+def explain(connection, statement: str, parameters) -> tuple[list, Optional[float]]:
+    """(plan shape lines, total cost or None) for one captured statement"""
+    if connection.dialect.name == "postgresql":
+        raw = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+        return _pg_shape(plan), plan["Total Cost"]
+
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + _NUMBERS.sub("N", detail))
+    return lines, None
+
+
+def _full_scans(shape: list) -> set:
+    scans = set()
+    for line in shape:
+        line = line.strip()
+        if line.startswith("Seq Scan on "):
+            scans.add(line[len("Seq Scan on "):])
+        elif line.startswith("SCAN ") and " USING " not in line:
+            scans.add(line.split()[1])
+    return scans
+
+
+def _requests(app, sample: dict) -> list:
+    """(snapshot key, path) for every GET route with sample ids, then the variants"""
+    from fastapi.routing import APIRoute
+
+    requests = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or "GET" not in route.methods:
+            continue
+        if route.path.startswith(SKIP_PREFIXES):
+            continue
+        path = route.path
+        for param in route.dependant.path_params:
+            if param.name not in sample:
+                break
+            path = path.replace(f"{{{param.name}}}", sample[param.name])
+        else:
+            required = [p.name for p in route.dependant.query_params if p.required]
+            if all(name in QUERY_DEFAULTS for name in required):
+                query = "&".join(f"{name}={QUERY_DEFAULTS[name]}" for name in required)
+                suffix = f"?{query}" if query else ""
+                # Keyed by template: sample ids change with the dataset
+                requests.append((f"GET {route.path}{suffix}", path + suffix))
+    requests.extend((f"GET {variant}", variant.format(**sample)) for variant in VARIANTS)
+    return requests
+
+
+def _use_database(database_url: str) -> None:
+    """Point the app at database_url; must run before app.core.config is imported"""
+    if "app.core.config" in sys.modules:
+        from app.core.config import settings
+
+        if settings.DATABASE_URL != database_url:
+            raise RuntimeError(
+                "The app is already configured for another database; "
+                "capture plans in a fresh interpreter"
+            )
+    os.environ["DATABASE_URL"] = database_url
+    # Cached responses would hide the queries of repeat routes
+    os.environ["CACHE_BACKEND"] = "none"
+
+
+def capture(database_url: str) -> tuple[str, dict]:
+    """Run every request once and explain what it issued; returns (dialect, plans)"""
+    _use_database(database_url)
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, select
+
+    from app.core.lazy_routes import load_lazy_routers
+    from app.db import engine
+    from app.main import app
+    from app.models import Salon, Service, Stylist
+
+    with engine.connect() as connection:
+        stylist_id, salon_id = connection.execute(
+            select(Stylist.id, Stylist.salon_id)
+            .where(Stylist.id.in_(select(Service.stylist_id)))
+            .order_by(Stylist.id)
+            .limit(1)
+        ).one()
+        salon = connection.execute(select(Salon.name, Salon.city).where(Salon.id == salon_id)).one()
+    sample = {
+        "salon_id": salon_id,
+        "stylist_id": stylist_id,
+        "pro_id": stylist_id,
+        "city": salon.city,
+        "search": salon.name.split()[0],
+    }
+
+    captured: Optional[list] = None
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if captured is not None and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    load_lazy_routers(app)
+    plans = {}
+    client = TestClient(app)
+    for key, path in _requests(app, sample):
+        captured = []
+        response = client.get(path)
+        statements, captured = captured, None
+        queries = []
+        with engine.connect() as connection:
+            for statement, parameters in statements:
+                shape, cost = explain(connection, statement, parameters)
+                queries.append({"sql": normalize_sql(statement), "plan": shape, "cost": cost})
+        plans[key] = {"status": response.status_code, "queries": queries}
+
+    event.remove(engine, "before_cursor_execute", _capture)
+    return engine.dialect.name, plans
+
+
+def capture_generated() -> tuple[str, dict]:
+    """capture() against a temporary SQLite database filled with DATASET"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'plans.db')}"
+        # generate_dataset imports the app settings, so configure them first
+        _use_database(database_url)
+        from benchmarks import generate_dataset
+
+        generate_dataset.main(DATASET + ["--database-url", database_url])
+
+        from app.db import engine
+
+        try:
+            # Without statistics SQLite breaks ties between equally good
+            # indexes by their order in the schema, which follows Python's
+            # hash seed when tables are created
+            with engine.begin() as connection:
+                connection.exec_driver_sql("ANALYZE")
+            return capture(database_url)
+        finally:
+            engine.dispose()
+
+
+def load_snapshot(dialect: str) -> Optional[dict]:
+    """Stored plans for a dialect, or None when there are none yet"""
+    path = os.path.join(SNAPSHOT_DIR, f"{dialect}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(snapshot: dict, current: dict, cost_tolerance: float) -> tuple[list, list]:
+    """(failures, notes) between a stored snapshot and fresh plans"""
+    failures, notes = [], []
+    for key in sorted(set(snapshot) | set(current)):
+        if key not in current:
+            notes.append(f"{key}: no longer requested")
+            continue
+        if key not in snapshot:
+            notes.append(f"{key}: not in the snapshot (run with --update)")
+            continue
+        before, after = snapshot[key]["queries"], current[key]["queries"]
+        if len(before) != len(after):
+            failures.append(f"{key}: {len(after)} queries, snapshot has {len(before)}")
+            continue
+        for number, (old, new) in enumerate(zip(before, after), 1):
+            label = f"{key} query {number}"
+            if old["sql"] != new["sql"]:
+                notes.append(f"{label}: SQL changed")
+            if old["plan"] != new["plan"]:
+                message = [f"{label}: plan changed"]
+                for table in sorted(_full_scans(new["plan"]) - _full_scans(old["plan"])):
+                    message.append(f"  now scans all of {table}")
+                message.append("  snapshot:")
+                message.extend(f"    {line}" for line in old["plan"])
+                message.append("  now:")
+                message.extend(f"    {line}" for line in new["plan"])
+                failures.append("\n".join(message))
+            elif old["cost"] is not None and new["cost"] is not None:
+                if new["cost"] > old["cost"] * (1 + cost_tolerance) and new["cost"] - old["cost"] > 1:
+                    failures.append(
+                        f"{label}: cost {new['cost']:.2f}, snapshot {old['cost']:.2f} "
+                        f"(+{(new['cost'] / old['cost'] - 1) * 100:.0f}%)"
+                    )
+    return failures, notes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.query_plans",
+        description="Compare the query plans of every route with stored snapshots"
+    )
+    parser.add_argument("--database-url", help="default: a generated temporary SQLite database")
+    parser.add_argument("--update", action="store_true", help="rewrite the snapshot instead of comparing")
+    parser.add_argument("--cost-tolerance", type=float, default=0.5, help="allowed cost growth (0.5 = +50%%)")
+    args = parser.parse_args(argv)
+
+    if args.database_url is None:
+        dialect, current = capture_generated()
+    else:
+        dialect, current = capture(args.database_url)
+
+    path = os.path.join(SNAPSHOT_DIR, f"{dialect}.json")
+    snapshot = load_snapshot(dialect)
+    if args.update or snapshot is None:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"✅ Wrote plans of {len(current)} requests to {path}")
+        return 0
+
+    failures, notes = compare(snapshot, current, args.cost_tolerance)
+    for note in notes:
+        print(f"note: {note}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        print(f"{len(failures)} plan regressions; rerun with --update if they are intended")
+        return 1
+    print(f"✅ Plans of {len(current)} requests match {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""
+Shared test setup
+
+Settings are read when app.core.config is first imported, so the test
+database (a SQLite file in a temporary directory) is configured here,
+before any test module imports the app.
+"""
+import os
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="zelux-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}"
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["TRACE_EXPORTER"] = "none"
+os.environ["SCHEMA_CHECK"] = "off"
+for name in ("DATABASE_READ_URLS", "METRICS_DIR", "CACHE_URL", "WEB_CONCURRENCY"):
+    os.environ.pop(name, None)
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """Engine of the test database with every table created"""
+    from app.db import Base, engine
+    import app.models  # noqa: F401
+
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
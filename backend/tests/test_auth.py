@@ -0,0 +1,85 @@
+"""
+First logins create exactly one user, returning logins write nothing
+"""
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+
+from app.core.auth import create_access_token
+from app.db import SessionLocal
+from app.models import User
+from app.routers.auth import upsert_user
+
+
+def _count_users(firebase_uid: str) -> int:
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(User).where(User.firebase_uid == firebase_uid))
+
+
+def test_concurrent_first_logins_create_one_user(db_engine):
+    from app.main import app
+
+    token = create_access_token({"uid": "firebase-race", "email": "race@example.com", "name": "Race"})
+    start = threading.Barrier(8)
+
+    def login(_):
+        # A TestClient used outside `with` runs each request on its own
+        # event loop thread, so the requests really overlap
+        client = TestClient(app)
+        start.wait()
+        return client.post("/api/v1/auth/verify-token", headers={"Authorization": f"Bearer {token}"})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(login, range(8)))
+
+    assert [r.status_code for r in responses] == [200] * 8
+    assert len({r.json()["user"]["id"] for r in responses}) == 1
+    assert _count_users("firebase-race") == 1
+
+
+def test_returning_login_only_reads(db_engine):
+    with SessionLocal() as db:
+        upsert_user(db, "firebase-returning", "returning@example.com", "Returning")
+
+    executed = []
+    record = lambda conn, cursor, statement, *args: executed.append(statement)
+    event.listen(db_engine, "before_cursor_execute", record)
+    try:
+        with SessionLocal() as db:
+            user = upsert_user(db, "firebase-returning", "changed@example.com", "Changed")
+            wrote = db.info.get("wrote", False)
+    finally:
+        event.remove(db_engine, "before_cursor_execute", record)
+
+    assert user.email == "returning@example.com"
+    assert not wrote
+    assert len(executed) == 1 and executed[0].lstrip().upper().startswith("SELECT")
+
+
+def test_login_that_loses_the_insert_race_gets_the_winners_row(db_engine):
+    winner_id = []
+    raced = threading.Event()
+
+    def insert_first(conn, cursor, statement, *args):
+        # Another login commits the same uid between our SELECT and INSERT
+        if statement.lstrip().upper().startswith("INSERT INTO USERS") and not raced.is_set():
+            raced.set()
+            with SessionLocal() as other:
+                winner = User(firebase_uid="firebase-lost-race", email="winner@example.com", name="Winner")
+                other.add(winner)
+                other.flush()
+                winner_id.append(winner.id)
+                other.commit()
+
+    event.listen(db_engine, "before_cursor_execute", insert_first)
+    try:
+        with SessionLocal() as db:
+            user = upsert_user(db, "firebase-lost-race", "loser@example.com", "Loser")
+    finally:
+        event.remove(db_engine, "before_cursor_execute", insert_first)
+
+    assert user.id == winner_id[0]
+    assert user.email == "winner@example.com"
+    assert _count_users("firebase-lost-race") == 1
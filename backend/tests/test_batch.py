@@ -0,0 +1,93 @@
+"""
+Multiplexed /batch requests
+"""
+import uuid
+
+import pytest
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal, get_db
+from app.models import Salon
+
+
+BOOM_PATH = "/api/v1/salons-boom"
+
+
+@pytest.fixture(scope="module")
+def client(db_engine):
+    from app.main import app
+
+    with SessionLocal() as db:
+        db.add(Salon(id=str(uuid.uuid4()), name="Batch Salon", address="4 Main St", city="Batchville", state="TX"))
+        db.commit()
+
+    async def boom(db: Session = Depends(get_db)):
+        db.execute(text("SELECT 1"))
+        raise RuntimeError("sub-request failed")
+
+    app.add_api_route(BOOM_PATH, boom)
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        app.router.routes[:] = [r for r in app.router.routes if getattr(r, "path", None) != BOOM_PATH]
+
+
+def _batch(client, *requests, **kwargs):
+    response = client.post("/api/v1/batch", json={"requests": list(requests)}, **kwargs)
+    assert response.status_code == 200
+    return response.json()["responses"]
+
+
+def test_responses_come_back_in_order_with_their_status(client):
+    ok, missing = _batch(
+        client,
+        {"id": "list", "path": "/api/v1/salons?city=batchville"},
+        {"id": "missing", "path": "/api/v1/salons/no-such-salon"},
+    )
+
+    assert (ok["id"], ok["status"]) == ("list", 200)
+    assert [s["name"] for s in ok["body"]["salons"]] == ["Batch Salon"]
+    assert (missing["id"], missing["status"]) == ("missing", 404)
+    assert missing["body"] == {"detail": "Salon not found"}
+
+
+def test_sub_request_headers_override_the_parent_headers(client):
+    plain, streamed = _batch(
+        client,
+        {"path": "/api/v1/salons?city=batchville"},
+        {"path": "/api/v1/salons?city=batchville", "headers": {"Accept": "application/x-ndjson"}},
+        headers={"Accept": "application/json"},
+    )
+
+    assert plain["headers"]["content-type"].startswith("application/json")
+    assert streamed["headers"]["content-type"].startswith("application/x-ndjson")
+    # Non-JSON bodies are returned as a string
+    assert "Batch Salon" in streamed["body"]
+
+
+def test_batch_cannot_call_itself(client):
+    (refused,) = _batch(client, {"path": "/api/v1/batch"})
+
+    assert refused["status"] == 400
+
+
+def test_failed_sub_request_is_a_500_and_rolls_back(client, monkeypatch):
+    rollbacks = []
+    rollback = Session.rollback
+
+    def spy(self):
+        rollbacks.append(self)
+        rollback(self)
+
+    monkeypatch.setattr(Session, "rollback", spy)
+
+    failed, ok = _batch(client, {"path": BOOM_PATH}, {"path": "/api/v1/salons?city=batchville"})
+
+    assert failed["status"] == 500
+    assert failed["body"] == {"detail": "Internal Server Error"}
+    assert ok["status"] == 200
+    assert rollbacks
@@ -0,0 +1,145 @@
+"""
+Bulk imports load valid rows, reject invalid ones, and roll back on errors
+"""
+import io
+import json
+import os
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from app.core import bulk_import
+from app.core.auth import require_admin
+from app.core.config import settings
+from app.db import SessionLocal, engine
+from app.models import Salon, StylistCard, User
+
+
+def _run(sources: dict, rejects=None):
+    with engine.begin() as connection:
+        return bulk_import.run_import(connection, sources, rejects)
+
+
+def test_sqlite_round_trip_with_rejected_rows(db_engine):
+    salon_id, stylist_id = str(uuid.uuid4()), str(uuid.uuid4())
+    salons = io.StringIO(
+        "id,name,address,city,state\n"
+        f"{salon_id},Imported Salon,1 Import St,Importville,TX\n"
+        ",Nameless City,2 Import St,,TX\n"
+    )
+    stylists = io.StringIO(
+        json.dumps({"id": stylist_id, "salon_id": salon_id, "name": "Imported Stylist",
+                    "specialties": ["color"]}) + "\n"
+        "not json\n"
+        + json.dumps({"salon_id": salon_id}) + "\n"
+    )
+    rejects = io.StringIO()
+
+    summaries, cards = _run({"salons": (salons, "csv"), "stylists": (stylists, "ndjson")}, rejects)
+
+    assert [(s.entity, s.read, s.loaded, s.rejected) for s in summaries] == [
+        ("salons", 2, 1, 1), ("stylists", 3, 1, 2),
+    ]
+    assert cards == 1
+    assert [(r["entity"], r["line"]) for r in map(json.loads, rejects.getvalue().splitlines())] == [
+        ("salons", 3), ("stylists", 2), ("stylists", 3),
+    ]
+    with SessionLocal() as db:
+        card = db.get(StylistCard, stylist_id)
+        assert (card.name, card.salon_city, card.specialties) == ("Imported Stylist", "Importville", ["color"])
+
+
+def test_users_are_upserted_by_email(db_engine):
+    email = f"import-{uuid.uuid4().hex[:8]}@example.com"
+
+    _run({"users": (io.StringIO(f"email,name\n{email},First\n"), "csv")})
+    with SessionLocal() as db:
+        first_id = db.scalar(select(User.id).where(User.email == email))
+    summaries, _ = _run({"users": (io.StringIO(f"email,name,phone\n{email},Second,555-0100\n"), "csv")})
+
+    assert summaries[0].loaded == 1
+    with SessionLocal() as db:
+        users = db.scalars(select(User).where(User.email == email)).all()
+        assert [(u.id, u.name, u.phone) for u in users] == [(first_id, "Second", "555-0100")]
+
+
+@pytest.fixture
+def client(db_engine, tmp_path, monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(settings, "IMPORT_DIR", str(tmp_path))
+    app.dependency_overrides[require_admin] = lambda: None
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        app.dependency_overrides.pop(require_admin, None)
+
+
+def _chunks(body: str, size: int = 7):
+    # Small chunks split rows mid-line, as a slow upload would
+    data = body.encode()
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def test_upload_is_read_as_it_streams(client, tmp_path):
+    salon_id = str(uuid.uuid4())
+    body = f"id,name,address,city\n{salon_id},Streamed Salon,3 Import St,Uploadville\n,,,\n"
+
+    response = client.post(
+        "/api/v1/admin/import/salons", content=_chunks(body), headers={"Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["loaded"] == 1
+    assert response.json()["reject_file"] == os.path.join(str(tmp_path), os.listdir(tmp_path)[0])
+    with SessionLocal() as db:
+        assert db.get(Salon, salon_id).name == "Streamed Salon"
+
+
+def test_constraint_violation_rolls_back_with_a_structured_409(client, tmp_path):
+    firebase_uid = "import-" + uuid.uuid4().hex
+    with SessionLocal() as db:
+        db.add(User(firebase_uid=firebase_uid, email=f"{firebase_uid}@example.com", name="Existing"))
+        db.commit()
+    body = (
+        "email,name,firebase_uid\n"
+        f"ok-{firebase_uid}@example.com,Fine,\n"
+        f"new-{firebase_uid}@example.com,Clash,{firebase_uid}\n"
+    )
+
+    response = client.post("/api/v1/admin/import/users", content=body, headers={"Content-Type": "text/csv"})
+
+    assert response.status_code == 409
+    detail = response.json()["detail"]
+    assert detail["error"] == "IntegrityError"
+    assert detail["message"].startswith("Import rolled back")
+    assert detail["reject_file"] is None
+    assert os.listdir(tmp_path) == []
+    with SessionLocal() as db:
+        assert db.scalar(select(User.id).where(User.email == f"ok-{firebase_uid}@example.com")) is None
+
+
+def test_database_error_keeps_the_reject_file_and_answers_500(client, tmp_path, monkeypatch):
+    def fail(loader):
+        loader.flush()
+        raise OperationalError("INSERT INTO salons", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(bulk_import._Loader, "finish", fail)
+    salon_id = str(uuid.uuid4())
+    body = json.dumps({"id": salon_id, "name": "Doomed", "address": "4 Import St", "city": "Lost"}) + "\n{}\n"
+
+    response = client.post(
+        "/api/v1/admin/import/salons", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 500
+    detail = response.json()["detail"]
+    assert detail["error"] == "OperationalError"
+    assert detail["reject_file"] == os.path.join(str(tmp_path), os.listdir(tmp_path)[0])
+    with SessionLocal() as db:
+        assert db.get(Salon, salon_id) is None
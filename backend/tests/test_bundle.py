@@ -0,0 +1,79 @@
+"""
+Salon bundle with sparse fields
+"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db import SessionLocal
+from app.models import Salon, Service, Stylist
+
+
+@pytest.fixture(scope="module")
+def salon(db_engine):
+    """(client, salon_id, active stylist_id) for a salon with one inactive stylist"""
+    from app.main import app
+
+    salon = Salon(id=str(uuid.uuid4()), name="Bundle Salon", address="3 Main St", city="Houston", state="TX")
+    active = Stylist(id=str(uuid.uuid4()), salon_id=salon.id, name="Active", rating=4.8)
+    inactive = Stylist(id=str(uuid.uuid4()), salon_id=salon.id, name="Inactive", is_active=False)
+    service = Service(
+        id=str(uuid.uuid4()), stylist_id=active.id, name="Fade", category="haircut",
+        duration_minutes=45, price=35.0
+    )
+    ids = salon.id, active.id
+    with SessionLocal() as db:
+        db.add_all([salon, active, inactive, service])
+        db.commit()
+    with TestClient(app) as client:
+        yield (client, *ids)
+
+
+def test_bundle_returns_salon_stylists_and_services(salon):
+    client, salon_id, stylist_id = salon
+
+    body = client.get(f"/api/v1/salons/{salon_id}/bundle").json()
+
+    assert body["salon"]["name"] == "Bundle Salon"
+    assert [s["id"] for s in body["stylists"]] == [stylist_id]
+    assert [s["name"] for s in body["stylists"][0]["services"]] == ["Fade"]
+
+
+def test_bundle_keeps_only_requested_fields_and_id(salon):
+    client, salon_id, stylist_id = salon
+
+    body = client.get(
+        f"/api/v1/salons/{salon_id}/bundle",
+        params={"salon_fields": "name,city", "stylist_fields": "name", "service_fields": "price"}
+    ).json()
+
+    assert body["salon"] == {"id": salon_id, "name": "Bundle Salon", "city": "Houston"}
+    stylist = body["stylists"][0]
+    assert set(stylist) == {"id", "name", "services"}
+    assert [set(service) for service in stylist["services"]] == [{"id", "price"}]
+
+    without_services = client.get(
+        f"/api/v1/salons/{salon_id}/bundle", params={"stylist_fields": "name", "include_services": "false"}
+    ).json()
+    assert without_services["stylists"] == [{"id": stylist_id, "name": "Active"}]
+
+
+@pytest.mark.parametrize("param, field", [
+    ("salon_fields", "owner_email"),
+    ("stylist_fields", "services"),
+    ("service_fields", "cost"),
+])
+def test_unknown_field_is_rejected(salon, param, field):
+    client, salon_id, _ = salon
+
+    response = client.get(f"/api/v1/salons/{salon_id}/bundle", params={param: f"name,{field}"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Unknown {param}: {field}"
+
+
+def test_bundle_of_unknown_salon_is_404(salon):
+    client, _, _ = salon
+
+    assert client.get("/api/v1/salons/no-such-salon/bundle").status_code == 404
@@ -0,0 +1,147 @@
+"""
+Response cache backends, exercised against an in-memory Redis fake
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import MemoryBackend, RedisBackend, ResponseCache
+
+
+class FakeRedis:
+    """The redis.asyncio calls RedisBackend makes, kept in a dict of bytes"""
+
+    def __init__(self, store=None):
+        self.store = {} if store is None else store
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value.encode()
+        self.expiry[key] = ex
+
+    async def incr(self, key):
+        return _incr(self.store, key)
+
+
+def _incr(store, key):
+    value = int(store.get(key, b"0")) + 1
+    store[key] = str(value).encode()
+    return value
+
+
+class FakeSyncRedis:
+    """Blocking counterpart sharing the same store"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def incr(self, key):
+        return _incr(self.store, key)
+
+
+def make_backend():
+    client = FakeRedis()
+    return RedisBackend(client, sync_client=FakeSyncRedis(client.store)), client
+
+
+async def test_redis_round_trip_and_ttl():
+    backend, client = make_backend()
+    await backend.set("a", {"body": "[]"}, 2.5)
+
+    assert await backend.get("a") == {"body": "[]"}
+    assert await backend.get_many(["a", "missing"]) == [{"body": "[]"}, None]
+    assert client.expiry["zelux:a"] == 2
+    assert "zelux:a" in client.store
+
+
+async def test_invalidate_changes_keys():
+    backend, _ = make_backend()
+    response_cache = ResponseCache(backend)
+
+    before = await response_cache.build_key("salons", {"page": 1}, ["salons"])
+    await response_cache.store(before, {"body": '{"salons": []}'}, ttl=60, stale_ttl=0)
+    response_cache.invalidate("salons")
+    await asyncio.sleep(0)
+    after = await response_cache.build_key("salons", {"page": 1}, ["salons"])
+
+    assert before != after
+    assert await backend.get(after) is None
+    assert (await backend.get(before))["body"] == '{"salons": []}'
+
+
+def test_incr_off_the_loop_uses_the_sync_client():
+    backend, client = make_backend()
+    # e.g. a commit hook in a worker thread or a CLI script
+    worker = threading.Thread(target=backend.incr_nowait, args=("tag:stylists",))
+    worker.start()
+    worker.join()
+
+    assert client.store["zelux:tag:stylists"] == b"1"
+
+
+def test_incr_without_any_loop_is_logged(monkeypatch, caplog):
+    client = FakeRedis()
+    backend = RedisBackend(client)
+    monkeypatch.setattr(cache_module, "_main_loop", None)
+
+    backend.incr_nowait("tag:salons")
+
+    assert "zelux:tag:salons" not in client.store
+    assert "tag:salons" in caplog.text
+
+
+@pytest.mark.parametrize("env, expected", [
+    ({}, "memory"),
+    ({"WEB_CONCURRENCY": 4}, "none"),
+    ({"WEB_CONCURRENCY": 4, "CACHE_URL": "redis://cache"}, "redis"),
+    ({"METRICS_DIR": "/tmp/metrics", "CACHE_URL": "redis://cache"}, "redis"),
+    ({"WEB_CONCURRENCY": 4, "CACHE_BACKEND": "none"}, "none"),
+    ({"CACHE_BACKEND": "redis", "CACHE_URL": "redis://cache"}, "redis"),
+])
+def test_default_backend_depends_on_the_worker_count(monkeypatch, env, expected):
+    settings = {"CACHE_BACKEND": None, "CACHE_URL": None, "WEB_CONCURRENCY": 1, "METRICS_DIR": None, **env}
+    for name, value in settings.items():
+        monkeypatch.setattr(cache_module.settings, name, value)
+
+    assert cache_module.cache_backend_name() == expected
+
+
+@pytest.mark.parametrize("env", [{"WEB_CONCURRENCY": 2}, {"METRICS_DIR": "/tmp/metrics"}])
+def test_memory_backend_is_refused_with_several_workers(monkeypatch, env):
+    monkeypatch.setattr(cache_module.settings, "CACHE_BACKEND", "memory")
+    monkeypatch.setattr(cache_module.settings, "METRICS_DIR", None)
+    for name, value in env.items():
+        monkeypatch.setattr(cache_module.settings, name, value)
+
+    with pytest.raises(RuntimeError, match="per process"):
+        cache_module.cache_backend_name()
+
+
+async def test_scheduled_bumps_are_referenced_until_done():
+    backend, client = make_backend()
+
+    backend.incr_nowait("tag:services")
+    assert len(cache_module._pending) == 1
+    for _ in range(2):  # run the task, then its done callback
+        await asyncio.sleep(0)
+
+    assert client.store["zelux:tag:services"] == b"1"
+    assert not cache_module._pending
+
+
+async def test_memory_backend_counters_are_not_evicted():
+    backend = MemoryBackend(max_entries=1)
+    backend.incr_nowait("tag:salons")
+    await backend.set("x", 1, None)
+    await backend.set("y", 2, None)
+
+    assert await backend.get("tag:salons") == 1
+    assert await backend.get("x") is None
@@ -0,0 +1,117 @@
+"""
+Responses and media are compressed per Accept-Encoding and vary on it
+"""
+import gzip
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+from app.core.compression import (
+    CompressionMiddleware, PrecompressedStaticFiles, brotli, precompress_directory
+)
+
+
+BODY = "stylist " * 512
+
+
+def _streamed(request):
+    async def lines():
+        for i in range(3):
+            yield f'{{"line": {i}, "pad": "{"x" * 600}"}}\n'
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@pytest.fixture(scope="module")
+def media(tmp_path_factory):
+    root = tmp_path_factory.mktemp("media")
+    (root / "big.json").write_text('{"pad": "%s"}' % ("y" * 4096))
+    (root / "plain.json").write_text('{"pad": "%s"}' % ("z" * 4096))
+    precompress_directory(str(root))
+    # plain.json is served without siblings
+    for suffix in (".gz", ".br"):
+        if (root / ("plain.json" + suffix)).exists():
+            os.remove(root / ("plain.json" + suffix))
+    return root
+
+
+@pytest.fixture(scope="module")
+def client(media):
+    app = Starlette(routes=[
+        Route("/text", lambda request: PlainTextResponse(BODY)),
+        Route("/small", lambda request: PlainTextResponse("tiny")),
+        Route("/stream", _streamed),
+        Mount("/media", PrecompressedStaticFiles(directory=str(media))),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+
+def _get(client, path, accept):
+    # httpx decodes gzip/br itself; read the wire bytes instead
+    with client.stream("GET", path, headers={"Accept-Encoding": accept}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_gzip_when_only_gzip_is_accepted(client):
+    response, raw = _get(client, "/text", "gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(raw)
+    assert gzip.decompress(raw).decode() == BODY
+
+
+@pytest.mark.skipif(brotli is None, reason="brotli not installed")
+def test_brotli_is_preferred_when_accepted(client):
+    response, raw = _get(client, "/text", "gzip, br")
+
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert brotli.decompress(raw).decode() == BODY
+
+
+@pytest.mark.parametrize("accept", ["identity", "gzip;q=0, br;q=0"])
+def test_identity_when_nothing_usable_is_accepted(client, accept):
+    response, raw = _get(client, "/text", accept)
+
+    assert "content-encoding" not in response.headers
+    assert raw.decode() == BODY
+
+
+def test_small_bodies_are_sent_as_is(client):
+    response, raw = _get(client, "/small", "gzip")
+
+    assert "content-encoding" not in response.headers
+    assert raw == b"tiny"
+
+
+def test_streamed_bodies_are_compressed_without_a_length(client):
+    response, raw = _get(client, "/stream", "gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert "content-length" not in response.headers
+    assert len(gzip.decompress(raw).splitlines()) == 3
+
+
+def test_media_serves_the_precompressed_sibling(client, media):
+    response, raw = _get(client, "/media/big.json", "gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert raw == (media / "big.json.gz").read_bytes()
+
+
+def test_media_identity_varies_only_when_a_sibling_exists(client, media):
+    response, raw = _get(client, "/media/big.json", "identity")
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert raw == (media / "big.json").read_bytes()
+
+    response, _ = _get(client, "/media/plain.json", "identity")
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
@@ -0,0 +1,106 @@
+"""
+Cached catalog routes answer hits and revalidations without the database
+"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.db import SessionLocal
+from app.models import Salon, Service, Stylist
+
+
+@pytest.fixture(scope="module")
+def client(db_engine):
+    from app.main import app
+
+    db = SessionLocal()
+    salon = Salon(id=str(uuid.uuid4()), name="Cache Test Salon", address="1 Main St", city="Austin", state="TX")
+    stylist = Stylist(id=str(uuid.uuid4()), salon_id=salon.id, name="Cache Test Stylist")
+    service = Service(
+        id=str(uuid.uuid4()), stylist_id=stylist.id, name="Cut", category="haircut",
+        duration_minutes=30, price=40.0
+    )
+    stylist_id = stylist.id
+    db.add_all([salon, stylist, service])
+    db.commit()
+    db.close()
+    with TestClient(app) as test_client:
+        test_client.stylist_id = stylist_id
+        yield test_client
+
+
+@pytest.fixture
+def statements(db_engine):
+    """SQL statements executed while the test runs"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(db_engine, "before_cursor_execute", record)
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/salons?city=austin",
+    "/api/v1/stylists?city=austin",
+    "/api/v1/pros?city=austin",
+    "/api/v1/stylists/{stylist_id}/services",
+])
+def test_hits_and_304s_skip_the_database(client, statements, path):
+    path = path.format(stylist_id=client.stylist_id)
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert statements
+
+    statements.clear()
+    hit = client.get(path)
+    not_modified = client.get(path, headers={"If-None-Match": etag})
+
+    assert hit.status_code == 200
+    assert hit.headers["etag"] == etag
+    assert hit.content == first.content
+    assert not_modified.status_code == 304
+    assert statements == []
+
+
+def test_revalidation_on_a_miss_skips_the_handler(client, statements):
+    etag = client.get("/api/v1/salons?city=dallas").headers["etag"]
+    statements.clear()
+
+    # Different parameters with the same validators: only the ETag query runs
+    response = client.get("/api/v1/salons?city=dallas&page=2", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert len(statements) == 1
+
+
+@pytest.mark.parametrize("prefix", ["/api/v1/stylists", "/api/v1/pros"])
+def test_detail_reads_one_row_unless_the_request_is_conditional(client, statements, prefix):
+    path = f"{prefix}/{client.stylist_id}"
+
+    first = client.get(path)
+    assert first.status_code == 200
+    assert first.headers["last-modified"]
+    assert len(statements) == 1
+
+    statements.clear()
+    missing = client.get(f"{prefix}/no-such-stylist")
+    assert missing.status_code == 404
+    assert len(statements) == 1
+
+    # A conditional request is answered from the refreshed_at probe alone
+    statements.clear()
+    not_modified = client.get(path, headers={"If-None-Match": first.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert len(statements) == 1
+
+    statements.clear()
+    changed = client.get(path, headers={"If-None-Match": 'W/"stale"'})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] == first.headers["etag"]
+    assert len(statements) == 2
@@ -0,0 +1,74 @@
+"""
+Pooled connections are pinged only after sitting idle, and replaced when dead
+"""
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.core.config import settings
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(db, "time", clock)
+    monkeypatch.setattr(settings, "DB_POOL_PING_IDLE", 60)
+    engine = db.create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    engine.clock = clock
+    yield engine
+    engine.dispose()
+
+
+def _checkout(engine):
+    """(DBAPI connection, result of a query) for one checkout"""
+    with engine.connect() as connection:
+        return connection.connection.dbapi_connection, connection.execute(text("SELECT 42")).scalar()
+
+
+def _traced(engine) -> tuple:
+    """A pooled DBAPI connection and the SQL it runs from now on"""
+    dbapi_connection, _ = _checkout(engine)
+    statements = []
+    dbapi_connection.set_trace_callback(statements.append)
+    return dbapi_connection, statements
+
+
+@pytest.mark.parametrize("idle, pinged", [(59, False), (61, True)])
+def test_only_idle_connections_are_pinged(engine, idle, pinged):
+    first, statements = _traced(engine)
+
+    engine.clock.now += idle
+    second, answer = _checkout(engine)
+
+    assert second is first and answer == 42
+    assert ("SELECT 1" in statements) is pinged
+
+
+def test_idle_connection_that_fails_the_ping_is_replaced(engine):
+    dead, _ = _checkout(engine)
+    # The server dropped the connection while it sat in the pool
+    dead.close()
+
+    engine.clock.now += 61
+    fresh, answer = _checkout(engine)
+
+    assert fresh is not dead
+    assert answer == 42
+    assert engine.pool.checkedin() == 1
+
+
+def test_dead_connection_is_not_noticed_before_the_idle_threshold(engine):
+    dead, _ = _checkout(engine)
+    dead.close()
+    engine.clock.now += 30
+
+    with pytest.raises(Exception, match="closed"):
+        _checkout(engine)
@@ -0,0 +1,208 @@
+"""
+Firebase ID tokens verify against cached, refreshed signing keys
+"""
+from datetime import datetime, timedelta
+import asyncio
+import itertools
+import json
+import time
+
+import httpx
+import jwt
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from jwt.algorithms import RSAAlgorithm
+
+from app.core import firebase, tracing
+
+
+PROJECT = "zelux-test"
+
+_urls = itertools.count()
+
+
+def _keypair(kid: str):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update(kid=kid, alg="RS256", use="sig")
+    return private_key, jwk
+
+
+def _token(private_key, kid: str, exp: float, uid: str = "user-1") -> str:
+    now = int(time.time())
+    return jwt.encode({
+        "iss": f"https://securetoken.google.com/{PROJECT}",
+        "aud": PROJECT,
+        "sub": uid,
+        "iat": now,
+        "exp": int(exp),
+    }, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+def _certificate(private_key) -> str:
+    """Self-signed PEM certificate, as in Google's x509 key map"""
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken.test")])
+    now = datetime.utcnow()
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(private_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(private_key, hashes.SHA256())
+    )
+    return certificate.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class StubCerts:
+    """
+    Key endpoint behind httpx.MockTransport, serving `documents` in turn
+    (the last one repeats): lists of JWKs as a JWKS document, dicts as an
+    x509 certificate map
+    """
+
+    def __init__(self, *documents, cache_control="public, max-age=100"):
+        self.documents = list(documents)
+        self.cache_control = cache_control
+        self.calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        document = self.documents[min(self.calls, len(self.documents) - 1)]
+        self.calls += 1
+        body = {"keys": document} if isinstance(document, list) else document
+        headers = {"cache-control": self.cache_control} if self.cache_control else {}
+        return httpx.Response(200, json=body, headers=headers)
+
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(firebase, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def key_a():
+    return _keypair("key-a")
+
+
+def _install(monkeypatch, stub):
+    # The real fetch_certs runs, with the stub as its transport
+    transport = httpx.MockTransport(stub)
+    monkeypatch.setattr(
+        firebase, "traced_http_client", lambda **kwargs: tracing.traced_http_client(transport=transport, **kwargs)
+    )
+    # A fresh URL per store, so single-flight keys do not leak between tests
+    store = firebase.FirebaseKeyStore(url=f"https://certs.test/{next(_urls)}")
+    monkeypatch.setattr(firebase, "_key_store", store)
+    return store
+
+
+async def test_keys_are_served_from_the_cache(monkeypatch, clock, key_a):
+    private_key, jwk = key_a
+    stub = StubCerts([jwk])
+    _install(monkeypatch, stub)
+    token = _token(private_key, "key-a", time.time() + 600)
+
+    for _ in range(3):
+        payload = await firebase.verify_id_token(token, PROJECT)
+
+    assert payload["uid"] == "user-1"
+    assert stub.calls == 1
+
+
+async def test_token_is_rejected_once_it_expires(monkeypatch, clock, key_a):
+    private_key, jwk = key_a
+    _install(monkeypatch, StubCerts([jwk]))
+
+    assert await firebase.verify_id_token(_token(private_key, "key-a", time.time() + 60), PROJECT)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        await firebase.verify_id_token(_token(private_key, "key-a", time.time() - 1), PROJECT)
+
+
+async def test_keys_are_refreshed_according_to_max_age(monkeypatch, clock, key_a):
+    private_key, jwk = key_a
+    stub = StubCerts([jwk], cache_control="public, max-age=100, must-revalidate")
+    store = _install(monkeypatch, stub)
+    token = _token(private_key, "key-a", time.time() + 600)
+
+    await firebase.verify_id_token(token, PROJECT)
+    assert store.expires_at == clock.now + 100
+
+    # Past REFRESH_AFTER of the max-age: served from the current keys while
+    # a background refresh runs
+    clock.now += 95
+    await firebase.verify_id_token(token, PROJECT)
+    assert stub.calls == 1
+    await store._refresh_task
+    assert stub.calls == 2
+    assert store.expires_at == clock.now + 100
+
+    # Past the new max-age: the keys are refetched before verifying
+    clock.now += 101
+    await firebase.verify_id_token(token, PROJECT)
+    assert stub.calls == 3
+
+
+async def test_unknown_kid_triggers_exactly_one_refetch(monkeypatch, clock, key_a):
+    private_key, jwk = key_a
+    rotated_key, rotated_jwk = _keypair("key-b")
+    stub = StubCerts([jwk], [jwk, rotated_jwk])
+    _install(monkeypatch, stub)
+    await firebase.verify_id_token(_token(private_key, "key-a", time.time() + 600), PROJECT)
+
+    clock.now += firebase.UNKNOWN_KID_REFETCH
+    token = _token(rotated_key, "key-b", time.time() + 600, uid="user-2")
+    payloads = await asyncio.gather(*[firebase.verify_id_token(token, PROJECT) for _ in range(5)])
+
+    assert {payload["uid"] for payload in payloads} == {"user-2"}
+    assert stub.calls == 2
+
+    # Made-up key ids do not refetch again within UNKNOWN_KID_REFETCH
+    forged_key, _ = _keypair("key-x")
+    with pytest.raises(jwt.InvalidTokenError, match="Unknown signing key"):
+        await firebase.verify_id_token(_token(forged_key, "key-x", time.time() + 600), PROJECT)
+    assert stub.calls == 2
+
+
+async def test_x509_certificate_maps_are_accepted(monkeypatch, clock, key_a):
+    private_key, _ = key_a
+    _install(monkeypatch, StubCerts({"key-a": _certificate(private_key)}))
+
+    payload = await firebase.verify_id_token(_token(private_key, "key-a", time.time() + 600), PROJECT)
+
+    assert payload["uid"] == "user-1"
+
+
+@pytest.mark.parametrize("cache_control, max_age", [
+    ("public, max-age=19137, must-revalidate, no-transform", 19137),
+    ("no-cache", firebase.DEFAULT_MAX_AGE),
+    (None, firebase.DEFAULT_MAX_AGE),
+])
+async def test_keys_expire_after_the_response_max_age(monkeypatch, clock, key_a, cache_control, max_age):
+    _, jwk = key_a
+    store = _install(monkeypatch, StubCerts([jwk], cache_control=cache_control))
+
+    await store.get_key("key-a")
+
+    assert store.expires_at == clock.now + max_age
+
+
+async def test_failed_fetch_raises(monkeypatch, clock):
+    _install(monkeypatch, lambda request: httpx.Response(503))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await firebase.get_key_store().get_key("key-a")
@@ -0,0 +1,64 @@
+"""
+The synthetic dataset is a pure function of its seed and volumes
+"""
+import random
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from app.models import Salon, Service, Stylist, StylistCard, User
+from benchmarks import generate_dataset
+
+
+TABLES = [User.__table__, Salon.__table__, Stylist.__table__, Service.__table__, StylistCard.__table__]
+
+
+def _generate(tmp_path, name: str, *args) -> dict:
+    url = f"sqlite:///{tmp_path / name}"
+    assert generate_dataset.main(["--salons", "12", "--database-url", url, *args]) == 0
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            return {
+                table.name: connection.execute(select(table).order_by(table.c.id)).all()
+                for table in TABLES
+            }
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.parametrize("generate, args", [
+    (generate_dataset.generate_users, (30, 20)),
+    (generate_dataset.generate_salons, (30,)),
+    (generate_dataset.generate_stylists, (30, 5, 10)),
+    (generate_dataset.generate_services, (30, 10)),
+])
+def test_generators_repeat_for_a_seed(generate, args):
+    first = list(generate(random.Random("7-rows"), *args))
+
+    assert list(generate(random.Random("7-rows"), *args)) == first
+    assert list(generate(random.Random("8-rows"), *args)) != first
+    assert len(first) == 30
+
+
+def test_same_arguments_load_the_same_database(tmp_path):
+    first = _generate(tmp_path, "first.db")
+    second = _generate(tmp_path, "second.db")
+
+    assert {name: len(rows) for name, rows in first.items()} == {
+        "users": 120, "salons": 12, "stylists": 120, "services": 960, "stylist_cards": 120,
+    }
+    # Cards carry refresh timestamps, which differ between runs
+    for name in ("users", "salons", "stylists", "services"):
+        assert first[name] == second[name], name
+    assert _generate(tmp_path, "other-seed.db", "--seed", "7")["salons"] != first["salons"]
+
+
+def test_changing_one_volume_keeps_the_other_tables(tmp_path):
+    base = _generate(tmp_path, "base.db", "--skip-cards")
+    more_services = _generate(tmp_path, "more.db", "--skip-cards", "--services", "200")
+
+    assert len(more_services["services"]) == 200
+    assert more_services["stylist_cards"] == []
+    for name in ("users", "salons", "stylists"):
+        assert more_services[name] == base[name], name
@@ -0,0 +1,88 @@
+"""
+HTTP benchmark helpers: percentiles, summaries, baselines and load models
+"""
+import asyncio
+import random
+import time
+
+import httpx
+import pytest
+
+from benchmarks import http_bench
+
+
+@pytest.mark.parametrize("q, expected", [(50, 5), (95, 10), (99, 10), (10, 1), (0, 1)])
+def test_percentile_is_nearest_rank(q, expected):
+    assert http_bench.percentile(list(range(1, 11)), q) == expected
+
+
+def test_percentile_of_nothing_is_none():
+    assert http_bench.percentile([], 95) is None
+
+
+def test_summarize_counts_statuses_and_errors():
+    samples = http_bench.Samples()
+    for latency, status, ok in [(0.002, "200", True), (0.004, "200", True), (0.010, "503", False)]:
+        samples.record(latency, status, ok)
+
+    summary = http_bench.summarize(samples, 2.0)
+
+    assert summary == {
+        "requests": 3, "errors": 1, "rps": 1.5,
+        "p50_ms": 4.0, "p95_ms": 10.0, "p99_ms": 10.0, "max_ms": 10.0,
+        "statuses": {"200": 2, "503": 1},
+    }
+
+
+def _report(p95_ms: float, rps: float) -> dict:
+    meta = {"target": "in-process", "model": "closed", "concurrency": 10, "rate": None}
+    return {"meta": meta, "scenarios": {"detail": {"p95_ms": p95_ms, "rps": rps}}}
+
+
+@pytest.mark.parametrize("p95_ms, max_regression, ok", [
+    (11.0, 15, True),
+    (12.0, 15, False),
+    (30.0, None, True),
+])
+def test_compare_flags_p95_regressions(p95_ms, max_regression, ok, capsys):
+    assert http_bench.compare(_report(p95_ms, 900), _report(10.0, 1000), max_regression) is ok
+    assert "rps   -10.0%" in capsys.readouterr().err
+
+
+def _slow_client(delay: float, statuses: list) -> httpx.AsyncClient:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delay)
+        return httpx.Response(statuses.pop(0) if statuses else 200, json=[])
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://bench")
+
+
+async def test_open_model_measures_from_the_scheduled_start(monkeypatch):
+    ctx = http_bench.Context(random.Random(1))
+    started = []
+
+    async def blocking(ctx, client):
+        # A stalled server: every request blocks the loop for 20 ms
+        started.append(None)
+        time.sleep(0.02)
+        return httpx.Response(200)
+
+    monkeypatch.setitem(http_bench.SCENARIOS, "stalled", blocking)
+    async with _slow_client(0, []) as client:
+        samples = await http_bench.run_open(ctx, client, "stalled", rate=200, duration=0.2)
+
+    latencies = sorted(samples.latencies)
+    # Arrivals keep coming every ~5 ms while each takes 20 ms, so queueing
+    # shows up as latencies well above the 20 ms service time
+    assert len(latencies) == len(started) > 10
+    assert latencies[-1] > 0.1
+
+
+async def test_closed_model_records_http_errors():
+    ctx = http_bench.Context(random.Random(1))
+    async with _slow_client(0.001, [500, 404]) as client:
+        samples = await http_bench.run_closed(ctx, client, "feed", concurrency=1, duration=0.05)
+
+    assert samples.statuses["500"] == samples.statuses["404"] == 1
+    assert samples.errors == 2
+    assert samples.statuses["200"] == len(samples.latencies) - 2
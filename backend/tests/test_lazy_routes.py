@@ -0,0 +1,54 @@
+"""
+The ai and admin routers are imported on first use, not with app.main
+"""
+import json
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Other tests import the lazy routers, so the check runs in a fresh interpreter
+CHILD = """
+import json, sys
+from fastapi.testclient import TestClient
+
+LAZY = ["app.routers.ai", "app.routers.admin"]
+
+def loaded():
+    return [name for name in LAZY if name in sys.modules]
+
+import app.main
+steps = {"import": loaded()}
+client = TestClient(app.main.app)
+steps["ai request"] = (client.get("/api/v1/ai/styles/trending").status_code, loaded())
+steps["openapi"] = (client.get("/openapi.json").status_code, loaded())
+print(json.dumps(steps))
+"""
+
+
+def test_lazy_routers_load_on_first_request_and_for_openapi():
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=BACKEND_DIR, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    steps = json.loads(result.stdout.splitlines()[-1])
+
+    assert steps["import"] == []
+    ai_status, loaded = steps["ai request"]
+    assert ai_status != 404
+    assert loaded == ["app.routers.ai"]
+    assert steps["openapi"] == [200, ["app.routers.ai", "app.routers.admin"]]
+
+
+def test_lifespan_runs_startup_and_cancels_background_tasks(db_engine):
+    from app.main import app
+
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        task = app.state.metrics_task
+        assert not task.done()
+
+    assert task.cancelled()
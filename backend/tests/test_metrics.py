@@ -0,0 +1,80 @@
+"""
+Worker metric snapshots merge, and exited workers' counters are kept
+"""
+import json
+import os
+import subprocess
+import sys
+
+from app.core import metrics
+from app.core.config import settings
+
+
+def test_collect_snapshots_skips_stray_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_DIR", str(tmp_path))
+    parent = {"requests_total": {"type": "counter", "help": "", "values": []}}
+    (tmp_path / f"metrics-{os.getppid()}.json").write_text(json.dumps(parent))
+    for name in ("metrics-backup.json", "metrics-.json", "metrics-12-old.json"):
+        (tmp_path / name).write_text("{}")
+
+    snapshots = metrics.collect_snapshots()
+
+    assert snapshots[1:] == [parent]
+    assert len(os.listdir(tmp_path)) == 4
+
+
+def _worker_snapshot(requests: int, latency: float, checked_out: int, lag: float) -> dict:
+    registry = metrics.Registry()
+    counter = registry.register(metrics.Counter("requests_total", "Requests", ("route",)))
+    histogram = registry.register(metrics.Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)))
+    summed = registry.register(metrics.Gauge("checked_out", "In use"))
+    maxed = registry.register(metrics.Gauge("lag_seconds", "Lag", merge="max"))
+    counter.inc(("/a",), requests)
+    histogram.observe(latency)
+    summed.set(checked_out)
+    maxed.set(lag)
+    return json.loads(json.dumps(registry.snapshot()))
+
+
+def test_merge_sums_counters_and_histograms_and_combines_gauges():
+    merged = metrics.merge_snapshots([
+        _worker_snapshot(3, 0.05, 2, 0.01),
+        _worker_snapshot(4, 0.5, 5, 0.2),
+        _worker_snapshot(1, 5.0, 1, 0.05),
+    ])
+
+    assert merged["requests_total"]["values"] == {("/a",): 8}
+    assert merged["latency_seconds"]["values"] == {(): [1, 1, 1, 5.55]}
+    assert merged["checked_out"]["values"] == {(): 8}
+    assert merged["lag_seconds"]["values"] == {(): 0.2}
+    text = metrics.render(merged)
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+
+
+def _dead_pid() -> int:
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    child.wait()
+    return child.pid
+
+
+def test_dead_workers_keep_their_counters_but_not_their_gauges(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics, "registry", metrics.Registry())
+    live = _worker_snapshot(2, 0.05, 1, 0.01)
+    (tmp_path / f"metrics-{os.getppid()}.json").write_text(json.dumps(live))
+
+    for requests in (3, 4):
+        (tmp_path / f"metrics-{_dead_pid()}.json").write_text(json.dumps(_worker_snapshot(requests, 0.5, 7, 0.3)))
+        merged = metrics.merge_snapshots(metrics.collect_snapshots())
+    # Scraping again after the workers are gone changes nothing
+    assert metrics.merge_snapshots(metrics.collect_snapshots()) == merged
+
+    assert merged["requests_total"]["values"] == {("/a",): 9}
+    assert merged["latency_seconds"]["values"] == {(): [1, 2, 0, 1.05]}
+    assert merged["checked_out"]["values"] == {(): 1}
+    assert merged["lag_seconds"]["values"] == {(): 0.01}
+    assert sorted(path.name for path in tmp_path.glob("*.json")) == sorted(
+        [f"metrics-{os.getppid()}.json", metrics.RETIRED_FILENAME]
+    )
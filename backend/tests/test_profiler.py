@@ -0,0 +1,55 @@
+"""
+SIGUSR2 starts a worker profile from the event loop, not the signal handler
+"""
+import asyncio
+import os
+import signal
+
+import pytest
+
+from app.core import profiler
+from app.core.config import settings
+
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, "SIGUSR2"), reason="no SIGUSR2 on this platform")
+
+
+async def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def test_sigusr2_profiles_the_worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_SIGNAL_SECONDS", 0.2)
+    loop = asyncio.get_running_loop()
+    assert profiler.install_signal_handler()
+    try:
+        os.kill(os.getpid(), signal.SIGUSR2)
+        await _wait_for(lambda: profiler.profile_status()["running"])
+        # A second signal while running is ignored
+        os.kill(os.getpid(), signal.SIGUSR2)
+        await _wait_for(lambda: not profiler.profile_status()["running"])
+    finally:
+        loop.remove_signal_handler(signal.SIGUSR2)
+
+    output = profiler.profile_status()["last_output"]
+    assert os.path.dirname(output) == str(tmp_path)
+    assert os.listdir(tmp_path) == [os.path.basename(output)]
+
+
+async def test_signal_handler_does_not_take_the_profiler_lock(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_SIGNAL_SECONDS", 0.1)
+    loop = asyncio.get_running_loop()
+    assert profiler.install_signal_handler(loop)
+    try:
+        with profiler._lock:
+            # Delivered while the lock is held: only the loop is woken up
+            os.kill(os.getpid(), signal.SIGUSR2)
+        await _wait_for(lambda: profiler.profile_status()["running"])
+        await _wait_for(lambda: not profiler.profile_status()["running"])
+    finally:
+        loop.remove_signal_handler(signal.SIGUSR2)
@@ -0,0 +1,105 @@
+"""
+Stylist cards follow ORM writes in the same transaction
+"""
+import uuid
+
+import pytest
+
+from app.core import projections
+from app.db import SessionLocal, register_session_hooks
+from app.models import Salon, Service, Stylist, StylistCard
+
+
+def _card(stylist_id: str) -> StylistCard:
+    with SessionLocal() as db:
+        return db.get(StylistCard, stylist_id)
+
+
+@pytest.fixture
+def stylist(db_engine):
+    """(salon_id, stylist_id, service_id) of a freshly added stylist"""
+    salon = Salon(id=str(uuid.uuid4()), name="Projection Salon", address="2 Main St", city="Austin", state="TX")
+    stylist = Stylist(id=str(uuid.uuid4()), salon_id=salon.id, name="Projection Stylist")
+    service = Service(
+        id=str(uuid.uuid4()), stylist_id=stylist.id, name="Cut", category="haircut",
+        duration_minutes=30, price=40.0
+    )
+    ids = salon.id, stylist.id, service.id
+    with SessionLocal() as db:
+        db.add_all([salon, stylist, service])
+        db.commit()
+    return ids
+
+
+def test_card_is_built_when_the_stylist_is_added(stylist):
+    _, stylist_id, service_id = stylist
+
+    card = _card(stylist_id)
+
+    assert card.name == "Projection Stylist"
+    assert card.salon_city == "Austin"
+    assert card.location == "Austin, TX"
+    assert [s["id"] for s in card.services] == [service_id]
+
+
+def test_salon_city_change_updates_its_stylists_cards(stylist):
+    salon_id, stylist_id, _ = stylist
+
+    with SessionLocal() as db:
+        db.get(Salon, salon_id).city = "Dallas"
+        db.commit()
+
+    card = _card(stylist_id)
+    assert card.salon_city == "Dallas"
+    assert card.location == "Dallas, TX"
+
+
+def test_service_add_and_delete_update_the_card(stylist):
+    _, stylist_id, service_id = stylist
+
+    with SessionLocal() as db:
+        db.add(Service(
+            id="color-" + stylist_id, stylist_id=stylist_id, name="Color", category="color",
+            duration_minutes=90, price=120.0
+        ))
+        db.commit()
+    card = _card(stylist_id)
+    assert {s["name"] for s in card.services} == {"Cut", "Color"}
+    assert card.service_categories == ["color", "haircut"]
+
+    with SessionLocal() as db:
+        db.delete(db.get(Service, service_id))
+        db.commit()
+    card = _card(stylist_id)
+    assert [s["name"] for s in card.services] == ["Color"]
+    assert card.service_categories == ["color"]
+
+
+def test_deactivated_stylist_card_is_inactive(stylist):
+    _, stylist_id, _ = stylist
+
+    with SessionLocal() as db:
+        db.get(Stylist, stylist_id).is_active = False
+        db.commit()
+
+    assert _card(stylist_id).is_active is False
+
+
+def test_rolled_back_write_leaves_the_card_alone(stylist):
+    _, stylist_id, _ = stylist
+
+    with SessionLocal() as db:
+        db.get(Stylist, stylist_id).name = "Renamed"
+        db.flush()
+        db.rollback()
+
+    assert _card(stylist_id).name == "Projection Stylist"
+
+
+def test_hooks_are_registered_once(db_engine):
+    register_session_hooks()
+    register_session_hooks()
+
+    with SessionLocal() as db:
+        listeners = [fn for fn in db.dispatch.after_flush if fn is projections._refresh_cards_after_flush]
+    assert len(listeners) == 1
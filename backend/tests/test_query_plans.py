@@ -0,0 +1,37 @@
+"""
+Route query plans match benchmarks/plan_snapshots
+"""
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks import query_plans
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The app is already bound to the test database here, so plans are
+# captured in a fresh interpreter against the generated dataset
+CHILD = """
+import json, sys
+from benchmarks.query_plans import capture_generated
+dialect, plans = capture_generated()
+with open(sys.argv[1], "w") as f:
+    json.dump(plans, f)
+"""
+
+
+def test_plans_match_the_sqlite_snapshot(tmp_path):
+    output = tmp_path / "plans.json"
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, str(output)],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    current = json.loads(output.read_text())
+    failures, notes = query_plans.compare(query_plans.load_snapshot("sqlite"), current, cost_tolerance=0.5)
+
+    assert not failures, "\n".join(failures + ["rerun python -m benchmarks.query_plans --update if intended"])
+    assert not [note for note in notes if "not in the snapshot" in note], notes
@@ -0,0 +1,38 @@
+"""
+Server-Timing reports a request's queries, and is left off streamed bodies
+"""
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.query_stats import QueryBudgetExceeded, assert_query_budget, query_budget
+
+
+@pytest.fixture(scope="module")
+def client(db_engine):
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_buffered_response_reports_its_queries(client):
+    with query_budget(10) as stats:
+        response = client.get("/api/v1/salons")
+
+    match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries", app;dur=[\d.]+', response.headers["server-timing"])
+    assert match is not None
+    assert int(match.group(1)) == stats.count > 0
+    assert_query_budget(response, stats.count)
+    with pytest.raises(QueryBudgetExceeded):
+        assert_query_budget(response, stats.count - 1)
+
+
+def test_streamed_response_has_no_server_timing(client):
+    with query_budget(10) as stats:
+        response = client.get("/api/v1/salons", headers={"Accept": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    assert stats.count > 0
+    assert "server-timing" not in response.headers
@@ -0,0 +1,52 @@
+"""
+Replica health comes from background checks, not from pick()
+"""
+import pytest
+from sqlalchemy import create_engine, event
+
+from app.core.replicas import ReplicaSet, replication_lag
+
+
+def _engines(tmp_path):
+    healthy = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    return healthy, broken
+
+
+async def test_pick_uses_only_checked_replicas(tmp_path):
+    healthy, broken = _engines(tmp_path)
+    replicas = ReplicaSet([healthy, broken])
+
+    # Not checked yet: reads stay on the primary
+    assert replicas.pick() is None
+
+    await replicas.check()
+
+    assert {replicas.pick() for _ in range(4)} == {healthy}
+
+
+async def test_pick_does_no_io(tmp_path):
+    healthy, broken = _engines(tmp_path)
+    replicas = ReplicaSet([healthy, broken])
+    await replicas.check()
+
+    checkouts = []
+    for engine in (healthy, broken):
+        event.listen(engine, "checkout", lambda *args: checkouts.append(args))
+    for _ in range(10):
+        replicas.pick()
+
+    assert checkouts == []
+
+
+@pytest.mark.parametrize("in_recovery, caught_up, replay_age, lag", [
+    (False, None, None, 0.0),
+    # Idle primary: nothing to replay, however old the last commit is
+    (True, True, 3600.0, 0.0),
+    (True, False, 12.5, 12.5),
+    # WAL from an archive: no receive position to compare
+    (True, None, 4.0, 4.0),
+    (True, False, None, 0.0),
+])
+def test_replication_lag(in_recovery, caught_up, replay_age, lag):
+    assert replication_lag(in_recovery, caught_up, replay_age) == lag
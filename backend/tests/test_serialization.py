@@ -0,0 +1,79 @@
+"""
+Response bodies are validated once and serialized straight to JSON bytes
+"""
+from datetime import datetime
+import json
+import uuid
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.requests import Request
+
+from app.core import serialization
+from app.db import SessionLocal
+from app.models import Salon
+from app.schemas.salon import SalonResponse
+
+
+def _request(accept: str) -> Request:
+    return Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+
+
+def test_serialize_from_orm_attributes_matches_the_response_model(db_engine):
+    salon = Salon(id=str(uuid.uuid4()), name="Serialized Salon", address="9 Main St", city="Jsonville")
+    with SessionLocal() as db:
+        db.add(salon)
+        db.commit()
+        db.refresh(salon)
+
+        body = serialization.serialize(SalonResponse, salon)
+        expected = jsonable_encoder(SalonResponse.model_validate(salon))
+
+    assert json.loads(body) == expected
+
+
+def test_schema_instances_are_not_validated_again(monkeypatch):
+    class Item(BaseModel):
+        name: str
+
+    def revalidate(*args, **kwargs):
+        raise AssertionError("validated again")
+
+    item = Item(name="kept")
+    monkeypatch.setattr(type(serialization.get_adapter(Item)), "validate_python", revalidate)
+
+    assert serialization.serialize(Item, item) == b'{"name":"kept"}'
+
+
+def test_adapters_are_built_once_per_schema():
+    assert serialization.get_adapter(list[SalonResponse]) is serialization.get_adapter(list[SalonResponse])
+
+
+def test_json_response_keeps_dependency_headers():
+    route_response = Response(headers={"ETag": 'W/"abc"', "Content-Length": "999"})
+
+    response = serialization.json_response(list[int], [1, 2, 3], route_response)
+
+    assert response.body == b"[1,2,3]"
+    assert response.media_type == "application/json"
+    assert response.headers["etag"] == 'W/"abc"'
+    assert response.headers["content-length"] == "7"
+
+
+def test_render_json_handles_models_and_datetimes():
+    class Item(BaseModel):
+        at: datetime
+
+    moment = datetime(2024, 5, 1, 12, 30)
+
+    assert serialization.render_json(Item(at=moment)) == b'{"at":"2024-05-01T12:30:00"}'
+    assert json.loads(serialization.render_json({"items": [Item(at=moment)], "at": moment})) == {
+        "items": [{"at": "2024-05-01T12:30:00"}], "at": "2024-05-01T12:30:00",
+    }
+
+
+def test_ndjson_is_opted_into_through_accept():
+    assert serialization.wants_ndjson(_request("application/x-ndjson"))
+    assert serialization.wants_ndjson(_request("application/json, application/x-ndjson;q=0.9"))
+    assert not serialization.wants_ndjson(_request("application/json"))
@@ -0,0 +1,83 @@
+"""
+Single-flight coalescing
+"""
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_run():
+    group = SingleFlight()
+    runs = 0
+
+    async def compute():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.01)
+        return "card"
+
+    results = await asyncio.gather(*(group.do("stylist:1", compute) for _ in range(5)))
+
+    assert results == ["card"] * 5
+    assert runs == 1
+    assert group.stats("stylist:1") == {"calls": 1, "coalesced": 4}
+
+
+async def test_errors_reach_every_waiter():
+    group = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise LookupError("gone")
+
+    results = await asyncio.gather(
+        *(group.do("stylist:1", compute) for _ in range(3)),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, LookupError) for result in results)
+
+
+async def test_cancelled_leader_hands_over_to_a_waiter():
+    group = SingleFlight()
+    started = asyncio.Event()
+    runs = 0
+
+    async def compute():
+        nonlocal runs
+        runs += 1
+        started.set()
+        await asyncio.sleep(0.05)
+        return "card"
+
+    leader = asyncio.create_task(group.do("stylist:1", compute))
+    await started.wait()
+    waiters = [asyncio.create_task(group.do("stylist:1", compute)) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert await asyncio.gather(*waiters) == ["card"] * 3
+    # One waiter took over; the other two coalesced onto it
+    assert runs == 2
+
+
+async def test_cancelled_waiter_does_not_cancel_the_leader():
+    group = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "card"
+
+    leader = asyncio.create_task(group.do("stylist:1", compute))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(group.do("stylist:1", compute))
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    assert await leader == "card"
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
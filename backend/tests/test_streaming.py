@@ -0,0 +1,82 @@
+"""
+NDJSON streams read through yield_per in bounded batches
+"""
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core import streaming
+from app.db import SessionLocal
+from app.models import Salon
+from app.schemas.salon import SalonResponse
+
+
+CITY = "Streamville"
+SALONS = 7
+
+
+@pytest.fixture(scope="module")
+def salon_ids(db_engine):
+    salons = [
+        Salon(
+            id=f"stream-{i}-{uuid.uuid4().hex}", name=f"Stream Salon {i}", address=f"{i} Main St",
+            city=CITY, state="TX", rating=5.0 - i / 10
+        )
+        for i in range(SALONS)
+    ]
+    ids = [salon.id for salon in salons]
+    with SessionLocal() as db:
+        db.add_all(salons)
+        db.commit()
+    return ids
+
+
+@pytest.fixture
+def execution_options():
+    """execution_options of every ORM-session statement run during the test"""
+    seen = []
+    record = lambda state: seen.append(state.execution_options)
+    event.listen(Session, "do_orm_execute", record)
+    yield seen
+    event.remove(Session, "do_orm_execute", record)
+
+
+def _statement():
+    return select(Salon).where(Salon.city == CITY).order_by(Salon.rating.desc(), Salon.id)
+
+
+def test_stream_is_chunked_per_batch_through_yield_per(salon_ids, execution_options):
+    chunks = list(streaming.stream_ndjson(_statement(), SalonResponse, batch_size=3))
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [3, 3, 1]
+    assert [json.loads(line)["id"] for line in b"".join(chunks).splitlines()] == salon_ids
+    assert [options.get("yield_per") for options in execution_options] == [3]
+
+
+def test_core_rows_stream_as_a_json_array(salon_ids):
+    statement = select(Salon.id, Salon.created_at).where(Salon.city == CITY).order_by(Salon.rating.desc())
+
+    body = b"".join(streaming.stream_json_array(statement, batch_size=2))
+
+    rows = json.loads(b"[" + body + b"]")
+    assert [row["id"] for row in rows] == salon_ids
+    assert all(isinstance(row["created_at"], str) for row in rows)
+
+
+def test_list_endpoint_streams_ndjson_on_request(salon_ids):
+    from app.main import app
+
+    with TestClient(app) as client:
+        response = client.get(
+            "/api/v1/salons", params={"city": CITY}, headers={"Accept": "application/x-ndjson"}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == salon_ids
+    assert {line["city"] for line in lines} == {CITY}
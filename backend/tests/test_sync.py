@@ -0,0 +1,65 @@
+"""
+Delta sync for mobile catalog caches
+"""
+from datetime import datetime
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db import SessionLocal
+from app.models import Salon
+from app.routers.sync import decode_sync_token, encode_sync_token
+
+
+@pytest.fixture(scope="module")
+def client(db_engine):
+    from app.main import app
+
+    with SessionLocal() as db:
+        db.add_all([
+            Salon(
+                id="sync-old-" + uuid.uuid4().hex, name="Old Salon", address="5 Main St", city="Synctown",
+                state="TX", updated_at=datetime(2020, 1, 1)
+            ),
+            Salon(
+                id="sync-new-" + uuid.uuid4().hex, name="New Salon", address="6 Main St", city="Synctown",
+                state="TX", is_active=False, updated_at=datetime(2030, 1, 1)
+            ),
+        ])
+        db.commit()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _synctown(body: dict) -> list:
+    return [s["name"] for s in body["salons"] if s["city"] == "Synctown"]
+
+
+def test_full_snapshot_has_every_table_and_a_token(client):
+    body = client.get("/api/v1/sync").json()
+
+    assert set(body) == {"next_token", "salons", "stylists", "services"}
+    assert _synctown(body) == ["Old Salon", "New Salon"]
+    assert decode_sync_token(body["next_token"]) < datetime.utcnow()
+
+
+def test_delta_returns_rows_changed_since_the_token(client):
+    since = encode_sync_token(datetime(2025, 1, 1))
+
+    body = client.get("/api/v1/sync", params={"since": since, "entities": "salons"}).json()
+
+    assert set(body) == {"next_token", "salons"}
+    # Deactivated rows are included so clients can drop them
+    assert [(s["name"], s["is_active"]) for s in body["salons"] if s["city"] == "Synctown"] == [("New Salon", False)]
+
+
+@pytest.mark.parametrize("params, detail", [
+    ({"since": "not-a-token"}, "Invalid sync token"),
+    ({"entities": "salons,bookings"}, "Unknown entities: bookings"),
+])
+def test_bad_parameters_are_rejected(client, params, detail):
+    response = client.get("/api/v1/sync", params=params)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
@@ -0,0 +1,62 @@
+"""
+Verified token payloads are cached, bounded, and never outlive the token
+"""
+import pytest
+
+from app.core import auth
+from app.core.auth import TokenCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(auth, "time", clock)
+    return clock
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TokenCache(max_entries=2)
+    for token in ("a", "b"):
+        cache.set(token, {"uid": token, "exp": clock.now + 60})
+
+    assert cache.get("a") == {"uid": "a", "exp": clock.now + 60}  # "b" is now the oldest
+    cache.set("c", {"uid": "c", "exp": clock.now + 60})
+
+    assert cache.get("b") is None
+    assert [cache.get(token)["uid"] for token in ("a", "c")] == ["a", "c"]
+
+
+def test_entry_expires_at_the_token_exp(clock):
+    cache = TokenCache()
+    cache.set("token", {"uid": "u", "exp": clock.now + 60})
+
+    clock.now += 59
+    assert cache.get("token")["uid"] == "u"
+    clock.now += 1
+    assert cache.get("token") is None
+    assert len(cache._entries) == 0
+
+
+@pytest.mark.parametrize("payload", [{"uid": "u"}, {"uid": "u", "exp": "soon"}])
+def test_tokens_without_a_numeric_exp_are_not_cached(clock, payload):
+    cache = TokenCache()
+    cache.set("token", payload)
+
+    assert cache.get("token") is None
+
+
+def test_cached_payload_is_a_copy(clock):
+    cache = TokenCache()
+    cache.set("token", {"uid": "u", "exp": clock.now + 60})
+
+    cache.get("token")["uid"] = "changed"
+
+    assert cache.get("token")["uid"] == "u"